@@ -0,0 +1,586 @@
+"""
+Micro-benchmarks for the data pipeline.
+
+Each benchmark times the reference (row-by-row) implementation against
+its array-based replacement at a production-like scale and prints the
+speedup.
+
+Usage:
+    python backend/benchmark.py                 # run everything
+    python backend/benchmark.py long_data       # run one benchmark
+    python backend/benchmark.py --list
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+import bootstrap
+import generate_data as gd
+import reserving
+from triangle import Triangle
+
+
+def timed(fn: Callable, *args, repeat: int = 1, **kwargs) -> tuple[float, object]:
+    """Best-of-`repeat` wall time in seconds, plus the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(
+    name: str, baseline: float, candidate: float, detail: str = "",
+    labels: tuple[str, str] = ("loop", "vectorized"),
+) -> None:
+    speedup = baseline / candidate if candidate > 0 else float("inf")
+    suffix = f"  ({detail})" if detail else ""
+    print(f"{name:<28} {labels[0]} {baseline:8.3f}s   {labels[1]} {candidate:8.3f}s   x{speedup:6.1f}{suffix}")
+
+
+def synthetic_portfolio(n_classes: int) -> gd.Portfolio:
+    """The default portfolio with its class parameters replicated under new names."""
+    templates = list(gd.CLASSES.values())
+    classes = {
+        f"Class_{i:04d}": dict(templates[i % len(templates)])
+        for i in range(n_classes)
+    }
+    return dataclasses.replace(gd.DEFAULT_PORTFOLIO, classes=classes)
+
+
+# ------------------------------------------------------------------ #
+#  Benchmarks
+# ------------------------------------------------------------------ #
+def bench_long_data(n_classes: int = 800) -> None:
+    """Records triangle builder — n_classes × len(COHORTS) cohorts."""
+    portfolio = synthetic_portfolio(n_classes)
+    loop_t, (df_loop, _) = timed(
+        gd.generate_long_data, np.random.default_rng(gd.SEED), portfolio
+    )
+    vec_t, (df_vec, _) = timed(
+        gd.generate_long_data_vectorized, np.random.default_rng(gd.SEED), portfolio,
+        repeat=3,
+    )
+    assert len(df_loop) == len(df_vec)
+    n_cohorts = n_classes * len(gd.COHORTS)
+    report("generate_long_data", loop_t, vec_t, f"{n_cohorts:,} cohorts, {len(df_vec):,} rows")
+
+
+def bench_ultimates(n_classes: int = 800) -> None:
+    """27-method ultimates — n_classes × len(COHORTS) cohorts × 27 methods."""
+    portfolio = synthetic_portfolio(n_classes)
+    _, ult_map = gd.generate_long_data_vectorized(np.random.default_rng(gd.SEED), portfolio)
+    loop_t, (df_loop, _) = timed(
+        gd.generate_ultimates, np.random.default_rng(gd.SEED), ult_map
+    )
+    vec_t, (df_vec, _) = timed(
+        gd.generate_ultimates_vectorized, np.random.default_rng(gd.SEED), ult_map,
+        repeat=3,
+    )
+    assert len(df_loop) == len(df_vec)
+    report("generate_ultimates", loop_t, vec_t, f"{len(df_vec):,} rows")
+
+
+def sanitise_rowwise(df: pd.DataFrame) -> list[dict]:
+    """The original per-cell export path, kept as the reference."""
+    return [{k: (None if pd.isna(v) else v) for k, v in row.items()}
+            for row in df.to_dict(orient="records")]
+
+
+def bench_sanitise(n_classes: int = 800) -> None:
+    """Export NaN handling — per-cell sanitise vs column-wise to_records."""
+    rng = np.random.default_rng(gd.SEED)
+    _, ult_map = gd.generate_long_data_vectorized(rng, synthetic_portfolio(n_classes))
+    df_ultimates, _ = gd.generate_ultimates_vectorized(rng, ult_map)
+
+    loop_t, old = timed(sanitise_rowwise, df_ultimates)
+    vec_t, new = timed(gd.to_records, df_ultimates, repeat=3)
+    assert json.dumps(old) == json.dumps(new), "to_records output differs from sanitise"
+    n_cells = df_ultimates.size
+    report("sanitise → to_records", loop_t, vec_t, f"{n_cells:,} cells, identical JSON")
+
+
+def bench_claims(n_classes: int = 800, claims_per_cohort: tuple[int, int] = (80, 120)) -> None:
+    """Individual claims — loop at 1/10 scale, vectorized at 1M+ claims."""
+    portfolio = dataclasses.replace(
+        synthetic_portfolio(n_classes), claims_per_cohort=claims_per_cohort,
+    )
+    _, ult_map = gd.generate_long_data_vectorized(np.random.default_rng(gd.SEED), portfolio)
+    small_map = dict(list(ult_map.items())[: len(ult_map) // 10])
+
+    loop_t, df_loop = timed(gd.generate_claims, np.random.default_rng(gd.SEED), small_map, portfolio)
+    vec_t, df_vec = timed(
+        gd.generate_claims_vectorized, np.random.default_rng(gd.SEED), small_map, portfolio,
+        repeat=3,
+    )
+    assert list(df_loop.columns) == list(df_vec.columns)
+    report("generate_claims", loop_t, vec_t, f"{len(df_loop):,} vs {len(df_vec):,} claims")
+
+    full_t, df_full = timed(gd.generate_claims_vectorized, np.random.default_rng(gd.SEED), ult_map, portfolio)
+    rate = len(df_full) / full_t if full_t > 0 else float("inf")
+    print(f"{'generate_claims (full)':<28} vectorized {full_t:8.3f}s   "
+          f"{len(df_full):,} claims ({rate:,.0f} claims/s)")
+
+
+def single_stream(portfolio: gd.Portfolio) -> tuple[pd.DataFrame, ...]:
+    """The default vectorized generators on one random stream, as run without --workers."""
+    rng = np.random.default_rng(gd.SEED)
+    df_records, ult_map = gd.generate_long_data_vectorized(rng, portfolio)
+    df_ultimates, df_prior_ultimates = gd.generate_ultimates_vectorized(rng, ult_map, portfolio)
+    df_scores = gd.generate_method_scores(rng, sorted(portfolio.classes))
+    df_claims = gd.generate_claims_vectorized(rng, ult_map, portfolio)
+    df_premiums = gd.generate_premiums(rng, ult_map)
+    df_claim_counts = gd.generate_cohort_claim_counts(df_claims, rng)
+    return df_records, df_ultimates, df_prior_ultimates, df_scores, df_claims, df_premiums, df_claim_counts
+
+
+def bench_per_class(n_classes: int = 96, workers: int | None = None) -> None:
+    """
+    Per-class SeedSequence generation vs the default single stream.
+
+    Per-class streams give up batching all classes into one vectorized
+    draw, so one process is slower than the default; the pool has to win
+    that back. Without a second CPU only the one-process cost is shown.
+    """
+    workers = workers or os.cpu_count() or 1
+    portfolio = gd.build_portfolio(n_classes=n_classes, granularity="monthly", years=5)
+    stream_t, _ = timed(single_stream, portfolio)
+    serial_t, serial = timed(gd.generate_per_class, portfolio, workers=1)
+    rows = sum(len(df) for df in serial)
+    report("generate_per_class (1 proc)", stream_t, serial_t, f"{rows:,} rows",
+           labels=("single stream", "per-class"))
+    if workers < 2:
+        print(f"{'generate_per_class':<28} pool skipped: only one CPU, so --workers cannot pay off here")
+        return
+    pool_t, pooled = timed(gd.generate_per_class, portfolio, workers=workers)
+    assert all(a.equals(b) for a, b in zip(serial, pooled)), "output depends on worker count"
+    report("generate_per_class", stream_t, pool_t, f"{workers} workers, identical to 1 proc",
+           labels=("single stream", f"{workers:>2} proc"))
+
+
+def chain_ladder_loop(values: np.ndarray, average: str) -> list[float]:
+    """Reference per-triangle chain ladder (one origin × dev array, NaN = unobserved)."""
+    n_origins, n_dev = values.shape
+    factors = []
+    for d in range(n_dev - 1):
+        pairs = [
+            (values[o, d], values[o, d + 1]) for o in range(n_origins)
+            if not np.isnan(values[o, d]) and not np.isnan(values[o, d + 1]) and values[o, d] > 0
+        ]
+        if average == "simple":
+            factors.append(sum(b / a for a, b in pairs) / len(pairs) if pairs else 1.0)
+            continue
+        if average != "all":
+            pairs = pairs[-int(average):]
+        den = sum(a for a, _ in pairs)
+        factors.append(sum(b for _, b in pairs) / den if den > 0 else 1.0)
+
+    ultimates = []
+    for o in range(n_origins):
+        observed = [d for d in range(n_dev) if not np.isnan(values[o, d])]
+        if not observed:
+            ultimates.append(float("nan"))
+            continue
+        last = observed[-1]
+        ultimates.append(values[o, last] * float(np.prod(factors[last:])))
+    return ultimates
+
+
+def bench_chain_ladder(n_classes: int = 2400) -> None:
+    """Chain ladder, 7 averages — per-triangle loop (1/10 scale) vs vectorized on all triangles."""
+    df_records, _ = gd.generate_long_data_vectorized(
+        np.random.default_rng(gd.SEED), synthetic_portfolio(n_classes)
+    )
+    averages = (*reserving.PATTERN_AVERAGES, "simple")
+    build_t, tri = timed(Triangle.from_records, df_records)
+
+    small = tri.values[: n_classes // 10]
+    loop_t, loop_ult = timed(
+        lambda: [[chain_ladder_loop(t, a) for t in small] for a in averages]
+    )
+    vec_t, result = timed(reserving.chain_ladder, tri, averages, repeat=3)
+    np.testing.assert_allclose(result.ultimate[:, : n_classes // 10], np.array(loop_ult), rtol=1e-12)
+    scale = n_classes / (n_classes // 10)
+    report("chain_ladder", loop_t * scale, vec_t,
+           f"{n_classes:,} triangles x {len(averages)} averages, loop extrapolated; "
+           f"Triangle.from_records {build_t:.3f}s")
+
+
+def mack_loop(values: np.ndarray) -> list[float]:
+    """Reference per-triangle Mack standard errors (volume-weighted, all origins)."""
+    n_origins, n_dev = values.shape
+    observed = [[d for d in range(n_dev) if not np.isnan(values[o, d])] for o in range(n_origins)]
+    factors, sigma2, volume = [], [], []
+    for d in range(n_dev - 1):
+        pairs = [
+            (values[o, d], values[o, d + 1]) for o in range(n_origins)
+            if not np.isnan(values[o, d]) and not np.isnan(values[o, d + 1]) and values[o, d] > 0
+        ]
+        s = sum(a for a, _ in pairs)
+        f = sum(b for _, b in pairs) / s if s > 0 else 1.0
+        factors.append(f)
+        volume.append(s)
+        if len(pairs) > 1:
+            sigma2.append(sum(a * (b / a - f) ** 2 for a, b in pairs) / (len(pairs) - 1))
+        elif d >= 2 and not np.isnan(sigma2[-2]):
+            a, b = sigma2[-2], sigma2[-1]
+            sigma2.append(min(b * b / a if a > 0 else 0.0, a, b))
+        elif d == 1:
+            sigma2.append(sigma2[-1])
+        else:
+            sigma2.append(float("nan"))
+    sigma2 = [0.0 if np.isnan(x) else x for x in sigma2]
+
+    se = []
+    for o in range(n_origins):
+        if not observed[o]:
+            se.append(float("nan"))
+            continue
+        last = observed[o][-1]
+        cum, total = values[o, last], 0.0
+        ultimate = cum * float(np.prod(factors[last:]))
+        for d in range(last, n_dev - 1):
+            unit = sigma2[d] / factors[d] ** 2
+            total += (unit / cum if cum > 0 else 0.0) + (unit / volume[d] if volume[d] > 0 else 0.0)
+            cum *= factors[d]
+        se.append(ultimate * total ** 0.5)
+    return se
+
+
+def bench_mack(n_classes: int = 2400) -> None:
+    """Mack standard errors, 6 patterns — per-triangle loop ("all", 1/10 scale) vs vectorized."""
+    df_records, _ = gd.generate_long_data_vectorized(
+        np.random.default_rng(gd.SEED), synthetic_portfolio(n_classes)
+    )
+    tri = Triangle.from_records(df_records)
+    k = n_classes // 10
+    loop_t, loop = timed(lambda: [mack_loop(t) for t in tri.values[:k]])
+
+    def batched():
+        return reserving.mack(reserving.chain_ladder(tri))
+
+    vec_t, result = timed(batched, repeat=3)
+    all_avg = reserving.PATTERN_AVERAGES.index("all")
+    np.testing.assert_allclose(result.se[all_avg, :k], np.array(loop), rtol=1e-9)
+    report("mack", loop_t * n_classes / k * len(reserving.PATTERN_AVERAGES), vec_t,
+           f"{n_classes:,} triangles x {len(reserving.PATTERN_AVERAGES)} patterns incl. totals, loop extrapolated")
+
+
+def expected_loss_loop(values: np.ndarray, premium: np.ndarray, expected: np.ndarray, average: str) -> dict:
+    """Reference per-triangle BF and Cape Cod on the chain_ladder_loop pattern."""
+    ultimates = chain_ladder_loop(values, average)
+    latest, pct = [], []
+    for o, ult in enumerate(ultimates):
+        observed = values[o][~np.isnan(values[o])]
+        latest.append(observed[-1] if len(observed) else float("nan"))
+        pct.append(latest[-1] / ult if latest[-1] > 0 else (0.0 if len(observed) else float("nan")))
+    used = [(c, p, prem) for c, p, prem in zip(latest, pct, premium) if not np.isnan(p) and prem > 0]
+    elr = sum(c for c, _, _ in used) / sum(prem * p for _, p, prem in used)
+    return {
+        "BF": [c + (1 - p) * e for c, p, e in zip(latest, pct, expected)],
+        "Cape Cod": [c + (1 - p) * elr * prem for c, p, prem in zip(latest, pct, premium)],
+    }
+
+
+def bench_expected_loss(n_classes: int = 2400) -> None:
+    """BF + Cape Cod, 6 patterns — per-triangle loop (1/10 scale) vs one batched call."""
+    df_records, _ = gd.generate_long_data_vectorized(
+        np.random.default_rng(gd.SEED), synthetic_portfolio(n_classes)
+    )
+    tri = Triangle.from_records(df_records)
+    expected = Triangle.from_records(df_records, "Expected").latest
+    premium = expected / np.random.default_rng(0).uniform(0.6, 0.8, expected.shape)
+    methods = ("BF", "Cape Cod")
+
+    k = n_classes // 10
+    loop_t, loop = timed(lambda: [
+        [expected_loss_loop(tri.values[t], premium[t], expected[t], a) for t in range(k)]
+        for a in reserving.PATTERN_AVERAGES
+    ])
+
+    def batched():
+        cl = reserving.chain_ladder(tri)
+        return reserving.expected_loss_methods(cl, premium, expected, methods)
+
+    vec_t, result = timed(batched, repeat=3)
+    for m in methods:
+        reference = np.array([[by_class[m] for by_class in per_avg] for per_avg in loop])
+        np.testing.assert_allclose(result[m][:, :k], reference, rtol=1e-10)
+    report("expected_loss", loop_t * n_classes / k, vec_t,
+           f"{n_classes:,} triangles x {len(reserving.PATTERN_AVERAGES)} patterns x {len(methods)} methods, "
+           "loop extrapolated")
+
+
+def bootstrap_loop(fit: bootstrap.ODPFit, t: int, n_sims: int, rng: np.random.Generator) -> np.ndarray:
+    """Reference ODP bootstrap of triangle `t`: one pseudo-triangle per iteration."""
+    mask, fitted = fit.mask[t], fit.fitted[t]
+    pool = fit.residuals[t, : fit.n_residuals[t]]
+    latest, latest_dev = np.nan_to_num(fit.latest[t]), fit.latest_dev[t]
+    n_origins, n_dev = mask.shape
+    out = np.empty((n_sims, n_origins))
+    for s in range(n_sims):
+        pseudo = np.where(mask, fitted + rng.choice(pool, size=mask.shape) * np.sqrt(fitted), 0)
+        factors = bootstrap.volume_weighted_factors(np.cumsum(pseudo, axis=1), fit.pair_mask[t])
+        for o in range(n_origins):
+            cum = latest[o]
+            total = cum
+            for d in range(latest_dev[o], n_dev - 1):
+                step = cum * (factors[d] - 1)
+                cum *= factors[d]
+                total += rng.gamma(step / fit.phi[t]) * fit.phi[t] if step > 0 else step
+            out[s, o] = total
+    return out
+
+
+def bench_bootstrap(n_classes: int = 240, n_sims: int = 10_000) -> None:
+    """ODP bootstrap, 10k simulations — per-simulation loop (1/100 scale) vs batched."""
+    df_records, _ = gd.generate_long_data_vectorized(
+        np.random.default_rng(gd.SEED), synthetic_portfolio(n_classes)
+    )
+    tri = Triangle.from_records(df_records)
+    fit = bootstrap.fit_odp(tri)
+    k, loop_sims = 8, n_sims // 10
+    rng = np.random.default_rng(0)
+    loop_t, loop = timed(lambda: [bootstrap_loop(fit, t, loop_sims, rng) for t in range(k)])
+    vec_t, result = timed(bootstrap.bootstrap_ultimates, tri, n_sims, workers=os.cpu_count() or 1)
+    # Different draws; the simulated means must agree within sampling error.
+    np.testing.assert_allclose(result.mean[:k], np.array([l.mean(axis=0) for l in loop]), rtol=5e-3)
+    scale = (n_classes / k) * (n_sims / loop_sims)
+    report("bootstrap", loop_t * scale, vec_t,
+           f"{n_classes:,} triangles x {n_sims:,} sims, {os.cpu_count()} workers, loop extrapolated; "
+           f"{n_classes * n_sims / vec_t:,.0f} triangle-sims/s")
+
+
+def ae_attribution_loop(df_claims: pd.DataFrame, portfolio: gd.Portfolio, pairs: list[tuple[str, str]]) -> dict:
+    """Reference getAEAttribution: filter the claims for one cohort at a time."""
+    out = {}
+    for cls, cohort in pairs:
+        c = df_claims[(df_claims["Class"] == cls) & (df_claims["Cohort"] == cohort)]
+        movement = c["Incurred_Current"] - c["Incurred_Prior"]
+        large = c["Incurred_Current"] >= portfolio.classes[cls]["large_loss_threshold"]
+        out[cls, cohort] = (movement.sum(), movement[large].sum(), int(large.sum()), len(c))
+    return out
+
+
+def bench_ae_attribution(n_classes: int = 800, claims_per_cohort: tuple[int, int] = (80, 120)) -> None:
+    """Large-loss A-E attribution — per-cohort filter (50 cohorts) vs one grouped pass."""
+    portfolio = dataclasses.replace(
+        synthetic_portfolio(n_classes), claims_per_cohort=claims_per_cohort,
+    )
+    _, ult_map = gd.generate_long_data_vectorized(np.random.default_rng(gd.SEED), portfolio)
+    df_claims = gd.generate_claims_vectorized(np.random.default_rng(gd.SEED), ult_map, portfolio)
+    pairs = list(ult_map)[:50]
+    loop_t, loop = timed(ae_attribution_loop, df_claims, portfolio, pairs)
+    vec_t, df = timed(gd.ae_attribution, df_claims, portfolio, repeat=3)
+    rows = df.set_index(["Class", "Cohort"])
+    for key, (total, large, n_large, n) in loop.items():
+        row = rows.loc[key]
+        assert abs(row["Total_Movement"] - total) < 0.01 and abs(row["Large_Movement"] - large) < 0.01
+        assert (row["Large_Count"], row["Total_Count"]) == (n_large, n)
+    report("ae_attribution", loop_t * len(ult_map) / len(pairs), vec_t,
+           f"{len(df_claims):,} claims, {len(df):,} cohorts, loop extrapolated")
+
+
+def method_summary_loop(tables: dict[str, pd.DataFrame], portfolio: gd.Portfolio, classes: list[str]) -> dict:
+    """Reference getMethodAEAndUltChange: group the class's records, then walk the cohorts per method."""
+    out = {}
+    current = tables["ultimates"].set_index(["Class", "Cohort", "Method"])["Ultimate"].to_dict()
+    prior = tables["prior_ultimates"].set_index(["Class", "Cohort", "Method"])["Ultimate"].to_dict()
+    for cls in classes:
+        rec = tables["records"][tables["records"]["Class"] == cls].sort_values("Development_Period")
+        for method in pd.unique(tables["ultimates"]["Method"]):
+            total_a = total_e = total_cur = total_pri = 0.0
+            for cohort, g in rec.groupby("Cohort"):
+                actual, expected = g[g["Type"] == "Actual"], g[g["Type"] == "Expected"]
+                if actual.empty:
+                    continue
+                last_dp, last_actual = actual["Development_Period"].iloc[-1], actual["Value"].iloc[-1]
+                if len(expected) and expected["Value"].iloc[0]:
+                    e = expected["Value"].iloc[0] * float(gd.development_fraction(np.array(last_dp), portfolio.max_dev_period))
+                    if e:
+                        total_a, total_e = total_a + last_actual, total_e + e
+                cur, pri = current.get((cls, cohort, method)), prior.get((cls, cohort, method))
+                if cur is not None and pri and not np.isnan(cur) and not np.isnan(pri):
+                    total_cur, total_pri = total_cur + cur, total_pri + pri
+            out[cls, method] = (
+                (total_a - total_e) / total_e if total_e else None,
+                (total_cur - total_pri) / total_pri if total_pri else None,
+            )
+    return out
+
+
+def bench_method_summary(n_classes: int = 400) -> None:
+    """A vs E / ultimate change per Class × Method — per-method cohort walk (2 classes) vs one grouped table."""
+    portfolio = synthetic_portfolio(n_classes)
+    df_records, ult_map = gd.generate_long_data_vectorized(np.random.default_rng(gd.SEED), portfolio)
+    df_ultimates, df_prior = gd.generate_ultimates_vectorized(np.random.default_rng(gd.SEED), ult_map, portfolio)
+    tables = {"records": df_records, "ultimates": df_ultimates, "prior_ultimates": df_prior}
+    k = 2
+    loop_t, loop = timed(method_summary_loop, tables, portfolio, list(portfolio.classes)[:k])
+    vec_t, df = timed(gd.method_summary, df_records, df_ultimates, df_prior, portfolio, repeat=3)
+    rows = df.set_index(["Class", "Method"])
+    for key, (ae, chg) in loop.items():
+        np.testing.assert_allclose(rows.loc[key, ["AE_Ratio", "Ult_Change"]].to_numpy(float), [ae, chg], rtol=1e-9)
+    report("method_summary", loop_t * n_classes / k, vec_t, f"{len(df):,} rows, loop extrapolated from {k} classes")
+
+
+def fanning_loop(series: list[tuple[str, dict]]) -> set[str]:
+    """Reference detectFanningCohorts over [(cohort, {dp: value})], oldest first."""
+    fanning = set()
+    if len(series) < 3:
+        return fanning
+    for i, (cohort, values) in enumerate(series[1:], start=1):
+        if len(values) < 2:
+            continue
+        last = max(values)
+        older = [v[last] for _, v in series[:i] if last in v]
+        if older and values[last] - sum(older) / len(older) > gd.FAN_THRESHOLD:
+            fanning.add(cohort)
+    return fanning
+
+
+def bench_fanning(n_classes: int = 200, years: int = 10) -> None:
+    """Fanning detection, 120 monthly cohorts — quadratic per-class loop (1/10 scale) vs cumulative sums."""
+    portfolio = gd.build_portfolio(n_classes, "monthly", years)
+    df_records, ult_map = gd.generate_long_data_vectorized(np.random.default_rng(gd.SEED), portfolio)
+    df_ultimates, _ = gd.generate_ultimates_vectorized(np.random.default_rng(gd.SEED), ult_map, portfolio)
+    tri = Triangle.from_records(df_records)
+    # Incurred % of Ultimate of the first method
+    method = pd.Index(df_ultimates["Method"].iloc[:1])
+    series, observed = (a[0] for a in gd.pct_of_ultimate_series(tri, gd.method_grid(df_ultimates, tri, method)))
+
+    def loop(classes: range) -> list[set[str]]:
+        return [
+            fanning_loop([
+                (tri.origins[o], {int(d): series[c, o, d] for d in np.flatnonzero(observed[c, o])})
+                for o in range(tri.shape[1]) if observed[c, o].any()
+            ])
+            for c in classes
+        ]
+
+    k = max(n_classes // 10, 1)
+    loop_t, flags = timed(loop, range(k))
+    vec_t, fanning = timed(gd.fanning_out, series, observed, repeat=3)
+    assert flags == [{tri.origins[o] for o in np.flatnonzero(fanning[c])} for c in range(k)]
+    report("fanning", loop_t * n_classes / k, vec_t,
+           f"{n_classes:,} classes x {tri.shape[1]} cohorts, {int(fanning.sum()):,} fanning, loop extrapolated")
+
+
+def decision_loop(tables: dict[str, pd.DataFrame], portfolio: gd.Portfolio, classes: list[str]) -> dict:
+    """Reference decision DAG, one cohort at a time as the dashboard runs it."""
+    records, ultimates, claims = tables["records"], tables["ultimates"], tables["claims"]
+    premiums = tables["premiums"].set_index(["Class", "Cohort"])
+    counts = tables["cohort_claim_counts"].set_index(["Class", "Cohort"])
+    out = {}
+    for cls in classes:
+        rec = records[records["Class"] == cls].sort_values("Development_Period")
+        actual = {c: dict(zip(g["Development_Period"], g["Value"])) for c, g in rec[rec["Type"] == "Actual"].groupby("Cohort")}
+        e2u = rec[rec["Type"] == "Expected"].groupby("Cohort")["Value"].first()
+        threshold = portfolio.classes[cls]["large_loss_threshold"]
+        norm = [(c, {d: v / a[portfolio.periods_per_year] * 100 for d, v in a.items()})
+                for c, a in sorted(actual.items()) if a.get(portfolio.periods_per_year)]
+        ult = ultimates[ultimates["Class"] == cls]
+        for method, rows in ult.groupby("Method"):
+            by_cohort = dict(zip(rows["Cohort"], rows["Ultimate"]))
+            pct = [(c, {d: v / by_cohort[c] * 100 for d, v in a.items()})
+                   for c, a in sorted(actual.items()) if by_cohort.get(c)]
+            both = fanning_loop(pct) & fanning_loop(norm)
+            premium_based = rows["Method_Type"].iloc[0] == "Premium-based"
+            for cohort, a in actual.items():
+                last = max(a)
+                expected = e2u.get(cohort, 0) * float(gd.development_fraction(np.array(last), portfolio.max_dev_period))
+                if not expected:
+                    continue
+                ae = (a[last] - expected) / expected
+                if abs(ae) <= gd.DAG_AE_THRESHOLD:
+                    out[cls, cohort, method] = ""
+                    continue
+                c = claims[(claims["Class"] == cls) & (claims["Cohort"] == cohort)]
+                movement = c["Incurred_Current"] - c["Incurred_Prior"]
+                total = movement.sum()
+                large = 100 * movement[c["Incurred_Current"] >= threshold].sum() / total if total else 0
+                prem, count = premiums.loc[(cls, cohort)], counts.loc[(cls, cohort)]
+                claims_based = ult[(ult["Cohort"] == cohort) & (ult["Method_Type"] == "Claims-based")]["Ultimate"]
+                if cohort in both:
+                    driver = "Trend acceleration"
+                elif count["Count_Prior"] and (count["Count_Current"] - count["Count_Prior"]) / count["Count_Prior"] >= gd.DAG_CLAIM_COUNT_THRESHOLD:
+                    driver = "Claim frequency"
+                elif large >= gd.DAG_LARGE_LOSS_PCT_THRESHOLD:
+                    driver = "Large losses"
+                elif prem["Prior_Earned"] and (prem["Earned"] - prem["Prior_Earned"]) / prem["Prior_Earned"] >= gd.DAG_PREMIUM_CHANGE_THRESHOLD:
+                    driver = "Premium growth"
+                elif premium_based and claims_based.max() > by_cohort[cohort]:
+                    driver = "Method mismatch"
+                else:
+                    driver = "Unclear"
+                out[cls, cohort, method] = driver
+    return out
+
+
+def bench_decisions(n_classes: int = 400) -> None:
+    """Decision DAG for every Class × Cohort × Method — per-cohort loop (4 classes) vs one batched table."""
+    portfolio = synthetic_portfolio(n_classes)
+    df_records, ult_map = gd.generate_long_data_vectorized(np.random.default_rng(gd.SEED), portfolio)
+    rng = np.random.default_rng(gd.SEED)
+    df_ultimates, _ = gd.generate_ultimates_vectorized(rng, ult_map, portfolio)
+    df_claims = gd.generate_claims_vectorized(rng, ult_map, portfolio)
+    tables = {
+        "records": df_records, "ultimates": df_ultimates, "claims": df_claims,
+        "premiums": gd.generate_premiums(rng, ult_map),
+        "cohort_claim_counts": gd.generate_cohort_claim_counts(df_claims, rng),
+    }
+    k = 4
+    loop_t, loop = timed(decision_loop, tables, portfolio, list(portfolio.classes)[:k])
+    vec_t, df = timed(
+        gd.decision_table, df_records, df_ultimates, df_claims, tables["premiums"],
+        tables["cohort_claim_counts"], portfolio,
+    )
+    batched = dict(zip(zip(df["Class"], df["Cohort"], df["Method"]), df["Driver"]))
+    assert all(batched[key] == driver for key, driver in loop.items())
+    report("decisions", loop_t * n_classes / k, vec_t,
+           f"{len(df):,} rows, loop extrapolated from {k} classes")
+
+
+BENCHMARKS: dict[str, Callable[[], None]] = {
+    "long_data": bench_long_data,
+    "ultimates": bench_ultimates,
+    "sanitise": bench_sanitise,
+    "claims": bench_claims,
+    "per_class": bench_per_class,
+    "chain_ladder": bench_chain_ladder,
+    "expected_loss": bench_expected_loss,
+    "mack": bench_mack,
+    "bootstrap": bench_bootstrap,
+    "ae_attribution": bench_ae_attribution,
+    "decisions": bench_decisions,
+    "method_summary": bench_method_summary,
+    "fanning": bench_fanning,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--list", action="store_true", help="list available benchmarks")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, fn in BENCHMARKS.items():
+            print(f"{name:<16} {fn.__doc__.strip().splitlines()[0]}")
+        raise SystemExit(0)
+
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
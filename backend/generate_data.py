@@ -4,7 +4,7 @@ Generate dummy insurance reserving data in long (tidy) format.
 Output schema — records table (each row is one observation):
     Class               – line of business (e.g. Motor, Property)
     Cohort              – origin period   (e.g. 2022Q1)
-    Development_Period  – integer quarters since origin
+    Development_Period  – integer periods (quarters or months) since origin
     Type                – "Actual" or "Expected"
     Value               – cumulative claim amount
 
@@ -24,12 +24,76 @@ Output schema — method_scores table (one row per Class × Method):
     Reserve_Det    – reserve determination score [0, 1]
     Proj_Quality   – projection quality score [0, 1]
 
+Output schema — reserve_distribution table (with --bootstrap; one row per
+Class × Cohort):
+    Class, Cohort  – as above
+    Latest         – latest cumulative actual
+    Ultimate_Mean  – mean bootstrap ultimate
+    Ultimate_P5 / Ultimate_P50 / Ultimate_P95 – ultimate percentiles
+                     (reserve percentiles are these minus Latest)
+
+Output schema — mack table (with --mack; one row per Class × Cohort ×
+Method, plus Cohort "Total" per Class × Method):
+    Class, Cohort, Method, Ultimate – as in ultimates
+    Mack_SE        – Mack standard error of the ultimate
+    Mack_CV        – Mack_SE / Ultimate
+
+Output schema — ae_attribution table (one row per Class × Cohort with
+claims):
+    Class, Cohort  – as above
+    Threshold      – the class's large loss threshold
+    Total_Movement / Large_Movement / Attritional_Movement – incurred
+                     movement (current − prior), all / large / other claims
+    Large_Pct      – Large_Movement as % of Total_Movement (0 if no movement)
+    Large_Count / Attritional_Count / Total_Count – claim counts
+
+Output schema — decisions table (one row per Class × Cohort × Method):
+    Class, Cohort, Method – as in ultimates
+    AE_Ratio       – (latest actual − expected) / expected
+    Fanning_Out    – cohort fans out in both development views
+    Large_Loss_Pct – % of incurred movement from large losses
+    Driver         – reserving decision DAG outcome ("" within the A−E
+                     threshold); the dashboard maps it to its suggestion
+
+Output schema — method_summary table (one row per Class × Method):
+    Class, Method  – as above
+    AE_Ratio       – (Σ latest actual − Σ expected) / Σ expected over cohorts
+    Ult_Change     – (Ultimate_Current − Ultimate_Prior) / Ultimate_Prior
+    Ultimate_Current / Ultimate_Prior – total current / prior ultimate over
+                     cohorts with both
+
+Output schema — fanning table (with --fanning; one row per Class ×
+Cohort × Method):
+    Class, Cohort, Method – as in ultimates
+    Pct_Fanning    – cohort fans out in the method's Incurred % of Ultimate
+
+Output schema — norm_fanning table (with --fanning; one row per Class ×
+Cohort with a year-1 value):
+    Class, Cohort  – as in records
+    Norm_Fanning   – cohort fans out in Incurred / Year 1
+
+Output schema — norm_series table (with --fanning; one row per observed
+Class × Cohort × Development_Period of cohorts with a year-1 value):
+    Class, Cohort, Development_Period – as in records
+    Norm_Pct       – actual as % of the cohort's year-1 actual
+
 Methods are defined by three assumption dimensions:
     - Pattern:  Pegged / Unpegged / Fixed
     - IE:       Pegged / Unpegged / Fixed
     - Approach: Pegged / Unpegged / Fixed
     → 3 × 3 × 3 = 27 combinations
 
+Usage:
+    python backend/generate_data.py               # reference generators
+    python backend/generate_data.py --vectorized  # array-based generators
+    python backend/generate_data.py --profile profile.json  # per-stage timings
+    python backend/generate_data.py --vectorized --classes 200 --granularity monthly
+    python backend/generate_data.py --vectorized --portfolio portfolio.json
+    python backend/generate_data.py --projection-engine  # chain ladder / BF ultimates
+    python backend/generate_data.py --bootstrap 10000    # ODP reserve percentiles
+    python backend/generate_data.py --mack               # Mack standard errors
+    python backend/generate_data.py --fanning            # development-chart series
+
 Best Practices:
     - numpy seed for reproducibility
     - itertools.product for clean combinatorics
@@ -40,12 +104,40 @@ Best Practices:
 
 from pathlib import Path
 from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+import argparse
+import gzip
+import hashlib
+import inspect
 import json
+import os
+import re
+import shutil
+import sys
 from datetime import datetime
+from typing import Iterable, Iterator
 
 import numpy as np
 import pandas as pd
 
+from instrumentation import StageProfiler
+from triangle import Triangle
+import bootstrap
+import reserving
+
+try:  # optional: brotli variants are only written when the package is installed
+    import brotli
+except ImportError:
+    brotli = None
+
+try:  # optional: Arrow IPC / Parquet export
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
 
 # ------------------------------------------------------------------ #
 #  Configuration
@@ -88,6 +180,147 @@ COHORTS = [
     "2025Q1",
 ]
 
+
+@dataclass
+class Portfolio:
+    """
+    Shape of the synthetic book: classes, origin cohorts and development.
+
+    Cohort labels are "YYYYQn" for quarterly and "YYYYMmm" for monthly
+    portfolios, and development periods count in the same unit. Class
+    speeds and trends in `classes` are quoted per quarter and rescaled by
+    `period_scale`, so the same parameters give comparable curves at
+    either granularity.
+    """
+    classes: dict[str, dict]
+    cohorts: list[str]
+    valuation: str
+    max_dev_period: int = MAX_DEV_PERIOD
+    periods_per_year: int = 4
+    claims_per_cohort: tuple[int, int] = (5, 12)
+
+    @property
+    def start_year(self) -> int:
+        return int(self.cohorts[0][:4])
+
+    @property
+    def period_scale(self) -> float:
+        """Quarters per development period."""
+        return 4 / self.periods_per_year
+
+    def cohort_index(self, cohort: str) -> int:
+        year, period = int(cohort[:4]), int(cohort[5:])
+        return (year - self.start_year) * self.periods_per_year + (period - 1)
+
+    def valuation_index(self) -> int:
+        return self.cohort_index(self.valuation)
+
+
+DEFAULT_PORTFOLIO = Portfolio(CLASSES, COHORTS, VALUATION_DATE)
+
+
+def cohort_index(cohort: str) -> int:
+    return DEFAULT_PORTFOLIO.cohort_index(cohort)
+
+
+def valuation_index() -> int:
+    return DEFAULT_PORTFOLIO.valuation_index()
+
+GRANULARITIES = {"quarterly": 4, "monthly": 12}
+
+# Base names for procedurally generated classes; repeats get a suffix.
+CLASS_NAMES = [
+    "Motor", "Property", "Liability", "Marine", "Aviation", "Energy",
+    "Casualty", "Cyber", "Credit", "Accident & Health", "Engineering", "Political Risk",
+]
+
+# Ranges that procedural class parameters are drawn from (uniformly).
+CLASS_PARAM_RANGES = {
+    "base_ultimate": (500_000, 3_000_000),
+    "growth_rate": (0.01, 0.08),
+    "dev_speed": (0.10, 0.35),
+    "volatility": (0.02, 0.06),
+    "trend_accel": (0.005, 0.02),
+}
+
+
+def cohort_label(year: int, period: int, periods_per_year: int) -> str:
+    """Origin-period label: 2022Q1 (quarterly) or 2022M01 (monthly)."""
+    if periods_per_year == 4:
+        return f"{year}Q{period}"
+    return f"{year}M{period:02d}"
+
+
+def build_portfolio(
+    n_classes: int = len(CLASSES),
+    granularity: str = "quarterly",
+    years: int = 3,
+    max_dev_period: int | None = None,
+    claims_per_cohort: tuple[int, int] = (5, 12),
+    start_year: int = 2022,
+    seed: int = SEED,
+) -> Portfolio:
+    """
+    Procedurally generated portfolio for load testing.
+
+    `years` of cohorts at the given granularity start in `start_year`;
+    the valuation date is one year after the latest cohort.
+    `max_dev_period` defaults to three years of periods. Class parameters
+    are drawn from CLASS_PARAM_RANGES with their own `seed`, so the
+    portfolio shape does not depend on the data seed.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {sorted(GRANULARITIES)}, got {granularity!r}")
+    lo, hi = claims_per_cohort
+    if n_classes < 1 or years < 1 or not 1 <= lo <= hi:
+        raise ValueError("n_classes and years must be >= 1 and claims_per_cohort a (min, max) range with min >= 1")
+    periods_per_year = GRANULARITIES[granularity]
+    if max_dev_period is None:
+        max_dev_period = 3 * periods_per_year
+    if max_dev_period < 1:
+        raise ValueError("max_dev_period must be >= 1")
+
+    rng = np.random.default_rng(seed)
+    draws = {
+        name: rng.uniform(low, high, size=n_classes)
+        for name, (low, high) in CLASS_PARAM_RANGES.items()
+    }
+    classes = {}
+    for i in range(n_classes):
+        base = CLASS_NAMES[i % len(CLASS_NAMES)]
+        name = base if i < len(CLASS_NAMES) else f"{base} {i // len(CLASS_NAMES) + 1}"
+        params = {key: float(vals[i]) for key, vals in draws.items()}
+        params["base_ultimate"] = round(params["base_ultimate"], -3)
+        params["large_loss_threshold"] = round(params["base_ultimate"] * rng.uniform(0.06, 0.12), -3)
+        params["entities"] = list(ENTITIES.get(base, ["Direct", "Broker", "Delegated"]))
+        classes[name] = params
+
+    n_cohorts = years * periods_per_year
+    cohorts = [
+        cohort_label(start_year + k // periods_per_year, k % periods_per_year + 1, periods_per_year)
+        for k in range(n_cohorts + periods_per_year)
+    ]
+    return Portfolio(
+        classes=classes,
+        cohorts=cohorts[:n_cohorts],
+        valuation=cohorts[-1],
+        max_dev_period=max_dev_period,
+        periods_per_year=periods_per_year,
+        claims_per_cohort=(lo, hi),
+    )
+
+
+def load_portfolio_config(path: Path) -> dict:
+    """
+    Read build_portfolio() keyword arguments from a JSON file, e.g.
+    {"n_classes": 200, "granularity": "monthly", "years": 5}.
+    """
+    config = json.loads(path.read_text())
+    unknown = set(config) - set(inspect.signature(build_portfolio).parameters)
+    if unknown:
+        raise ValueError(f"unknown portfolio setting(s) in {path}: {', '.join(sorted(unknown))}")
+    return config
+
 # --- Three assumption dimensions ---
 ASSUMPTIONS = ["Pegged", "Unpegged", "Fixed"]
 
@@ -141,16 +374,6 @@ def build_method_key(pattern: str, ie: str, approach: str) -> str:
 # ------------------------------------------------------------------ #
 #  Helpers
 # ------------------------------------------------------------------ #
-def cohort_index(cohort: str) -> int:
-    year = int(cohort[:4])
-    quarter = int(cohort[-1])
-    return (year - 2022) * 4 + (quarter - 1)
-
-
-def valuation_index() -> int:
-    return cohort_index(VALUATION_DATE)
-
-
 def cumulative_development_curve(
     dev_periods: np.ndarray,
     ultimate: float,
@@ -163,21 +386,25 @@ def cumulative_development_curve(
 # ------------------------------------------------------------------ #
 #  Records generator
 # ------------------------------------------------------------------ #
-def generate_long_data(rng: np.random.Generator) -> tuple[pd.DataFrame, dict]:
+def generate_long_data(
+    rng: np.random.Generator,
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
+) -> tuple[pd.DataFrame, dict]:
     """Build the flight-path records and true ultimate map."""
-    val_idx = valuation_index()
+    val_idx = portfolio.valuation_index()
+    scale = portfolio.period_scale
     rows: list[dict] = []
     ult_map: dict[tuple[str, str], float] = {}
 
-    for cls_name, params in CLASSES.items():
-        for cohort in COHORTS:
-            c_idx = cohort_index(cohort)
+    for cls_name, params in portfolio.classes.items():
+        for cohort in portfolio.cohorts:
+            c_idx = portfolio.cohort_index(cohort)
             max_observed = val_idx - c_idx
             if max_observed < 0:
                 continue
-            max_observed = min(max_observed, MAX_DEV_PERIOD)
+            max_observed = min(max_observed, portfolio.max_dev_period)
 
-            growth_factor = (1 + params["growth_rate"]) ** (c_idx / 4)
+            growth_factor = (1 + params["growth_rate"]) ** (c_idx / portfolio.periods_per_year)
             noise = rng.normal(1, params["volatility"])
             cohort_ultimate = params["base_ultimate"] * growth_factor * noise
             ult_map[(cls_name, cohort)] = cohort_ultimate
@@ -185,13 +412,13 @@ def generate_long_data(rng: np.random.Generator) -> tuple[pd.DataFrame, dict]:
             expected_ultimate = round(cohort_ultimate, -3)
 
             # More recent cohorts develop faster → fanning-out trend
-            cohort_speed = params["dev_speed"] + params.get("trend_accel", 0) * c_idx
+            cohort_speed = (params["dev_speed"] + params.get("trend_accel", 0) * c_idx * scale) * scale
 
             dev_periods = np.arange(0, max_observed + 1)
             base_curve = cumulative_development_curve(
                 dev_periods, cohort_ultimate, cohort_speed
             )
-            noise_scale = params["volatility"] * cohort_ultimate * 0.02
+            noise_scale = params["volatility"] * cohort_ultimate * 0.02 * scale ** 0.5
             perturbation = rng.normal(0, noise_scale, size=len(dev_periods))
             perturbation[0] = 0
             actuals = np.maximum(0, base_curve + np.cumsum(perturbation))
@@ -218,14 +445,111 @@ def generate_long_data(rng: np.random.Generator) -> tuple[pd.DataFrame, dict]:
     return pd.DataFrame(rows), ult_map
 
 
+def generate_long_data_vectorized(
+    rng: np.random.Generator,
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Array-based equivalent of generate_long_data.
+
+    Builds the full Class × Cohort × Development_Period grid in one go:
+    noise and perturbations are drawn as batched arrays, the development
+    curve is broadcast over the grid, and periods beyond each cohort's
+    latest observation are masked out before the records DataFrame is
+    assembled column-wise.
+
+    Output schema and row order match generate_long_data. Random draws
+    are taken in a different order, so values differ for the same seed.
+    """
+    classes = portfolio.classes
+    val_idx = portfolio.valuation_index()
+    scale = portfolio.period_scale
+    cohorts = [c for c in portfolio.cohorts if val_idx - portfolio.cohort_index(c) >= 0]
+    if not classes or not cohorts:
+        columns = ["Class", "Cohort", "Development_Period", "Type", "Value"]
+        return pd.DataFrame(columns=columns), {}
+
+    class_names = list(classes.keys())
+    params = pd.DataFrame.from_dict(classes, orient="index")
+    base_ultimate = params["base_ultimate"].to_numpy(float)[:, None]
+    growth_rate = params["growth_rate"].to_numpy(float)[:, None]
+    dev_speed = params["dev_speed"].to_numpy(float)[:, None]
+    volatility = params["volatility"].to_numpy(float)[:, None]
+    trend_accel = params.get("trend_accel", pd.Series(0.0, index=params.index))
+    trend_accel = trend_accel.fillna(0).to_numpy(float)[:, None]
+
+    c_idx = np.array([portfolio.cohort_index(c) for c in cohorts])[None, :]
+    max_observed = np.minimum(val_idx - c_idx, portfolio.max_dev_period)
+    dev_periods = np.arange(0, portfolio.max_dev_period + 1)
+
+    n_cls, n_coh, n_dev = len(class_names), len(cohorts), len(dev_periods)
+
+    # Class × Cohort
+    growth_factor = (1 + growth_rate) ** (c_idx / portfolio.periods_per_year)
+    noise = rng.normal(1, np.broadcast_to(volatility, (n_cls, n_coh)))
+    cohort_ultimate = base_ultimate * growth_factor * noise
+    expected_ultimate = np.round(cohort_ultimate, -3)
+    cohort_speed = (dev_speed + trend_accel * c_idx * scale) * scale
+
+    # Class × Cohort × Development_Period
+    base_curve = cumulative_development_curve(
+        dev_periods[None, None, :],
+        cohort_ultimate[:, :, None],
+        cohort_speed[:, :, None],
+    )
+    noise_scale = (volatility * cohort_ultimate * 0.02 * scale ** 0.5)[:, :, None]
+    perturbation = rng.normal(0, np.broadcast_to(noise_scale, (n_cls, n_coh, n_dev)))
+    perturbation[:, :, 0] = 0
+    observed = dev_periods[None, None, :] <= max_observed[:, :, None]
+    perturbation = np.where(observed, perturbation, 0)
+    actuals = np.maximum(0, base_curve + np.cumsum(perturbation, axis=2))
+    actuals = np.maximum.accumulate(actuals, axis=2)
+
+    # Stack Actual / Expected on a Type axis so C-order flattening gives
+    # Class → Cohort → Type → Development_Period, as in the loop version.
+    values = np.stack(
+        [
+            np.round(actuals, 2),
+            np.broadcast_to(expected_ultimate[:, :, None], actuals.shape),
+        ],
+        axis=2,
+    )
+    mask = np.broadcast_to(observed[:, :, None, :], values.shape)
+    grid_shape = values.shape
+
+    cls_codes, coh_codes, type_codes, dp_codes = (
+        np.broadcast_to(ax, grid_shape)[mask]
+        for ax in np.ix_(
+            np.arange(n_cls), np.arange(n_coh), np.arange(2), dev_periods
+        )
+    )
+
+    df = pd.DataFrame({
+        "Class": np.asarray(class_names, dtype=object)[cls_codes],
+        "Cohort": np.asarray(cohorts, dtype=object)[coh_codes],
+        "Development_Period": dp_codes.astype(int),
+        "Type": np.array(["Actual", "Expected"], dtype=object)[type_codes],
+        "Value": values[mask],
+    })
+
+    ult_map = {
+        (cls_name, cohort): float(cohort_ultimate[i, j])
+        for i, cls_name in enumerate(class_names)
+        for j, cohort in enumerate(cohorts)
+    }
+    return df, ult_map
+
+
 # ------------------------------------------------------------------ #
 #  Ultimates generator — 27 methods
 # ------------------------------------------------------------------ #
 IE_APPROACHES = ["Trending", "WA", "Cape Cod", "BF"]
+PATTERN_AVGS = ["1", "2", "3", "4", "5", "all"]
 
 def generate_ultimates(
     rng: np.random.Generator,
     ult_map: dict[tuple[str, str], float],
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Generate ultimate estimates for every Class × Cohort × Method.
@@ -238,7 +562,7 @@ def generate_ultimates(
     rows: list[dict] = []
     prior_rows: list[dict] = []
 
-    sorted_cohorts = sorted(ult_map.keys(), key=lambda k: cohort_index(k[1]))
+    sorted_cohorts = sorted(ult_map.keys(), key=lambda k: portfolio.cohort_index(k[1]))
     all_cohorts_for_class: dict[str, list[str]] = {}
     for cls_name, cohort in sorted_cohorts:
         all_cohorts_for_class.setdefault(cls_name, []).append(cohort)
@@ -266,7 +590,7 @@ def generate_ultimates(
                 pattern_avg = None
                 ie_approach = rng.choice(IE_APPROACHES)
             else:
-                pattern_avg = str(rng.choice(["1", "2", "3", "4", "5", "all"]))
+                pattern_avg = str(rng.choice(PATTERN_AVGS))
                 ie_approach = None
 
             tail_used = "Yes" if is_early and rng.random() > 0.3 else "No"
@@ -289,8 +613,8 @@ def generate_ultimates(
                 "SC_Ack": sc_ack,
             })
 
-            c_idx = cohort_index(cohort)
-            maturity = min((valuation_index() - c_idx) / MAX_DEV_PERIOD, 1.0)
+            c_idx = portfolio.cohort_index(cohort)
+            maturity = min((portfolio.valuation_index() - c_idx) / portfolio.max_dev_period, 1.0)
             drift_sigma = 0.04 * (1 - maturity) + 0.005
             prior_factor = 1 + rng.normal(0, drift_sigma)
             prior_ultimate = ultimate * prior_factor
@@ -305,6 +629,106 @@ def generate_ultimates(
     return pd.DataFrame(rows), pd.DataFrame(prior_rows)
 
 
+def method_table() -> pd.DataFrame:
+    """
+    One row per method (27), in product(ASSUMPTIONS, repeat=3) order,
+    with the combined bias / noise of its three assumption effects.
+    """
+    rows = []
+    for pattern, ie, approach in product(ASSUMPTIONS, repeat=3):
+        effects = [
+            ASSUMPTION_EFFECTS["Pattern"][pattern],
+            ASSUMPTION_EFFECTS["IE"][ie],
+            ASSUMPTION_EFFECTS["Approach"][approach],
+        ]
+        rows.append({
+            "Method": build_method_key(pattern, ie, approach),
+            "Pattern": pattern,
+            "IE": ie,
+            "Approach": approach,
+            "Method_Type": "Claims-based" if approach in ("Pegged", "Unpegged") else "Premium-based",
+            "bias": float(np.prod([e["bias"] for e in effects])),
+            "noise": float(np.sqrt(sum(e["noise"] ** 2 for e in effects))),
+        })
+    return pd.DataFrame(rows)
+
+
+def generate_ultimates_vectorized(
+    rng: np.random.Generator,
+    ult_map: dict[tuple[str, str], float],
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Array-based equivalent of generate_ultimates.
+
+    The 27-row method table is broadcast against the Class × Cohort
+    vector of true ultimates, so every factor, Pattern_Avg / IE_Approach
+    choice and flag comes from one batched draw of shape
+    (cohorts, methods). Schema and row order match generate_ultimates;
+    values differ for the same seed.
+    """
+    methods = method_table()
+    keys = pd.DataFrame(list(ult_map.keys()), columns=["Class", "Cohort"])
+    n_pairs, n_methods = len(keys), len(methods)
+
+    true_ult = np.fromiter(ult_map.values(), dtype=float, count=n_pairs)[:, None]
+    c_idx = keys["Cohort"].map(portfolio.cohort_index).to_numpy()
+
+    # Early cohorts = first half of each class's cohorts by origin
+    cohort_rank = keys.assign(c_idx=c_idx).groupby("Class")["c_idx"].rank(method="first") - 1
+    class_size = keys.groupby("Class")["Cohort"].transform("size")
+    is_early = (cohort_rank < class_size // 2).to_numpy()[:, None]
+
+    bias = methods["bias"].to_numpy()[None, :]
+    noise = methods["noise"].to_numpy()[None, :]
+    claims_based = (methods["Method_Type"] == "Claims-based").to_numpy()[None, :]
+    shape = (n_pairs, n_methods)
+
+    factor = bias * rng.normal(1, np.broadcast_to(noise, shape))
+    ultimate = true_ult * factor
+
+    pattern_avg = np.asarray(PATTERN_AVGS, dtype=object)[rng.integers(0, len(PATTERN_AVGS), size=shape)]
+    ie_approach = np.asarray(IE_APPROACHES, dtype=object)[rng.integers(0, len(IE_APPROACHES), size=shape)]
+    pattern_avg = np.where(claims_based, pattern_avg, None)
+    ie_approach = np.where(claims_based, None, ie_approach)
+
+    yes_no = np.array(["No", "Yes"], dtype=object)
+    tail_used = yes_no[(is_early & (rng.random(shape) > 0.3)).astype(int)]
+    excl = yes_no[(rng.random(shape) < 0.15).astype(int)]
+    sc_ack = yes_no[(rng.random(shape) < 0.25).astype(int)]
+
+    maturity = np.minimum((portfolio.valuation_index() - c_idx) / portfolio.max_dev_period, 1.0)
+    drift_sigma = (0.04 * (1 - maturity) + 0.005)[:, None]
+    prior_ultimate = ultimate * (1 + rng.normal(0, np.broadcast_to(drift_sigma, shape)))
+
+    cls_col = np.repeat(keys["Class"].to_numpy(dtype=object), n_methods)
+    cohort_col = np.repeat(keys["Cohort"].to_numpy(dtype=object), n_methods)
+    method_col = np.tile(methods["Method"].to_numpy(dtype=object), n_pairs)
+
+    df_ultimates = pd.DataFrame({
+        "Class": cls_col,
+        "Cohort": cohort_col,
+        "Method": method_col,
+        "Pattern": np.tile(methods["Pattern"].to_numpy(dtype=object), n_pairs),
+        "IE": np.tile(methods["IE"].to_numpy(dtype=object), n_pairs),
+        "Approach": np.tile(methods["Approach"].to_numpy(dtype=object), n_pairs),
+        "Method_Type": np.tile(methods["Method_Type"].to_numpy(dtype=object), n_pairs),
+        "Ultimate": np.round(ultimate, 2).ravel(),
+        "Pattern_Avg": pattern_avg.ravel(),
+        "Tail_Used": tail_used.ravel(),
+        "IE_Approach": ie_approach.ravel(),
+        "Excl": excl.ravel(),
+        "SC_Ack": sc_ack.ravel(),
+    })
+    df_prior = pd.DataFrame({
+        "Class": cls_col,
+        "Cohort": cohort_col,
+        "Method": method_col,
+        "Ultimate": np.round(prior_ultimate, 2).ravel(),
+    })
+    return df_ultimates, df_prior
+
+
 # ------------------------------------------------------------------ #
 #  Premiums generator — per Class × Cohort for DAG
 # ------------------------------------------------------------------ #
@@ -437,25 +861,28 @@ ENTITIES = {
 def generate_claims(
     rng: np.random.Generator,
     ult_map: dict[tuple[str, str], float],
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
 ) -> pd.DataFrame:
     """
     Generate synthetic individual claims per Class × Cohort.
 
-    Each cohort gets 5–12 claims whose total roughly aligns with the
-    cumulative actuals. A subset of claims are given large movements
-    between prior and current valuation to surface in the dashboard.
+    Each cohort gets portfolio.claims_per_cohort (default 5–12) claims
+    whose total roughly aligns with the cumulative actuals. A subset of
+    claims are given large movements between prior and current valuation
+    to surface in the dashboard.
     """
     rows: list[dict] = []
     claim_counter = 1000
+    min_claims, max_claims = portfolio.claims_per_cohort
 
     for (cls_name, cohort), true_ult in ult_map.items():
-        c_idx = cohort_index(cohort)
-        max_observed = valuation_index() - c_idx
+        c_idx = portfolio.cohort_index(cohort)
+        max_observed = portfolio.valuation_index() - c_idx
         if max_observed < 0:
             continue
 
-        maturity = min(max_observed / MAX_DEV_PERIOD, 1.0)
-        n_claims = rng.integers(5, 13)
+        maturity = min(max_observed / portfolio.max_dev_period, 1.0)
+        n_claims = rng.integers(min_claims, max_claims + 1)
 
         # Split the total incurred across claims using a Dirichlet
         total_incurred = true_ult * maturity * rng.uniform(0.85, 1.05)
@@ -484,7 +911,8 @@ def generate_claims(
             if status == "Reopened":
                 prior = current * rng.uniform(0.02, 0.15)
 
-            entity = rng.choice(ENTITIES.get(cls_name, ["General"]))
+            entities = portfolio.classes.get(cls_name, {}).get("entities") or ENTITIES.get(cls_name, ["General"])
+            entity = rng.choice(entities)
 
             rows.append({
                 "Class": cls_name,
@@ -499,9 +927,1125 @@ def generate_claims(
     return pd.DataFrame(rows)
 
 
+def claim_ids(n: int, start: int = 1001) -> np.ndarray:
+    """Sequential claim identifiers CLM-01001, CLM-01002, ..."""
+    numbers = pd.Series(np.arange(start, start + n)).astype(str).str.zfill(5)
+    return ("CLM-" + numbers).to_numpy(dtype=object)
+
+
+def generate_claims_vectorized(
+    rng: np.random.Generator,
+    ult_map: dict[tuple[str, str], float],
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
+) -> pd.DataFrame:
+    """
+    Array-based equivalent of generate_claims.
+
+    Claim counts are drawn per cohort, then every per-claim quantity
+    (Dirichlet shares, status, large-mover drift, entity) is drawn once
+    for the whole book. Claims are laid out cohort by cohort, so each
+    cohort is a contiguous segment addressed by its start offset:
+    Dirichlet shares are gamma draws divided by their segment sum, and
+    per-cohort values are broadcast with np.repeat. Schema, row order
+    and Claim_ID numbering match generate_claims; values differ for the
+    same seed.
+    """
+    columns = ["Class", "Cohort", "Claim_ID", "Entity", "Status", "Incurred_Current", "Incurred_Prior"]
+    keys = pd.DataFrame(list(ult_map.keys()), columns=["Class", "Cohort"])
+    true_ult = np.fromiter(ult_map.values(), dtype=float, count=len(keys))
+    max_observed = portfolio.valuation_index() - keys["Cohort"].map(portfolio.cohort_index).to_numpy()
+    observed = max_observed >= 0
+    keys, true_ult, max_observed = keys[observed], true_ult[observed], max_observed[observed]
+    n_pairs = len(keys)
+    if n_pairs == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Per cohort
+    maturity = np.minimum(max_observed / portfolio.max_dev_period, 1.0)
+    min_claims, max_claims = portfolio.claims_per_cohort
+    n_claims = rng.integers(min_claims, max_claims + 1, size=n_pairs)
+    total_incurred = true_ult * maturity * rng.uniform(0.85, 1.05, size=n_pairs)
+    starts = np.concatenate([[0], np.cumsum(n_claims)[:-1]])
+    n_total = int(n_claims.sum())
+
+    # Per claim — Dirichlet(1.5, ..., 1.5) within each cohort segment
+    weights = rng.gamma(1.5, size=n_total)
+    shares = weights / np.repeat(np.add.reduceat(weights, starts), n_claims)
+    current = np.round(np.repeat(total_incurred, n_claims) * shares, 2)
+
+    status = rng.choice(len(CLAIM_STATUSES), size=n_total, p=CLAIM_STATUS_WEIGHTS)
+    is_large_mover = rng.random(n_total) < 0.15
+    large_drift = rng.choice([-1, 1], size=n_total) * rng.uniform(0.20, 0.60, size=n_total)
+    drift = np.where(is_large_mover, large_drift, rng.normal(0, 0.05, size=n_total))
+    prior = np.maximum(0, current * (1 - drift))
+    reopened = status == CLAIM_STATUSES.index("Reopened")
+    prior = np.where(reopened, current * rng.uniform(0.02, 0.15, size=n_total), prior)
+
+    # Entities: each class draws from its own list, flattened into one
+    # array with per-class offsets.
+    class_names = keys["Class"].unique().tolist()
+    entity_lists = [
+        portfolio.classes.get(cls_name, {}).get("entities") or ENTITIES.get(cls_name, ["General"])
+        for cls_name in class_names
+    ]
+    entity_sizes = np.array([len(e) for e in entity_lists])
+    entity_offsets = np.concatenate([[0], np.cumsum(entity_sizes)[:-1]])
+    all_entities = np.array([e for lst in entity_lists for e in lst], dtype=object)
+    class_code = np.repeat(pd.Categorical(keys["Class"], categories=class_names).codes, n_claims)
+    entity_idx = (rng.random(n_total) * entity_sizes[class_code]).astype(int)
+    entity = all_entities[entity_offsets[class_code] + entity_idx]
+
+    return pd.DataFrame({
+        "Class": np.repeat(keys["Class"].to_numpy(dtype=object), n_claims),
+        "Cohort": np.repeat(keys["Cohort"].to_numpy(dtype=object), n_claims),
+        "Claim_ID": claim_ids(n_total),
+        "Entity": entity,
+        "Status": np.asarray(CLAIM_STATUSES, dtype=object)[status],
+        "Incurred_Current": current,
+        "Incurred_Prior": np.round(prior, 2),
+    })
+
+
+# ------------------------------------------------------------------ #
+#  Parallel per-class generation
+# ------------------------------------------------------------------ #
+TABLE_NAMES = (
+    "records", "ultimates", "prior_ultimates", "method_scores",
+    "claims", "premiums", "cohort_claim_counts",
+)
+
+
+def generate_class(
+    cls_name: str,
+    portfolio: Portfolio,
+    seed_seq: np.random.SeedSequence,
+    vectorized: bool = True,
+) -> tuple[pd.DataFrame, ...]:
+    """
+    Every table for one class, drawn from that class's own stream.
+
+    Returns the frames in TABLE_NAMES order. Runs in a worker process
+    under generate_per_class, so it only depends on its arguments.
+    """
+    rng = np.random.default_rng(seed_seq)
+    single = replace(portfolio, classes={cls_name: portfolio.classes[cls_name]})
+    if vectorized:
+        df_records, ult_map = generate_long_data_vectorized(rng, single)
+        df_ultimates, df_prior = generate_ultimates_vectorized(rng, ult_map, single)
+    else:
+        df_records, ult_map = generate_long_data(rng, single)
+        df_ultimates, df_prior = generate_ultimates(rng, ult_map, single)
+    df_scores = generate_method_scores(rng, [cls_name])
+    if vectorized:
+        df_claims = generate_claims_vectorized(rng, ult_map, single)
+    else:
+        df_claims = generate_claims(rng, ult_map, single)
+    df_premiums = generate_premiums(rng, ult_map)
+    df_claim_counts = generate_cohort_claim_counts(df_claims, rng)
+    return df_records, df_ultimates, df_prior, df_scores, df_claims, df_premiums, df_claim_counts
+
+
+def _generate_class_star(args: tuple) -> tuple[pd.DataFrame, ...]:
+    return generate_class(*args)
+
+
+def generate_per_class(
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
+    workers: int = 1,
+    seed: int = SEED,
+    vectorized: bool = True,
+) -> tuple[pd.DataFrame, ...]:
+    """
+    Generate each class on its own random stream, optionally in parallel.
+
+    SeedSequence(seed).spawn() gives class i (in portfolio order) a fixed
+    child stream, so a class's data does not depend on which process
+    draws it or on how many workers there are. Results are concatenated
+    in portfolio order (method_scores in sorted class order, as in the
+    sequential path) and Claim_IDs are renumbered across the book.
+    Output is identical for any `workers`, but differs from the single-
+    stream sequential generators for the same seed.
+    """
+    class_names = list(portfolio.classes)
+    jobs = [
+        (cls_name, portfolio, seed_seq, vectorized)
+        for cls_name, seed_seq in zip(class_names, np.random.SeedSequence(seed).spawn(len(class_names)))
+    ]
+    if workers > 1 and len(jobs) > 1:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_generate_class_star, jobs, chunksize=chunksize))
+    else:
+        results = [generate_class(*job) for job in jobs]
+
+    by_name = dict(zip(class_names, results))
+    tables = []
+    for t, name in enumerate(TABLE_NAMES):
+        order = sorted(class_names) if name == "method_scores" else class_names
+        tables.append(pd.concat([by_name[c][t] for c in order], ignore_index=True))
+
+    df_claims = tables[TABLE_NAMES.index("claims")]
+    df_claims["Claim_ID"] = claim_ids(len(df_claims))
+    return tuple(tables)
+
+
+# ------------------------------------------------------------------ #
+#  Projection engine — ultimates from the generated triangles
+# ------------------------------------------------------------------ #
+# Projection kinds: a claims-based method projects with the chain ladder
+# on its Pattern_Avg, a premium-based one with the BF-family method of
+# its IE_Approach (on the volume-weighted "all" pattern).
+PROJECTION_KINDS = PATTERN_AVGS + IE_APPROACHES
+
+
+def class_cohort_grid(df: pd.DataFrame, column: str, tri: Triangle) -> np.ndarray:
+    """`column` of a Class × Cohort table as an array aligned with `tri`."""
+    grid = df.groupby(["Class", "Cohort"], sort=False)[column].first().unstack()
+    return grid.reindex(index=tri.keys, columns=tri.origins).to_numpy(float)
+
+
+def projection_grid(tri: Triangle, premium: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    """Ultimates of every projection kind: (len(PROJECTION_KINDS), n_classes, n_cohorts)."""
+    cl = reserving.chain_ladder(tri, tuple(PATTERN_AVGS))
+    el = reserving.expected_loss_methods(cl, premium, expected, tuple(IE_APPROACHES))
+    pattern = PATTERN_AVGS.index("all")
+    return np.concatenate([cl.ultimate, np.stack([el[m][pattern] for m in IE_APPROACHES])])
+
+
+def gather_projection(grid: np.ndarray, tri: Triangle, df: pd.DataFrame, kind: pd.Series) -> np.ndarray:
+    """Pick each row's ultimate from `grid` by (kind, Class, Cohort); NaN if absent."""
+    k = pd.Index(PROJECTION_KINDS).get_indexer(kind)
+    c = pd.Index(tri.keys).get_indexer(df["Class"])
+    o = pd.Index(tri.origins).get_indexer(df["Cohort"])
+    found = (k >= 0) & (c >= 0) & (o >= 0)
+    values = grid[np.maximum(k, 0), np.maximum(c, 0), np.maximum(o, 0)]
+    return np.round(np.where(found, values, np.nan), 2)
+
+
+def project_ultimates(
+    df_records: pd.DataFrame,
+    df_ultimates: pd.DataFrame,
+    df_prior_ultimates: pd.DataFrame,
+    df_premiums: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Replace the synthetic Ultimate columns with actual projections.
+
+    Every class, cohort and projection kind is computed in one batch
+    (see reserving.py): chain ladder for claims-based methods, BF / Cape
+    Cod / WA / Trending on Earned premium and the records' Expected
+    ultimate for premium-based ones. Prior ultimates rerun the same
+    projections on the triangles with their latest calendar diagonal
+    removed (see Triangle.remove_diagonals) and Prior_Earned, so cohorts
+    fully developed before the latest valuation keep their ultimate;
+    cohorts with no data at the prior valuation get NaN.
+    Schemas and row order are unchanged.
+    """
+    tri = Triangle.from_records(df_records)
+    expected = class_cohort_grid(df_records[df_records["Type"] == "Expected"], "Value", tri)
+    current = projection_grid(tri, class_cohort_grid(df_premiums, "Earned", tri), expected)
+    prior = projection_grid(
+        tri.remove_diagonals(1), class_cohort_grid(df_premiums, "Prior_Earned", tri), expected,
+    )
+
+    claims_based = df_ultimates["Method_Type"] == "Claims-based"
+    kind = df_ultimates["Pattern_Avg"].where(claims_based, df_ultimates["IE_Approach"])
+    keys = ["Class", "Cohort", "Method"]
+    prior_kind = df_prior_ultimates[keys].merge(
+        df_ultimates[keys].assign(kind=kind), on=keys, how="left",
+    )["kind"]
+
+    df_ultimates = df_ultimates.assign(Ultimate=gather_projection(current, tri, df_ultimates, kind))
+    df_prior_ultimates = df_prior_ultimates.assign(
+        Ultimate=gather_projection(prior, tri, df_prior_ultimates, prior_kind),
+    )
+    return df_ultimates, df_prior_ultimates
+
+
+def mack_table(df_records: pd.DataFrame, df_ultimates: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mack standard errors for every ultimates row, plus a Cohort "Total"
+    row per Class × Method.
+
+    The Mack model runs once per class for all of PATTERN_AVGS (see
+    reserving.mack). Each row takes the coefficient of variation of its
+    Pattern_Avg ("all" for premium-based methods) and applies it to its
+    own Ultimate, so the 27 methods cost one batched model. Totals add
+    the between-cohort parameter covariance of the "all" model, scaled
+    to the method's total ultimate.
+    """
+    tri = Triangle.from_records(df_records)
+    result = reserving.mack(reserving.chain_ladder(tri, tuple(PATTERN_AVGS)))
+
+    claims_based = df_ultimates["Method_Type"] == "Claims-based"
+    kind = df_ultimates["Pattern_Avg"].where(claims_based, "all")
+    a = pd.Index(PATTERN_AVGS).get_indexer(kind)
+    c = pd.Index(tri.keys).get_indexer(df_ultimates["Class"])
+    o = pd.Index(tri.origins).get_indexer(df_ultimates["Cohort"])
+    found = (a >= 0) & (c >= 0) & (o >= 0)
+    cv = np.where(found, result.cv[np.maximum(a, 0), np.maximum(c, 0), np.maximum(o, 0)], np.nan)
+
+    rows = df_ultimates[["Class", "Cohort", "Method", "Ultimate"]].assign(Mack_SE=cv * df_ultimates["Ultimate"])
+
+    # Cross-cohort covariance of the "all" model, per class
+    pattern = PATTERN_AVGS.index("all")
+    covariance = result.total_se[pattern] ** 2 - np.nansum(result.se[pattern] ** 2, axis=-1)
+    cl_total = np.nansum(result.chain_ladder.ultimate[pattern], axis=-1)
+    totals = (
+        rows.assign(variance=rows["Mack_SE"] ** 2)
+        .groupby(["Class", "Method"], sort=False)[["Ultimate", "variance"]].sum()
+        .reset_index()
+    )
+    t = pd.Index(tri.keys).get_indexer(totals["Class"])
+    scale = _safe_ratio(totals["Ultimate"].to_numpy(), cl_total[t])
+    totals["Mack_SE"] = np.sqrt(totals["variance"] + covariance[t] * scale ** 2)
+    totals = totals.drop(columns="variance").assign(Cohort="Total")
+
+    table = pd.concat([rows, totals[rows.columns]], ignore_index=True)
+    table["Mack_CV"] = _safe_ratio(table["Mack_SE"].to_numpy(), table["Ultimate"].to_numpy())
+    return table.round({"Ultimate": 2, "Mack_SE": 2, "Mack_CV": 4})
+
+
+def _safe_ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+
+# ------------------------------------------------------------------ #
+#  Reserving decisions — the dashboard's decision DAG, batched
+# ------------------------------------------------------------------ #
+# Thresholds of the decision DAG (mirror DAG_* in js/dashboard.js).
+DAG_AE_THRESHOLD = 0.05
+DAG_CLAIM_COUNT_THRESHOLD = 0.15
+DAG_LARGE_LOSS_PCT_THRESHOLD = 50
+DAG_PREMIUM_CHANGE_THRESHOLD = 0.10
+# Percentage points above the older-cohort average that count as fanning out
+FAN_THRESHOLD = 10
+# Large loss threshold of classes without one in the portfolio
+DEFAULT_LARGE_LOSS_THRESHOLD = 100_000
+
+# (Driver, Suggestion) of each DAG outcome, in the order the DAG tests them
+# (mirrored by DAG_SUGGESTIONS in js/dashboard.js).
+DAG_OUTCOMES = (
+    ("Trend acceleration", "Check if the pattern is speeding up."),
+    ("Claim frequency", "Check if the pattern was slowing down — movement may be driven by more claims than expected."),
+    ("Large losses", "Keep pattern as-is but treat large losses separately."),
+    ("Premium growth", "Move toward premium-based method."),
+    ("Method mismatch", "Switch to claims-based method."),
+)
+DAG_FALLBACK = ("Unclear", "Manual review of cohort experience.")
+
+
+def development_fraction(dp: np.ndarray, max_dev_period: int) -> np.ndarray:
+    """Share of the ultimate expected by period `dp` (developmentFraction in the dashboard)."""
+    t = np.clip(dp / max_dev_period, 0, 1)
+    return 1 - (1 - t) ** 2
+
+
+def fanning_out(series: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    """
+    detectFanningCohorts over (..., n_cohorts, n_dev) series.
+
+    A cohort fans out when its value at its last observed period is more
+    than FAN_THRESHOLD above the average of the older cohorts observed
+    at that period. Cohorts with no observed cell are not in the series,
+    and a series of fewer than three cohorts never fans. The older-cohort
+    sums and counts at every period are exclusive cumulative sums along
+    the cohort axis, so the test is O(cohorts × periods) rather than the
+    dashboard's rescan of all older cohorts per cohort.
+    """
+    n_dev = series.shape[-1]
+    in_series = observed.any(axis=-1)
+    last = n_dev - 1 - np.argmax(observed[..., ::-1], axis=-1)
+
+    # Running sums over the older cohorts: exclusive cumsum along cohorts
+    older_sum = np.cumsum(np.where(observed, series, 0.0), axis=-2)
+    older_n = np.cumsum(observed, axis=-2)
+    older_sum = np.concatenate([np.zeros_like(older_sum[..., :1, :]), older_sum[..., :-1, :]], axis=-2)
+    older_n = np.concatenate([np.zeros_like(older_n[..., :1, :]), older_n[..., :-1, :]], axis=-2)
+
+    at_last = lambda a: np.take_along_axis(a, last[..., None], axis=-1)[..., 0]
+    n = at_last(older_n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lead = at_last(series) - at_last(older_sum) / n
+    return (
+        in_series
+        & (observed.sum(axis=-1) >= 2)
+        & (n > 0)
+        & (lead > FAN_THRESHOLD)
+        & (in_series.sum(axis=-1) >= 3)[..., None]
+    )
+
+
+def year_one_series(tri: Triangle, periods_per_year: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Incurred / Year 1 (%) series (buildNormSeries in the dashboard): each
+    cohort's actuals as a % of its value one year in, plus the observed
+    mask. Cohorts without a non-zero year-1 value are masked out.
+    """
+    n_classes, n_cohorts, n_dev = tri.shape
+    base = tri.values[:, :, periods_per_year] if periods_per_year < n_dev else np.full((n_classes, n_cohorts), np.nan)
+    has_base = (base != 0) & ~np.isnan(base)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return tri.values / base[..., None] * 100, tri.mask & has_base[..., None]
+
+
+def pct_of_ultimate_series(tri: Triangle, ultimate: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Incurred % of Ultimate series (buildPctSeries in the dashboard) for a
+    (n_methods, n_classes, n_cohorts) method_grid: (n_methods, n_classes,
+    n_cohorts, n_dev) series plus the observed mask. Cohorts without a
+    non-zero ultimate are masked out.
+    """
+    has_ultimate = (ultimate != 0) & ~np.isnan(ultimate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return tri.values / ultimate[..., None] * 100, tri.mask & has_ultimate[..., None]
+
+
+def fanning_table(df_records: pd.DataFrame, df_ultimates: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fanning-out flag of every ultimates row in the method's Incurred % of
+    Ultimate series. The Incurred / Year 1 flag does not depend on the
+    method and is exported per cohort (see norm_fanning_table).
+    """
+    tri = Triangle.from_records(df_records)
+    methods = pd.Index(pd.unique(df_ultimates["Method"]))
+    pct = fanning_out(*pct_of_ultimate_series(tri, method_grid(df_ultimates, tri, methods)))
+
+    m = methods.get_indexer(df_ultimates["Method"])
+    c = pd.Index(tri.keys).get_indexer(df_ultimates["Class"])
+    o = pd.Index(tri.origins).get_indexer(df_ultimates["Cohort"])
+    found = (c >= 0) & (o >= 0)
+    c, o = np.maximum(c, 0), np.maximum(o, 0)
+    return df_ultimates[["Class", "Cohort", "Method"]].assign(
+        Pct_Fanning=found & pct[m, c, o],
+    ).reset_index(drop=True)
+
+
+def norm_fanning_table(df_records: pd.DataFrame, portfolio: Portfolio = DEFAULT_PORTFOLIO) -> pd.DataFrame:
+    """
+    Fanning-out flag of every cohort in the Incurred / Year 1 series: one
+    row per Class × Cohort of norm_series_table, in the same order.
+    """
+    tri = Triangle.from_records(df_records)
+    series, observed = year_one_series(tri, portfolio.periods_per_year)
+    norm = fanning_out(series, observed)
+    c, o = np.nonzero(observed.any(axis=2))
+    return pd.DataFrame({
+        "Class": np.asarray(tri.keys, dtype=object)[c],
+        "Cohort": np.asarray(tri.origins, dtype=object)[o],
+        "Norm_Fanning": norm[c, o],
+    })
+
+
+def norm_series_table(df_records: pd.DataFrame, portfolio: Portfolio = DEFAULT_PORTFOLIO) -> pd.DataFrame:
+    """
+    The Incurred / Year 1 (%) series as a long table: one row per observed
+    Class × Cohort × Development_Period of the cohorts that have a year-1
+    value, ordered by class, cohort and period.
+    """
+    tri = Triangle.from_records(df_records)
+    series, observed = year_one_series(tri, portfolio.periods_per_year)
+    c, o, d = np.nonzero(observed)
+    return pd.DataFrame({
+        "Class": np.asarray(tri.keys, dtype=object)[c],
+        "Cohort": np.asarray(tri.origins, dtype=object)[o],
+        "Development_Period": tri.dev_periods[d],
+        "Norm_Pct": np.round(series[c, o, d], 4),
+    })
+
+
+def expected_to_date(df_records: pd.DataFrame, tri: Triangle, max_dev_period: int) -> np.ndarray:
+    """
+    Expected claims at each cohort's latest actual period, aligned with
+    `tri`: the cohort's first Expected value (its expected-to-ultimate in
+    the dashboard) × development_fraction; 0 or NaN where a cohort has
+    no actuals or no Expected values.
+    """
+    expected_rows = df_records[df_records["Type"] == "Expected"].sort_values("Development_Period", kind="stable")
+    e2u = class_cohort_grid(expected_rows, "Value", tri)
+    return e2u * development_fraction(tri.latest_dev, max_dev_period)
+
+
+def method_grid(df: pd.DataFrame, tri: Triangle, methods: pd.Index) -> np.ndarray:
+    """Ultimate of a Class × Cohort × Method table as (len(methods), n_classes, n_cohorts); NaN if absent."""
+    m = methods.get_indexer(df["Method"])
+    c = pd.Index(tri.keys).get_indexer(df["Class"])
+    o = pd.Index(tri.origins).get_indexer(df["Cohort"])
+    found = (m >= 0) & (c >= 0) & (o >= 0)
+    grid = np.full((len(methods), *tri.shape[:2]), np.nan)
+    # reversed so the first row of a repeated key wins, as in the lookup
+    grid[m[found][::-1], c[found][::-1], o[found][::-1]] = df["Ultimate"].to_numpy(float)[found][::-1]
+    return grid
+
+
+def ae_attribution(
+    df_claims: pd.DataFrame, portfolio: Portfolio = DEFAULT_PORTFOLIO, rounded: bool = True,
+) -> pd.DataFrame:
+    """
+    Split of each Class × Cohort's incurred movement between large and
+    attritional claims (getAEAttribution in the dashboard).
+
+    A claim is large when Incurred_Current reaches its class's
+    large_loss_threshold (DEFAULT_LARGE_LOSS_THRESHOLD if unset). One row
+    per Class × Cohort with claims, in first-seen order. The sums are
+    np.bincount passes over all claims at once; bincount adds in row
+    order, as the dashboard's running totals do. The movements and
+    Large_Pct are rounded for export unless rounded=False.
+    """
+    thresholds = {
+        cls_name: params.get("large_loss_threshold") or DEFAULT_LARGE_LOSS_THRESHOLD
+        for cls_name, params in portfolio.classes.items()
+    }
+    groups = df_claims.groupby(["Class", "Cohort"], sort=False)
+    code = groups.ngroup().to_numpy()
+    n = groups.ngroups
+
+    threshold = df_claims["Class"].map(thresholds).fillna(DEFAULT_LARGE_LOSS_THRESHOLD).to_numpy(float)
+    current = df_claims["Incurred_Current"].to_numpy(float)
+    movement = current - df_claims["Incurred_Prior"].to_numpy(float)
+    large = current >= threshold
+
+    table = groups.size().reset_index(name="Total_Count")
+    table["Threshold"] = table["Class"].map(thresholds).fillna(DEFAULT_LARGE_LOSS_THRESHOLD)
+    total = np.bincount(code, movement, minlength=n)
+    large_movement = np.bincount(code[large], movement[large], minlength=n)
+    table["Total_Movement"] = total
+    table["Large_Movement"] = large_movement
+    table["Attritional_Movement"] = np.bincount(code[~large], movement[~large], minlength=n)
+    table["Large_Count"] = np.bincount(code[large], minlength=n)
+    table["Attritional_Count"] = table["Total_Count"] - table["Large_Count"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table["Large_Pct"] = np.where(total != 0, large_movement / total * 100, 0.0)
+    columns = [
+        "Class", "Cohort", "Threshold", "Total_Movement", "Large_Movement", "Attritional_Movement",
+        "Large_Pct", "Large_Count", "Attritional_Count", "Total_Count",
+    ]
+    if not rounded:
+        return table[columns]
+    return table[columns].round({
+        "Total_Movement": 2, "Large_Movement": 2, "Attritional_Movement": 2, "Large_Pct": 4,
+    })
+
+
+def decision_table(
+    df_records: pd.DataFrame,
+    df_ultimates: pd.DataFrame,
+    df_claims: pd.DataFrame,
+    df_premiums: pd.DataFrame,
+    df_claim_counts: pd.DataFrame,
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
+) -> pd.DataFrame:
+    """
+    The dashboard's reserving decision DAG for every ultimates row.
+
+    One row per Class × Cohort × Method with the cohort's AE_Ratio (latest
+    actual vs the expected-to-ultimate scaled by development_fraction),
+    Fanning_Out (fanning in both the % of ultimate and the year-1
+    normalised series), Large_Loss_Pct (share of incurred movement from
+    large losses) and the DAG's Driver — "" when |AE_Ratio| is within
+    DAG_AE_THRESHOLD. The Suggestion of each Driver is left to the
+    dashboard (see DAG_OUTCOMES). Inputs are gathered into
+    Class × Cohort (× Method) arrays from the triangles, so the whole
+    table costs a few array passes rather than a scan per cohort.
+    Large_Loss_Pct is compared with DAG_LARGE_LOSS_PCT_THRESHOLD before
+    rounding, like the dashboard's running totals.
+    """
+    tri = Triangle.from_records(df_records)
+    keys = ["Class", "Cohort"]
+
+    # A vs E on the latest diagonal
+    expected_at = expected_to_date(df_records, tri, portfolio.max_dev_period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ae_ratio = np.where(expected_at != 0, (tri.latest - expected_at) / expected_at, np.nan)
+
+    methods = pd.Index(pd.unique(df_ultimates["Method"]))
+    ultimate = method_grid(df_ultimates, tri, methods)
+    m = methods.get_indexer(df_ultimates["Method"])
+    c = pd.Index(tri.keys).get_indexer(df_ultimates["Class"])
+    o = pd.Index(tri.origins).get_indexer(df_ultimates["Cohort"])
+    found = (c >= 0) & (o >= 0)
+    claims_based = (df_ultimates["Method_Type"] == "Claims-based").groupby(df_ultimates["Method"], sort=False).any()
+    max_claims_based = np.fmax.reduce(
+        np.where(claims_based.reindex(methods).to_numpy()[:, None, None], ultimate, np.nan), axis=0,
+    )
+
+    # Fanning in both the % of ultimate and the year-1 normalised series
+    pct_fanning = fanning_out(*pct_of_ultimate_series(tri, ultimate))
+    norm_fanning = fanning_out(*year_one_series(tri, portfolio.periods_per_year))
+    both_fanning = pct_fanning & norm_fanning
+
+    # Share of incurred movement from large losses (0 for cohorts without claims)
+    df_attribution = ae_attribution(df_claims, portfolio, rounded=False)
+    large_pct = np.nan_to_num(class_cohort_grid(df_attribution, "Large_Pct", tri))
+
+    earned = class_cohort_grid(df_premiums, "Earned", tri)
+    prior_earned = np.nan_to_num(class_cohort_grid(df_premiums, "Prior_Earned", tri))
+    count = class_cohort_grid(df_claim_counts, "Count_Current", tri)
+    prior_count = class_cohort_grid(df_claim_counts, "Count_Prior", tri)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        premium_change = np.where(prior_earned != 0, (earned - prior_earned) / prior_earned, 0.0)
+        count_up = (prior_count > 0) & ((count - prior_count) / prior_count >= DAG_CLAIM_COUNT_THRESHOLD)
+
+    # Gather every input onto the ultimates rows and walk the DAG
+    c, o = np.maximum(c, 0), np.maximum(o, 0)
+    cell = lambda grid, fill=np.nan: np.where(found, grid[c, o], fill)
+    ae = cell(ae_ratio)
+    fanning = np.where(found, both_fanning[m, c, o], False)
+    large = cell(large_pct)
+    premium_based = (df_ultimates["Method_Type"] == "Premium-based").to_numpy()
+    outcome = np.select(
+        [
+            fanning,
+            cell(count_up, False),
+            large >= DAG_LARGE_LOSS_PCT_THRESHOLD,
+            cell(premium_change) >= DAG_PREMIUM_CHANGE_THRESHOLD,
+            premium_based & (cell(max_claims_based) > np.where(found, ultimate[m, c, o], np.nan)),
+        ],
+        np.arange(len(DAG_OUTCOMES)),
+        len(DAG_OUTCOMES),
+    )
+    over = np.abs(ae) > DAG_AE_THRESHOLD
+    drivers = np.array([driver for driver, _ in (*DAG_OUTCOMES, DAG_FALLBACK)], dtype=object)
+
+    return df_ultimates[keys + ["Method"]].assign(
+        AE_Ratio=np.round(ae, 4),
+        Fanning_Out=fanning,
+        Large_Loss_Pct=np.round(large, 2),
+        Driver=np.where(over, drivers[outcome], ""),
+    ).reset_index(drop=True)
+
+
+def method_summary(
+    df_records: pd.DataFrame,
+    df_ultimates: pd.DataFrame,
+    df_prior_ultimates: pd.DataFrame,
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
+) -> pd.DataFrame:
+    """
+    A vs E and ultimate change of every Class × Method, summed over cohorts
+    (getMethodAEAndUltChange in the dashboard).
+
+    AE_Ratio compares the class's total latest actual with its total
+    expected_to_date over cohorts with an expected value, so it is the
+    same for every method of a class. Ultimate_Current / Ultimate_Prior
+    total the cohorts with actuals and both ultimates (prior non-zero),
+    and Ult_Change is their relative change. Ratios are NaN (null) when
+    their denominator is 0. Rows follow the first-seen Class × Method
+    order of `df_ultimates`.
+    """
+    tri = Triangle.from_records(df_records)
+    expected_at = expected_to_date(df_records, tri, portfolio.max_dev_period)
+    counted = (expected_at != 0) & ~np.isnan(expected_at)
+    # cumsum adds cohorts in order, as the dashboard does, so the totals
+    # match its running sums exactly (np.sum may add pairwise)
+    actual_total = np.cumsum(np.where(counted, tri.latest, 0), axis=1)[:, -1]
+    expected_total = np.cumsum(np.where(counted, expected_at, 0), axis=1)[:, -1]
+
+    methods = pd.Index(pd.unique(df_ultimates["Method"]))
+    current = method_grid(df_ultimates, tri, methods)
+    prior = method_grid(df_prior_ultimates, tri, methods)
+    paired = tri.mask.any(axis=2) & ~np.isnan(current) & ~np.isnan(prior) & (prior != 0)
+    current_total = np.cumsum(np.where(paired, current, 0), axis=2)[..., -1]
+    prior_total = np.cumsum(np.where(paired, prior, 0), axis=2)[..., -1]
+
+    rows = df_ultimates[["Class", "Method"]].drop_duplicates().reset_index(drop=True)
+    c = pd.Index(tri.keys).get_indexer(rows["Class"])
+    m = methods.get_indexer(rows["Method"])
+    found = c >= 0
+    c = np.maximum(c, 0)
+    a, e = np.where(found, actual_total[c], 0), np.where(found, expected_total[c], 0)
+    cur, pri = np.where(found, current_total[m, c], 0), np.where(found, prior_total[m, c], 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return rows.assign(
+            AE_Ratio=np.where(e != 0, (a - e) / e, np.nan),
+            Ult_Change=np.where(pri != 0, (cur - pri) / pri, np.nan),
+            Ultimate_Current=np.round(cur, 2),
+            Ultimate_Prior=np.round(pri, 2),
+        )
+
+
 # ------------------------------------------------------------------ #
 #  Export
 # ------------------------------------------------------------------ #
+COLUMNAR_FORMAT_VERSION = 1
+
+# Low-cardinality string columns written as {dictionary, codes} pairs
+# in the columnar layout.
+DICTIONARY_COLUMNS = ("Class", "Cohort", "Method", "Type", "Driver")
+
+
+def json_nulls(col: pd.Series) -> pd.Series:
+    """
+    Return `col` with NaN replaced by None for valid JSON.
+
+    Integer and boolean columns cannot hold NaN and are returned as-is,
+    as are columns with no missing values; only the remainder (e.g.
+    Pattern_Avg / IE_Approach in ultimates) is converted to object.
+    """
+    if col.dtype.kind in "biu" or not col.hasnans:
+        return col
+    return col.astype(object).where(col.notna(), None)
+
+
+def to_records(df: pd.DataFrame) -> list[dict]:
+    """
+    Convert a DataFrame to JSON-ready row dicts, NaN → None column-wise.
+
+    Columns are unboxed once with tolist() and zipped into rows, which is
+    considerably cheaper than to_dict(orient="records") on wide tables.
+    """
+    names = list(df.columns)
+    columns = [json_nulls(df[name]).tolist() for name in names]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+def to_columnar(df: pd.DataFrame) -> dict:
+    """
+    Columnar encoding of a table: one array per column, NaN → None.
+
+    Columns in DICTIONARY_COLUMNS become {"dictionary": [...], "codes": [...]}
+    where a code of -1 marks a missing value.
+    """
+    columns = {name: columnar_column(name, df[name]) for name in df.columns}
+    return {"length": len(df), "columns": columns}
+
+
+def columnar_column(name: str, col: pd.Series) -> list | dict:
+    """One column of to_columnar(): a plain list, or dictionary + codes."""
+    if name in DICTIONARY_COLUMNS:
+        codes, uniques = pd.factorize(col, sort=True)
+        return {"dictionary": uniques.tolist(), "codes": codes.tolist()}
+    return json_nulls(col).tolist()
+
+
+# ------------------------------------------------------------------ #
+#  Streaming JSON
+# ------------------------------------------------------------------ #
+EXPORT_CHUNK_ROWS = 10_000
+
+
+class StreamedArray:
+    """JSON array whose items arrive as an iterable of lists (chunks)."""
+
+    def __init__(self, chunks: Iterable[list]):
+        self.chunks = chunks
+
+
+class StreamedObject:
+    """JSON object built from an iterable of (key, value) pairs, lazily."""
+
+    def __init__(self, items: Iterable[tuple[str, object]]):
+        self.items = items
+
+
+def iter_json(value: object, indent: int | None = None, depth: int = 0) -> Iterator[str]:
+    """
+    Encode `value` as JSON text in pieces.
+
+    StreamedArray / StreamedObject values are encoded one chunk or one
+    member at a time, so only the piece being written is held in memory;
+    anything else goes through json.dumps. The concatenated output is
+    byte-identical to json.dumps of the equivalent plain structure with
+    the same `indent` (indent=None means compact separators).
+    """
+    pad = "\n" + " " * (indent * depth) if indent is not None else ""
+    inner_pad = "\n" + " " * (indent * (depth + 1)) if indent is not None else ""
+
+    if isinstance(value, StreamedArray):
+        close = pad + "]"
+        wrote = False
+        for chunk in value.chunks:
+            if not len(chunk):
+                continue
+            text = dump_json(chunk, indent, depth)
+            yield ("," if wrote else "[") + text[1:len(text) - len(close)]
+            wrote = True
+        yield close if wrote else "[]"
+    elif isinstance(value, StreamedObject):
+        key_sep = ": " if indent is not None else ":"
+        wrote = False
+        for key, member in value.items:
+            yield ("," if wrote else "{") + inner_pad + json.dumps(key) + key_sep
+            yield from iter_json(member, indent, depth + 1)
+            wrote = True
+        yield pad + "}" if wrote else "{}"
+    else:
+        yield dump_json(value, indent, depth)
+
+
+def dump_json(value: object, indent: int | None, depth: int) -> str:
+    """json.dumps(value) as it appears nested `depth` levels deep."""
+    if indent is None:
+        return json.dumps(value, separators=(",", ":"))
+    return json.dumps(value, indent=indent).replace("\n", "\n" + " " * (indent * depth))
+
+
+def record_chunks(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[list[dict]]:
+    """to_records() of `df`, `chunk_rows` rows at a time."""
+    for start in range(0, len(df), chunk_rows):
+        yield to_records(df.iloc[start:start + chunk_rows])
+
+
+def streamed_columnar(df: pd.DataFrame) -> StreamedObject:
+    """to_columnar() of `df`, converting one column at a time."""
+    columns = StreamedObject((name, columnar_column(name, df[name])) for name in df.columns)
+    return StreamedObject([("length", len(df)), ("columns", columns)])
+
+
+# Nested key paths indexed by build_lookup(), per table.
+LOOKUP_KEYS = {
+    "ultimates": ("Class", "Cohort", "Method"),
+    "prior_ultimates": ("Class", "Cohort", "Method"),
+    "method_scores": ("Class", "Method"),
+    "premiums": ("Class", "Cohort"),
+    "cohort_claim_counts": ("Class", "Cohort"),
+    "reserve_distribution": ("Class", "Cohort"),
+    "mack": ("Class", "Cohort", "Method"),
+    "ultimate_bands": ("Class", "Cohort"),
+    "decisions": ("Class", "Cohort", "Method"),
+    "ae_attribution": ("Class", "Cohort"),
+    "method_summary": ("Class", "Method"),
+    "fanning": ("Class", "Cohort", "Method"),
+    "norm_fanning": ("Class", "Cohort"),
+    "norm_series": ("Class", "Cohort", "Development_Period"),
+}
+
+
+def build_lookup(df: pd.DataFrame, keys: tuple[str, ...]) -> dict:
+    """
+    Nested {key1: {key2: ... row position}} index over `keys`.
+
+    Positions refer to the table as exported, so the dashboard resolves
+    e.g. ultimates[Class][Cohort][Method] in O(1) instead of scanning.
+    The first row wins if a key repeats, matching a linear scan.
+    """
+    root: dict = {}
+    for pos, key in enumerate(zip(*(df[k].tolist() for k in keys))):
+        node = root
+        for part in key[:-1]:
+            node = node.setdefault(part, {})
+        node.setdefault(key[-1], pos)
+    return root
+
+
+def iter_lookups(tables: dict[str, pd.DataFrame]) -> Iterator[tuple[str, dict | str]]:
+    """
+    (name, build_lookup()) of every table in LOOKUP_KEYS, lazily.
+
+    A table whose key columns match an earlier table's row for row (e.g.
+    prior_ultimates and decisions follow ultimates) gets that table's
+    name instead of a second copy of the same index.
+    """
+    built: list[str] = []
+    for name, df in tables.items():
+        if name not in LOOKUP_KEYS:
+            continue
+        keys = LOOKUP_KEYS[name]
+        same = next((
+            other for other in built
+            if LOOKUP_KEYS[other] == keys and len(tables[other]) == len(df)
+            and all(np.array_equal(tables[other][k].to_numpy(), df[k].to_numpy()) for k in keys)
+        ), None)
+        if same is not None:
+            yield name, same
+        else:
+            built.append(name)
+            yield name, build_lookup(df, keys)
+
+
+# ± standard errors of the Mack range in ultimate_bands (mirrors MACK_Z
+# in js/dashboard.js).
+MACK_Z = 1.96
+
+
+def ultimate_bands(
+    df_ultimates: pd.DataFrame, df_scores: pd.DataFrame, df_mack: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Ultimate band of every Class × Cohort at every quality threshold.
+
+    One row per Class × Cohort (in ultimates order) whose other columns
+    are lists over the cohort's methods, sorted by Proj_Quality
+    descending. The methods passing a threshold are a prefix of that
+    order, so the dashboard finds the prefix length by binary search on
+    Proj_Quality and reads Band_Min / Band_Max / Band_Count (running min
+    / max / count of non-null Ultimate) at its last index. With
+    `df_mack`, Stat_Min / Stat_Max are the running range of
+    Ultimate ∓ MACK_Z · Mack_SE. Missing values are None.
+    """
+    keys = ["Class", "Cohort"]
+    df = df_ultimates[keys + ["Method", "Ultimate"]].merge(
+        df_scores[["Class", "Method", "Proj_Quality"]], on=["Class", "Method"], how="left",
+    )
+    if df_mack is not None:
+        df = df.merge(df_mack[keys + ["Method", "Mack_SE"]], on=keys + ["Method"], how="left")
+    class_code = pd.factorize(df["Class"])[0]
+    pair_code = pd.factorize(pd.MultiIndex.from_frame(df[keys]))[0]
+    order = np.lexsort((-df["Proj_Quality"].fillna(-np.inf).to_numpy(), pair_code, class_code))
+    df = df.iloc[order].reset_index(drop=True)
+
+    df["Counted"] = df["Ultimate"].notna().astype(int)
+    running = {"Band_Min": ("Ultimate", "cummin"), "Band_Max": ("Ultimate", "cummax")}
+    if df_mack is not None:
+        df["Stat_Low"] = df["Ultimate"] - MACK_Z * df["Mack_SE"]
+        df["Stat_High"] = df["Ultimate"] + MACK_Z * df["Mack_SE"]
+        running.update(Stat_Min=("Stat_Low", "cummin"), Stat_Max=("Stat_High", "cummax"))
+
+    groups = df.groupby(keys, sort=False)
+    bands = df[keys + ["Proj_Quality"]].copy()
+    for name, (column, func) in running.items():
+        bands[name] = getattr(groups[column], func)()
+    # cummin / cummax leave NaN at rows with no value; carry the band on
+    bands[list(running)] = bands.groupby(keys, sort=False)[list(running)].ffill().round(2)
+    bands["Band_Count"] = groups["Counted"].cumsum()
+
+    # Collapse each cohort's rows (contiguous after the sort) into lists
+    sorted_pairs = pair_code[order]
+    starts = np.flatnonzero(np.r_[True, sorted_pairs[1:] != sorted_pairs[:-1]]) if len(df) else np.array([], int)
+    table = bands.iloc[starts][keys].reset_index(drop=True)
+    for name in ["Proj_Quality", *running, "Band_Count"]:
+        values = bands[name].to_numpy()
+        if values.dtype.kind == "f":
+            values = np.where(np.isnan(values), None, values.astype(object))
+        table[name] = [chunk.tolist() for chunk in np.split(values, starts[1:])]
+    return table
+
+
+PRECOMPRESSED_SUFFIXES = (".gz", ".br")
+COPY_CHUNK_SIZE = 1 << 20
+BROTLI_QUALITY = 9
+
+
+def write_precompressed(path: Path) -> list[Path]:
+    """
+    Write `path`.gz (and `path`.br when brotli is installed) alongside
+    `path`, streaming in chunks. The gzip header carries no name or
+    mtime, so identical content always compresses to identical bytes.
+    """
+    gz_path = path.with_name(path.name + ".gz")
+    with path.open("rb") as src, gz_path.open("wb") as raw, \
+            gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=9, mtime=0) as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+    written = [gz_path]
+
+    if brotli is not None:
+        br_path = path.with_name(path.name + ".br")
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        with path.open("rb") as src, br_path.open("wb") as dst:
+            while chunk := src.read(COPY_CHUNK_SIZE):
+                dst.write(compressor.process(chunk))
+            dst.write(compressor.finish())
+        written.append(br_path)
+
+    return written
+
+
+def remove_precompressed(path: Path) -> None:
+    """Delete any precompressed siblings of `path` so none go stale."""
+    for suffix in PRECOMPRESSED_SUFFIXES:
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_manifest(output_dir: Path, entry: Path, files: list[Path]) -> Path:
+    """
+    Write manifest.json describing the exported data files.
+
+    The dashboard fetches the (tiny) manifest with revalidation and then
+    requests `entry` by content hash, so unchanged data is served from
+    the browser cache instead of being downloaded again.
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "generated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "entry": entry.relative_to(output_dir).as_posix(),
+        "files": {
+            path.relative_to(output_dir).as_posix(): {
+                "sha256": file_sha256(path),
+                "bytes": path.stat().st_size,
+            }
+            for path in files
+        },
+    }
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return manifest_path
+
+
+INDEX_NAME = "index.json"
+SHARD_DIR = "shards"
+
+
+def shard_slug(name: str) -> str:
+    """File-name-safe slug for a class name ("Property Cat" → "property-cat")."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "class"
+
+
+def remove_shards(output_dir: Path) -> None:
+    """Delete a previous sharded export (index + shard directory)."""
+    index_path = output_dir / INDEX_NAME
+    index_path.unlink(missing_ok=True)
+    remove_precompressed(index_path)
+    shutil.rmtree(output_dir / SHARD_DIR, ignore_errors=True)
+
+
+def write_payload(
+    path: Path, payload: dict, tables: dict[str, pd.DataFrame], columnar: bool, precompress: bool,
+    compact: bool = False,
+) -> Path:
+    """
+    Write `payload` plus `tables` as one JSON document (rows or columnar).
+
+    Row tables named in LOOKUP_KEYS also get a position index under
+    "lookup" (see iter_lookups); columnar output leaves it out, since the
+    dashboard builds it from the decoded rows in one pass. The document is streamed to disk (see iter_json): row tables are
+    encoded EXPORT_CHUNK_ROWS rows at a time and columnar tables one
+    column at a time, so peak memory tracks the largest chunk rather
+    than the whole payload. Row output is indented unless `compact`;
+    columnar output is always compact.
+    """
+    remove_precompressed(path)
+    fields: list[tuple[str, object]] = list(payload.items())
+    if columnar:
+        fields = [("format", "columnar"), ("format_version", COLUMNAR_FORMAT_VERSION), *fields]
+        fields += [(name, streamed_columnar(df)) for name, df in tables.items()]
+    else:
+        fields += [(name, StreamedArray(record_chunks(df))) for name, df in tables.items()]
+    if not columnar and any(name in LOOKUP_KEYS for name in tables):
+        fields.append(("lookup", StreamedObject(iter_lookups(tables))))
+
+    indent = None if columnar or compact else 2
+    with path.open("w", encoding="utf-8") as f:
+        for piece in iter_json(StreamedObject(fields), indent):
+            f.write(piece)
+    if precompress:
+        write_precompressed(path)
+    return path
+
+
+def write_sharded(
+    output_dir: Path, payload: dict, tables: dict[str, pd.DataFrame], columnar: bool, precompress: bool,
+    compact: bool = False,
+) -> list[Path]:
+    """
+    Write one shard per Class under shards/ plus a small index.json.
+
+    The index carries the payload metadata (classes, methods, thresholds)
+    and a "shards" map of class → {path, bytes, sha256}, so the dashboard
+    can paint after fetching the index and a single shard. Returns the
+    written files, index first.
+    """
+    remove_shards(output_dir)
+    shard_dir = output_dir / SHARD_DIR
+    shard_dir.mkdir(parents=True)
+
+    by_class = {name: dict(tuple(df.groupby("Class", sort=False))) for name, df in tables.items()}
+    shards, files, used = {}, [], set()
+    for cls in payload["classes"]:
+        slug = shard_slug(cls)
+        while slug in used:
+            slug += "-"
+        used.add(slug)
+        path = write_payload(
+            shard_dir / f"{slug}.json",
+            {"class": cls},
+            {name: groups.get(cls, tables[name].iloc[:0]) for name, groups in by_class.items()},
+            columnar, precompress, compact,
+        )
+        shards[cls] = {
+            "path": path.relative_to(output_dir).as_posix(),
+            "bytes": path.stat().st_size,
+            "sha256": file_sha256(path),
+        }
+        files.append(path)
+
+    index_path = write_payload(
+        output_dir / INDEX_NAME, {"layout": "sharded", **payload, "shards": shards}, {},
+        columnar, precompress, compact,
+    )
+    return [index_path, *files]
+
+
+# Tables written by export_binary(). method_scores is left out: its
+# nested SHAP dict has no flat columnar form.
+BINARY_TABLES = (
+    "records", "ultimates", "prior_ultimates", "claims", "premiums", "cohort_claim_counts",
+    "reserve_distribution", "mack", "decisions", "ae_attribution", "method_summary",
+    "fanning", "norm_fanning", "norm_series",
+)
+BINARY_FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+PARQUET_COMPRESSION = "zstd"
+
+
+def to_arrow(df: pd.DataFrame) -> "pa.Table":
+    """
+    Arrow table for `df`: strings as utf8 (readable by Arrow JS) and
+    DICTIONARY_COLUMNS dictionary-encoded.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        col = table.column(i)
+        if pa.types.is_large_string(field.type):
+            col = col.cast(pa.string())
+        if field.name in DICTIONARY_COLUMNS:
+            col = pc.dictionary_encode(col)
+        table = table.set_column(i, field.name, col)
+    return table.replace_schema_metadata(None)
+
+
+def remove_binary(output_dir: Path) -> None:
+    for fmt in BINARY_FORMATS:
+        shutil.rmtree(output_dir / fmt, ignore_errors=True)
+
+
+def export_binary(
+    tables: dict[str, pd.DataFrame], output_dir: Path, formats: Iterable[str], precompress: bool = True,
+) -> list[Path]:
+    """
+    Write BINARY_TABLES as Arrow IPC files (<output_dir>/arrow/<table>.arrow)
+    and/or Parquet (<output_dir>/parquet/<table>.parquet). Requires pyarrow.
+
+    IPC files are left uncompressed, since Arrow JS cannot read
+    compressed buffers, and are precompressed for HTTP instead like the
+    JSON. Parquet files use PARQUET_COMPRESSION internally. Formats not
+    requested are removed so stale binaries never outlive the JSON.
+    """
+    formats = list(formats)
+    if formats and pa is None:
+        raise RuntimeError("Arrow / Parquet export requires pyarrow (pip install pyarrow)")
+    remove_binary(output_dir)
+    files = []
+    for fmt in formats:
+        fmt_dir = output_dir / fmt
+        fmt_dir.mkdir(parents=True)
+        for name in BINARY_TABLES:
+            if name not in tables:
+                continue
+            table = to_arrow(tables[name])
+            path = fmt_dir / f"{name}{BINARY_FORMATS[fmt]}"
+            if fmt == "arrow":
+                with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                if precompress:
+                    write_precompressed(path)
+            else:
+                pq.write_table(table, path, compression=PARQUET_COMPRESSION)
+            files.append(path)
+    return files
+
+
 def export_json(
     df_records: pd.DataFrame,
     df_ultimates: pd.DataFrame,
@@ -511,23 +2055,50 @@ def export_json(
     df_premiums: pd.DataFrame,
     df_claim_counts: pd.DataFrame,
     output_path: Path,
+    columnar: bool = False,
+    precompress: bool = True,
+    sharded: bool = False,
+    portfolio: Portfolio = DEFAULT_PORTFOLIO,
+    compact: bool = False,
+    binary_formats: Iterable[str] = (),
+    extra_tables: dict[str, pd.DataFrame] | None = None,
 ) -> None:
     """
     Write dashboard-ready JSON.
 
     Structure includes records, ultimates (with Method_Type), prior_ultimates,
-    method_scores, claims, premiums, cohort_claim_counts.
+    method_scores, claims, premiums, cohort_claim_counts, any optional
+    `extra_tables` (e.g. reserve_distribution), the ultimate_bands
+    derived from ultimates and method_scores (see ultimate_bands), the
+    large-loss split of every cohort's movement (see ae_attribution), the
+    decision DAG outcome of every ultimates row (see decision_table), the
+    per-method A vs E and ultimate change (see method_summary), plus
+    a "lookup" of row positions keyed Class → Cohort → Method (see
+    build_lookup, iter_lookups; row layout only).
+
+    With columnar=True every table is written via to_columnar() as compact
+    JSON, and the payload carries "format": "columnar" plus
+    "format_version" so the dashboard can decode it. Row tables are
+    indented unless compact=True. Either way the JSON is streamed to disk
+    rather than built in memory (see write_payload).
+
+    With sharded=True `output_path` itself is not written; instead an
+    index.json and one file per Class are written next to it (see
+    write_sharded) and the manifest points the dashboard at the index.
+
+    binary_formats ("arrow", "parquet") additionally writes the flat
+    tables in those formats (see export_binary); they are listed in the
+    manifest but the JSON stays the dashboard's entry point.
+
+    With precompress=True (default) gzip / brotli copies are written next
+    to the JSON for servers that negotiate Content-Encoding. A content-hash
+    manifest.json is written alongside (see write_manifest).
     """
     large_loss_thresholds = {
         cls_name: params["large_loss_threshold"]
-        for cls_name, params in CLASSES.items()
+        for cls_name, params in portfolio.classes.items()
     }
 
-    def sanitise(df: pd.DataFrame) -> list[dict]:
-        """Convert DataFrame to records, replacing NaN with None for valid JSON."""
-        return [{k: (None if pd.isna(v) else v) for k, v in row.items()}
-                for row in df.to_dict(orient="records")]
-
     payload = {
         "title": "Insurance Analytics Dashboard",
         "subtitle": "A vs E Flight Path — Actual vs Expected to Ultimate",
@@ -535,16 +2106,37 @@ def export_json(
         "classes": sorted(df_records["Class"].unique().tolist()),
         "methods": sorted(df_ultimates["Method"].unique().tolist()),
         "large_loss_thresholds": large_loss_thresholds,
-        "records": sanitise(df_records),
-        "ultimates": sanitise(df_ultimates),
-        "prior_ultimates": sanitise(df_prior_ultimates),
-        "method_scores": df_scores.to_dict(orient="records"),
-        "claims": sanitise(df_claims),
-        "premiums": sanitise(df_premiums),
-        "cohort_claim_counts": sanitise(df_claim_counts),
+        "valuation": portfolio.valuation,
+        "periods_per_year": portfolio.periods_per_year,
+        "max_dev_period": portfolio.max_dev_period,
     }
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(payload, indent=2))
+    tables = {
+        "records": df_records,
+        "ultimates": df_ultimates,
+        "prior_ultimates": df_prior_ultimates,
+        "method_scores": df_scores,
+        "claims": df_claims,
+        "premiums": df_premiums,
+        "cohort_claim_counts": df_claim_counts,
+        **(extra_tables or {}),
+    }
+    tables["ultimate_bands"] = ultimate_bands(df_ultimates, df_scores, tables.get("mack"))
+    tables["ae_attribution"] = ae_attribution(df_claims, portfolio)
+    tables["decisions"] = decision_table(
+        df_records, df_ultimates, df_claims, df_premiums, df_claim_counts, portfolio,
+    )
+    tables["method_summary"] = method_summary(df_records, df_ultimates, df_prior_ultimates, portfolio)
+    output_dir = output_path.parent
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if sharded:
+        files = write_sharded(output_dir, payload, tables, columnar, precompress, compact)
+    else:
+        remove_shards(output_dir)
+        files = [write_payload(output_path, payload, tables, columnar, precompress, compact)]
+    binary_formats = list(binary_formats)
+    binary_files = export_binary(tables, output_dir, binary_formats, precompress)
+    write_manifest(output_dir, files[0], files + binary_files)
 
     n_rec = len(df_records)
     n_ult = len(df_ultimates)
@@ -553,21 +2145,219 @@ def export_json(
     n_clm = len(df_claims)
     n_prem = len(df_premiums)
     n_cc = len(df_claim_counts)
-    print(f"Wrote {n_rec} records + {n_ult} ultimates + {n_pri} prior + {n_sc} scores + {n_clm} claims + {n_prem} premiums + {n_cc} claim_counts to {output_path}")
+    print(f"Wrote {n_rec} records + {n_ult} ultimates + {n_pri} prior + {n_sc} scores + {n_clm} claims + {n_prem} premiums + {n_cc} claim_counts to {files[0]}"
+          + "".join(f" + {len(df)} {name}" for name, df in (extra_tables or {}).items())
+          + (f" + {len(files) - 1} shards" if sharded else "")
+          + (f" + {len(binary_files)} {'/'.join(binary_formats)} files" if binary_files else ""))
 
 
 # ------------------------------------------------------------------ #
 #  Entry point
 # ------------------------------------------------------------------ #
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate dummy reserving data for the dashboard.")
+    parser.add_argument(
+        "--vectorized", action="store_true",
+        help="use the array-based generators (faster at scale; different draws for the same seed)",
+    )
+    parser.add_argument(
+        "--projection-engine", action="store_true",
+        help="replace the synthetic ultimates with chain-ladder / BF / Cape Cod projections "
+             "of the generated triangles",
+    )
+    parser.add_argument(
+        "--mack", action="store_true",
+        help="export Mack chain-ladder standard errors for every ultimate as the mack table",
+    )
+    parser.add_argument(
+        "--fanning", action="store_true",
+        help="export the development charts' fanning-out flags and Incurred / Year 1 series "
+             "(fanning, norm_fanning and norm_series tables)",
+    )
+    parser.add_argument(
+        "--bootstrap", type=int, metavar="SIMS",
+        help="run an ODP bootstrap of the triangles with SIMS simulations and export "
+             "P5/P50/P95 ultimates per Class × Cohort as reserve_distribution",
+    )
+    parser.add_argument(
+        "--bootstrap-workers", type=int, metavar="N",
+        help="processes for --bootstrap (default: all CPUs; results do not depend on N)",
+    )
+    parser.add_argument(
+        "--columnar", action="store_true",
+        help="write tables as column arrays with dictionary-encoded keys (compact JSON)",
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="write row-oriented JSON without indentation (columnar output is always compact)",
+    )
+    parser.add_argument(
+        "--arrow", action="store_true",
+        help="also write data/arrow/<table>.arrow (Arrow IPC, requires pyarrow)",
+    )
+    parser.add_argument(
+        "--parquet", action="store_true",
+        help="also write data/parquet/<table>.parquet (requires pyarrow)",
+    )
+    parser.add_argument(
+        "--no-precompress", action="store_true",
+        help="skip writing .gz / .br copies of the JSON output",
+    )
+    parser.add_argument(
+        "--sharded", action="store_true",
+        help="write data/index.json plus one file per class under data/shards/",
+    )
+    parser.add_argument(
+        "--workers", type=int, nargs="?", const=os.cpu_count() or 1, metavar="N",
+        help="draw each class from its own SeedSequence stream, generating classes in N "
+             "processes (default: all CPUs); output is identical for any N, but differs from "
+             "the default single stream. Per-class streams are not vectorized across classes, "
+             "so this is a net loss unless several CPUs are available",
+    )
+    parser.add_argument(
+        "--profile", type=Path, metavar="REPORT",
+        help="write per-stage wall/CPU time, memory peaks and row counts to REPORT (JSON)",
+    )
+    parser.add_argument(
+        "--profile-no-tracemalloc", action="store_true",
+        help="with --profile, skip tracemalloc (lower overhead, no Python-heap peaks)",
+    )
+    parser.add_argument(
+        "--cprofile-dir", type=Path, metavar="DIR",
+        help="with --profile, also dump a cProfile <stage>.prof per stage into DIR",
+    )
+    scale = parser.add_argument_group(
+        "portfolio scale",
+        "Generate a procedural portfolio instead of the built-in three classes. "
+        "Settings come from --portfolio (JSON of build_portfolio arguments) "
+        "and are overridden by the flags below.",
+    )
+    scale.add_argument("--portfolio", type=Path, metavar="CONFIG", help="JSON portfolio config file")
+    scale.add_argument("--classes", type=int, dest="n_classes", metavar="N", help="number of classes")
+    scale.add_argument("--granularity", choices=sorted(GRANULARITIES), help="cohort granularity")
+    scale.add_argument("--years", type=int, help="years of cohort history")
+    scale.add_argument("--dev-periods", type=int, dest="max_dev_period", metavar="N",
+                       help="development periods tracked (default: three years)")
+    scale.add_argument("--claims-per-cohort", type=int, nargs=2, metavar=("MIN", "MAX"),
+                       help="range of individual claims per cohort")
+    scale.add_argument("--start-year", type=int, help="year of the first cohort")
+    scale.add_argument("--portfolio-seed", type=int, dest="seed", metavar="SEED",
+                       help="seed for the procedural class parameters")
+
+    args = parser.parse_args(argv)
+    if args.profile is None and (args.cprofile_dir or args.profile_no_tracemalloc):
+        parser.error("--cprofile-dir / --profile-no-tracemalloc require --profile")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.bootstrap is not None and args.bootstrap < 1:
+        parser.error("--bootstrap needs at least 1 simulation")
+    if args.bootstrap_workers is not None:
+        if args.bootstrap is None:
+            parser.error("--bootstrap-workers requires --bootstrap")
+        if args.bootstrap_workers < 1:
+            parser.error("--bootstrap-workers must be at least 1")
+    args.binary_formats = [fmt for fmt in BINARY_FORMATS if getattr(args, fmt)]
+    if args.binary_formats and pa is None:
+        parser.error("--arrow / --parquet require pyarrow (pip install pyarrow)")
+    try:
+        args.portfolio = portfolio_from_args(args)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    return args
+
+
+PORTFOLIO_OPTIONS = (
+    "n_classes", "granularity", "years", "max_dev_period", "claims_per_cohort", "start_year", "seed",
+)
+
+
+def portfolio_from_args(args: argparse.Namespace) -> Portfolio:
+    """DEFAULT_PORTFOLIO, or build_portfolio() from --portfolio plus flag overrides."""
+    overrides = {
+        name: getattr(args, name) for name in PORTFOLIO_OPTIONS
+        if getattr(args, name) is not None
+    }
+    if args.portfolio is None and not overrides:
+        return DEFAULT_PORTFOLIO
+    config = load_portfolio_config(args.portfolio) if args.portfolio else {}
+    config.update(overrides)
+    return build_portfolio(**config)
+
+
 if __name__ == "__main__":
+    args = parse_args()
     rng = np.random.default_rng(SEED)
+    portfolio = args.portfolio
+    profiler = StageProfiler(
+        enabled=args.profile is not None,
+        trace_memory=not args.profile_no_tracemalloc,
+        cprofile_dir=args.cprofile_dir,
+    )
+
+    if args.workers:
+        with profiler.stage("per_class") as stage:
+            (df_records, df_ultimates, df_prior_ultimates, df_scores,
+             df_claims, df_premiums, df_claim_counts) = generate_per_class(
+                portfolio, workers=args.workers, vectorized=args.vectorized,
+            )
+            stage.rows = sum(map(len, (df_records, df_ultimates, df_prior_ultimates, df_scores,
+                                       df_claims, df_premiums, df_claim_counts)))
+    else:
+        with profiler.stage("long_data") as stage:
+            if args.vectorized:
+                df_records, ult_map = generate_long_data_vectorized(rng, portfolio)
+            else:
+                df_records, ult_map = generate_long_data(rng, portfolio)
+            stage.rows = len(df_records)
 
-    df_records, ult_map = generate_long_data(rng)
-    df_ultimates, df_prior_ultimates = generate_ultimates(rng, ult_map)
-    df_scores = generate_method_scores(rng, sorted(CLASSES.keys()))
-    df_claims = generate_claims(rng, ult_map)
-    df_premiums = generate_premiums(rng, ult_map)
-    df_claim_counts = generate_cohort_claim_counts(df_claims, rng)
+        with profiler.stage("ultimates") as stage:
+            if args.vectorized:
+                df_ultimates, df_prior_ultimates = generate_ultimates_vectorized(rng, ult_map, portfolio)
+            else:
+                df_ultimates, df_prior_ultimates = generate_ultimates(rng, ult_map, portfolio)
+            stage.rows = len(df_ultimates) + len(df_prior_ultimates)
+        with profiler.stage("method_scores") as stage:
+            df_scores = generate_method_scores(rng, sorted(portfolio.classes))
+            stage.rows = len(df_scores)
+        with profiler.stage("claims") as stage:
+            if args.vectorized:
+                df_claims = generate_claims_vectorized(rng, ult_map, portfolio)
+            else:
+                df_claims = generate_claims(rng, ult_map, portfolio)
+            stage.rows = len(df_claims)
+        with profiler.stage("premiums") as stage:
+            df_premiums = generate_premiums(rng, ult_map)
+            stage.rows = len(df_premiums)
+        with profiler.stage("claim_counts") as stage:
+            df_claim_counts = generate_cohort_claim_counts(df_claims, rng)
+            stage.rows = len(df_claim_counts)
+
+    if args.projection_engine:
+        with profiler.stage("projection") as stage:
+            df_ultimates, df_prior_ultimates = project_ultimates(
+                df_records, df_ultimates, df_prior_ultimates, df_premiums,
+            )
+            stage.rows = len(df_ultimates) + len(df_prior_ultimates)
+
+    extra_tables = {}
+    if args.mack:
+        with profiler.stage("mack") as stage:
+            extra_tables["mack"] = mack_table(df_records, df_ultimates)
+            stage.rows = len(extra_tables["mack"])
+    if args.fanning:
+        with profiler.stage("fanning") as stage:
+            extra_tables["fanning"] = fanning_table(df_records, df_ultimates)
+            extra_tables["norm_fanning"] = norm_fanning_table(df_records, portfolio)
+            extra_tables["norm_series"] = norm_series_table(df_records, portfolio)
+            stage.rows = len(extra_tables["fanning"]) + len(extra_tables["norm_series"])
+    if args.bootstrap:
+        with profiler.stage("bootstrap") as stage:
+            distribution = bootstrap.bootstrap_ultimates(
+                Triangle.from_records(df_records), n_sims=args.bootstrap, seed=SEED,
+                workers=args.bootstrap_workers or os.cpu_count() or 1,
+            )
+            extra_tables["reserve_distribution"] = distribution.to_frame().round(2)
+            stage.rows = len(extra_tables["reserve_distribution"])
 
     # Preview
     print("=== Records (first 10) ===")
@@ -593,4 +2383,24 @@ if __name__ == "__main__":
     print()
 
     out = Path(__file__).resolve().parent.parent / "data" / "analytics.json"
-    export_json(df_records, df_ultimates, df_prior_ultimates, df_scores, df_claims, df_premiums, df_claim_counts, out)
+    tables = (df_records, df_ultimates, df_prior_ultimates, df_scores, df_claims, df_premiums, df_claim_counts)
+    with profiler.stage("export") as stage:
+        export_json(
+            *tables, out,
+            columnar=args.columnar, precompress=not args.no_precompress, sharded=args.sharded,
+            portfolio=portfolio, compact=args.compact, binary_formats=args.binary_formats,
+            extra_tables=extra_tables,
+        )
+        stage.rows = sum(len(df) for df in (*tables, *extra_tables.values()))
+
+    if args.profile:
+        profiler.write_report(
+            args.profile,
+            argv=sys.argv[1:], seed=SEED, vectorized=args.vectorized, workers=args.workers,
+            projection_engine=args.projection_engine, mack=args.mack, fanning=args.fanning, bootstrap=args.bootstrap,
+            classes=len(portfolio.classes), cohorts=len(portfolio.cohorts),
+            periods_per_year=portfolio.periods_per_year, max_dev_period=portfolio.max_dev_period,
+            columnar=args.columnar, sharded=args.sharded, precompress=not args.no_precompress,
+        )
+        profiler.close()
+        print(f"\n=== Stage profile ===\n{profiler.summary()}\nWrote {args.profile}")
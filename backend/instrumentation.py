@@ -0,0 +1,151 @@
+"""
+Per-stage timing and memory instrumentation for the data pipeline.
+
+Wrap each pipeline stage in `profiler.stage(name)` and record how many
+rows it produced; the profiler captures wall time, CPU time, the
+tracemalloc peak during the stage and the process peak RSS after it.
+
+Usage:
+    profiler = StageProfiler(enabled=True, cprofile_dir=Path("prof"))
+    with profiler.stage("claims") as stage:
+        df_claims = generate_claims(rng, ult_map)
+        stage.rows = len(df_claims)
+    profiler.write_report(Path("profile.json"))
+
+A disabled profiler (the default) runs stages with no overhead and
+writes nothing, so call sites need no conditionals.
+"""
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+import cProfile
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+REPORT_VERSION = 1
+
+
+@dataclass
+class StageStats:
+    """Measurements for one pipeline stage."""
+    name: str
+    rows: int | None = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    py_peak_bytes: int | None = None
+    max_rss_bytes: int | None = None
+
+
+def max_rss_bytes() -> int | None:
+    """Peak resident set size of this process so far (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageProfiler:
+    """
+    Collects StageStats for named pipeline stages.
+
+    trace_memory starts tracemalloc (numpy and pandas buffers are traced)
+    so each stage reports its own Python-heap peak; it slows allocation-
+    heavy stages noticeably, so wall times are best compared between runs
+    with the same settings. With cprofile_dir set, every stage is also run
+    under cProfile and dumped to <cprofile_dir>/<stage>.prof.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        trace_memory: bool = True,
+        cprofile_dir: Path | None = None,
+    ):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.cprofile_dir = cprofile_dir if enabled else None
+        self.stages: list[StageStats] = []
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        stats = StageStats(name)
+        if not self.enabled:
+            yield stats
+            return
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        profile = cProfile.Profile() if self.cprofile_dir else None
+
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        if profile:
+            profile.enable()
+        try:
+            yield stats
+        finally:
+            if profile:
+                profile.disable()
+            stats.wall_s = round(time.perf_counter() - wall0, 6)
+            stats.cpu_s = round(time.process_time() - cpu0, 6)
+            if self.trace_memory:
+                stats.py_peak_bytes = tracemalloc.get_traced_memory()[1]
+            stats.max_rss_bytes = max_rss_bytes()
+            if profile:
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                profile.dump_stats(self.cprofile_dir / f"{name}.prof")
+            self.stages.append(stats)
+
+    def close(self) -> None:
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self, **context) -> dict:
+        """Structured report: environment, `context` (e.g. CLI options) and stages."""
+        return {
+            "version": REPORT_VERSION,
+            "generated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "context": context,
+            "stages": [asdict(s) for s in self.stages],
+            "total": {
+                "wall_s": round(sum(s.wall_s for s in self.stages), 6),
+                "cpu_s": round(sum(s.cpu_s for s in self.stages), 6),
+                "max_rss_bytes": max_rss_bytes(),
+            },
+        }
+
+    def write_report(self, path: Path, **context) -> dict:
+        report = self.report(**context)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        return report
+
+    def summary(self) -> str:
+        """Fixed-width table of the recorded stages."""
+        lines = [f"{'Stage':<16}{'Rows':>12}{'Wall s':>10}{'CPU s':>10}{'Py peak MB':>12}{'RSS MB':>10}"]
+        for s in self.stages:
+            rows = f"{s.rows:,}" if s.rows is not None else "-"
+            peak = f"{s.py_peak_bytes / 1e6:.1f}" if s.py_peak_bytes is not None else "-"
+            rss = f"{s.max_rss_bytes / 1e6:.1f}" if s.max_rss_bytes is not None else "-"
+            lines.append(f"{s.name:<16}{rows:>12}{s.wall_s:>10.3f}{s.cpu_s:>10.3f}{peak:>12}{rss:>10}")
+        return "\n".join(lines)
@@ -0,0 +1,404 @@
+"""
+Vectorized reserving methods over dense triangles (see triangle.py).
+
+Every function works on the whole (n_triangles, n_origins, n_dev) stack
+at once — thousands of class triangles are projected with a handful of
+array operations rather than per-triangle loops.
+
+Chain ladder:
+    Age-to-age factors are averaged over origins in one of these ways:
+      "all"     volume-weighted over every origin   (Σ C[d+1] / Σ C[d])
+      "1".."5"  volume-weighted over the latest n origins
+      "simple"  arithmetic mean of the individual link ratios
+    The Pattern_Avg values of the ultimates table ("1".."5", "all") map
+    directly onto these.
+
+Expected-loss methods (the IE_Approach values of premium-based methods)
+all take the form  U = C + (1 − p) · IE  with p the share developed
+(1 / CDF) and differ in the initial expected IE:
+    "BF"        the a-priori expected ultimate (records "Expected")
+    "Cape Cod"  premium × Σ C / Σ (premium · p)   per class
+    "WA"        premium × Σ U_cl / Σ premium      per class
+    "Trending"  premium × a p-weighted linear trend of U_cl / premium
+                fitted across cohorts per class
+
+Usage:
+    tri = Triangle.from_records(df_records)
+    cl = chain_ladder(tri)                  # all PATTERN_AVERAGES at once
+    cl.ultimate                             # (n_averages, n_triangles, n_origins)
+    cl.to_frame()                           # Class, Cohort, Pattern_Avg, ...
+    el = expected_loss_methods(cl, premium, expected)   # IE_METHODS
+    mk = mack(cl)                           # standard errors per origin and total
+
+Mack:
+    Distribution-free standard errors of the chain-ladder ultimates
+    (Mack 1993) for the volume-weighted averages: σ²_k is estimated from
+    the same link-ratio pairs as f_k (the last estimable σ² extrapolated
+    log-linearly), and
+        process²   = Ĉ_K² Σ_k σ²_k / f_k² / Ĉ_k
+        parameter² = Ĉ_K² Σ_k σ²_k / f_k² / S_k
+    over the future steps k of each origin, S_k being the volume behind
+    f_k. Totals per triangle add the parameter covariance between origins.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from triangle import Triangle
+
+PATTERN_AVERAGES = ("1", "2", "3", "4", "5", "all")
+IE_METHODS = ("Trending", "WA", "Cape Cod", "BF")
+
+
+# ------------------------------------------------------------------ #
+#  Development factors
+# ------------------------------------------------------------------ #
+def link_ratio_pairs(tri: Triangle) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (C[d], C[d+1], usable) for every origin and development step.
+
+    A pair is usable when both periods are observed and C[d] > 0, so
+    zero opening values never produce infinite link ratios.
+    """
+    c0 = tri.values[:, :, :-1]
+    c1 = tri.values[:, :, 1:]
+    usable = tri.mask[:, :, :-1] & tri.mask[:, :, 1:]
+    usable &= np.where(usable, c0, 0) > 0
+    return c0, c1, usable
+
+
+def pattern_weights(tri: Triangle, averages: tuple[str, ...] = PATTERN_AVERAGES) -> np.ndarray:
+    """
+    Link-ratio pairs each average uses: bool (n_averages, n_triangles, n_origins, n_dev - 1).
+
+    "all" and "simple" use every usable pair, "n" the latest n usable
+    origins at each step.
+    """
+    _, _, usable = link_ratio_pairs(tri)
+    # Latest-n selection: rank origins from the most recent usable one.
+    rank = np.cumsum(usable[:, ::-1, :], axis=1)[:, ::-1, :]
+    n = np.array([np.inf if a in ("all", "simple") else int(a) for a in averages])
+    return usable[None] & (rank[None] <= n[:, None, None, None])
+
+
+def age_to_age_factors(tri: Triangle, averages: tuple[str, ...] = PATTERN_AVERAGES) -> np.ndarray:
+    """
+    Age-to-age factors for each average: (n_averages, n_triangles, n_dev - 1).
+
+    Steps with no usable origin get a factor of 1.0 (no further
+    development can be estimated).
+    """
+    c0, c1, _ = link_ratio_pairs(tri)
+    use = pattern_weights(tri, averages)
+    factors = np.ones(use.shape[:2] + use.shape[3:])
+
+    weighted = [i for i, a in enumerate(averages) if a != "simple"]
+    if weighted:
+        num = np.where(use[weighted], c1[None], 0).sum(axis=2)
+        den = np.where(use[weighted], c0[None], 0).sum(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factors[weighted] = np.where(den > 0, num / np.where(den > 0, den, 1), 1.0)
+
+    if "simple" in averages:
+        i = averages.index("simple")
+        count = use[i].sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(use[i], c1 / np.where(use[i], c0, 1), 0).sum(axis=1)
+        factors[i] = np.where(count > 0, ratios / np.maximum(count, 1), 1.0)
+    return factors
+
+
+def cumulative_factors(factors: np.ndarray, tail: float | np.ndarray = 1.0) -> np.ndarray:
+    """
+    Age-to-ultimate factors (..., n_dev) from age-to-age factors (..., n_dev - 1):
+    cdf[d] = f[d] · f[d+1] · … · tail, with cdf[last] = tail.
+    """
+    to_last = np.cumprod(factors[..., ::-1], axis=-1)[..., ::-1]
+    ones = np.ones(factors.shape[:-1] + (1,))
+    return np.concatenate([to_last, ones], axis=-1) * np.asarray(tail)[..., None]
+
+
+# ------------------------------------------------------------------ #
+#  Chain ladder
+# ------------------------------------------------------------------ #
+@dataclass
+class ChainLadderResult:
+    triangle: Triangle
+    averages: tuple[str, ...]
+    factors: np.ndarray     # (n_averages, n_triangles, n_dev - 1)
+    cdf: np.ndarray         # (n_averages, n_triangles, n_dev)
+    latest: np.ndarray      # (n_triangles, n_origins)
+    latest_dev: np.ndarray  # (n_triangles, n_origins)
+    origin_cdf: np.ndarray  # (n_averages, n_triangles, n_origins) age-to-ultimate at latest
+    ultimate: np.ndarray    # (n_averages, n_triangles, n_origins)
+
+    @property
+    def percent_developed(self) -> np.ndarray:
+        """Share of ultimate reported at the latest diagonal (1 / CDF)."""
+        return 1 / self.origin_cdf
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long Class × Cohort × Pattern_Avg frame of the projection."""
+        tri = self.triangle
+        frames = []
+        for a, average in enumerate(self.averages):
+            frame = tri.to_frame(self.ultimate[a], "Ultimate")
+            frame.insert(2, "Pattern_Avg", average)
+            frame["Latest"] = self.latest.ravel()
+            frame["Latest_Dev"] = self.latest_dev.ravel()
+            frame["CDF"] = self.origin_cdf[a].ravel()
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+
+def chain_ladder(
+    tri: Triangle,
+    averages: tuple[str, ...] = PATTERN_AVERAGES,
+    tail: float | np.ndarray = 1.0,
+) -> ChainLadderResult:
+    """
+    Chain-ladder projection of every triangle under every average.
+
+    Ultimate = latest diagonal × age-to-ultimate factor at its
+    development period. Origins with nothing observed get NaN.
+    """
+    factors = age_to_age_factors(tri, averages)
+    cdf = cumulative_factors(factors, tail)
+    latest_dev = tri.latest_dev
+    latest = tri.latest
+    idx = np.broadcast_to(np.maximum(latest_dev, 0)[None], (len(averages),) + latest_dev.shape)
+    origin_cdf = np.take_along_axis(cdf, idx, axis=2)
+    origin_cdf = np.where(latest_dev[None] >= 0, origin_cdf, np.nan)
+    return ChainLadderResult(
+        triangle=tri,
+        averages=tuple(averages),
+        factors=factors,
+        cdf=cdf,
+        latest=latest,
+        latest_dev=latest_dev,
+        origin_cdf=origin_cdf,
+        ultimate=latest[None] * origin_cdf,
+    )
+
+
+# ------------------------------------------------------------------ #
+#  Expected-loss methods (BF family)
+# ------------------------------------------------------------------ #
+def bornhuetter_ferguson(
+    latest: np.ndarray, percent_developed: np.ndarray, initial_expected: np.ndarray,
+) -> np.ndarray:
+    """U = C + (1 − p) · IE, broadcasting over any leading axes."""
+    return latest + (1 - percent_developed) * initial_expected
+
+
+def _class_sum(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Sum over origins (last axis) of the valid cells."""
+    return np.where(valid, values, 0).sum(axis=-1)
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+
+def expected_loss_methods(
+    cl: ChainLadderResult,
+    premium: np.ndarray,
+    expected_ultimate: np.ndarray,
+    methods: tuple[str, ...] = IE_METHODS,
+) -> dict[str, np.ndarray]:
+    """
+    BF-family ultimates for every average, triangle and origin at once.
+
+    `premium` and `expected_ultimate` are (n_triangles, n_origins),
+    aligned with cl.triangle. Each method returns an
+    (n_averages, n_triangles, n_origins) array: the development pattern
+    of every chain-ladder average is used simultaneously, and per-class
+    loss ratios are reduced over the origin axis.
+    """
+    latest = cl.latest[None]                                # (1, T, O)
+    # Nothing reported yet: the chain ladder cannot see any development
+    # (zero opening values give no link ratio), so rely wholly on IE.
+    p = np.where(latest > 0, cl.percent_developed, 0.0)    # (A, T, O)
+    p = np.where(np.isnan(cl.percent_developed), np.nan, p)
+    premium = np.asarray(premium, float)[None]
+    valid = ~np.isnan(p) & ~np.isnan(latest) & (premium > 0)
+    out: dict[str, np.ndarray] = {}
+
+    if "BF" in methods:
+        out["BF"] = bornhuetter_ferguson(latest, p, np.asarray(expected_ultimate, float)[None])
+
+    if "Cape Cod" in methods:
+        elr = _ratio(_class_sum(latest, valid), _class_sum(premium * p, valid))      # (A, T)
+        out["Cape Cod"] = bornhuetter_ferguson(latest, p, elr[..., None] * premium)
+
+    if "WA" in methods:
+        elr = _ratio(_class_sum(cl.ultimate, valid), _class_sum(premium, valid))
+        out["WA"] = bornhuetter_ferguson(latest, p, elr[..., None] * premium)
+
+    if "Trending" in methods:
+        # Weighted least squares of ELR_o = U_cl / premium on origin index,
+        # weights p (more developed cohorts are more credible), per class.
+        x = np.arange(p.shape[-1], dtype=float)
+        y = np.where(valid, _ratio(cl.ultimate, premium), 0)
+        w = np.where(valid, p, 0)
+        sw, sx, sy = w.sum(-1), (w * x).sum(-1), (w * y).sum(-1)
+        sxx, sxy = (w * x * x).sum(-1), (w * x * y).sum(-1)
+        det = sw * sxx - sx * sx
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(det > 1e-12, (sw * sxy - sx * sy) / np.where(det > 1e-12, det, 1), 0.0)
+            intercept = _ratio(sy - slope * sx, sw)
+        trend_elr = intercept[..., None] + slope[..., None] * x
+        out["Trending"] = bornhuetter_ferguson(latest, p, trend_elr * premium)
+
+    return out
+
+
+# ------------------------------------------------------------------ #
+#  Mack standard errors
+# ------------------------------------------------------------------ #
+def mack_sigma2(tri: Triangle, factors: np.ndarray, use: np.ndarray) -> np.ndarray:
+    """
+    Mack's σ²_k per average and triangle: (n_averages, n_triangles, n_dev - 1).
+
+    σ²_k = Σ C_k (C_{k+1}/C_k − f_k)² / (n_k − 1) over the pairs behind
+    f_k. Steps with fewer than two pairs get Mack's extrapolation
+    min(σ⁴_{k-1} / σ²_{k-2}, σ²_{k-2}, σ²_{k-1}) from the two before.
+    """
+    c0, c1, _ = link_ratio_pairs(tri)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dev = np.where(use, c0[None] * (c1[None] / np.where(use, c0[None], 1) - factors[:, :, None, :]) ** 2, 0)
+    n = use.sum(axis=2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma2 = np.where(n > 1, dev.sum(axis=2) / np.maximum(n - 1, 1), np.nan)
+
+    # Extrapolation runs step by step, vectorized over averages × triangles.
+    for k in range(sigma2.shape[-1]):
+        missing = np.isnan(sigma2[..., k])
+        if not missing.any():
+            continue
+        if k >= 2:
+            a, b = sigma2[..., k - 2], sigma2[..., k - 1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                guess = np.minimum(np.where(a > 0, b * b / np.where(a > 0, a, 1), 0), np.minimum(a, b))
+        elif k == 1:
+            guess = sigma2[..., 0]
+        else:
+            guess = np.full(missing.shape, np.nan)
+        sigma2[..., k] = np.where(missing, guess, sigma2[..., k])
+    # Steps without development (f = 1 with no data, or nothing before
+    # them to extrapolate from) add no uncertainty.
+    return np.nan_to_num(sigma2, nan=0.0)
+
+
+@dataclass
+class MackResult:
+    chain_ladder: ChainLadderResult
+    sigma2: np.ndarray              # (n_averages, n_triangles, n_dev - 1)
+    process_se: np.ndarray          # (n_averages, n_triangles, n_origins)
+    parameter_se: np.ndarray        # (n_averages, n_triangles, n_origins)
+    total_process_se: np.ndarray    # (n_averages, n_triangles)
+    total_parameter_se: np.ndarray  # (n_averages, n_triangles)
+
+    @property
+    def se(self) -> np.ndarray:
+        return np.hypot(self.process_se, self.parameter_se)
+
+    @property
+    def total_se(self) -> np.ndarray:
+        return np.hypot(self.total_process_se, self.total_parameter_se)
+
+    @property
+    def cv(self) -> np.ndarray:
+        """Standard error per unit of ultimate (NaN where the ultimate is 0)."""
+        return _ratio(self.se, self.chain_ladder.ultimate)
+
+    @property
+    def total_cv(self) -> np.ndarray:
+        return _ratio(self.total_se, np.nansum(self.chain_ladder.ultimate, axis=-1))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Long Class × Cohort × Pattern_Avg frame of ultimates and standard
+        errors; each triangle's total is a row with Cohort "Total".
+        """
+        cl, tri = self.chain_ladder, self.chain_ladder.triangle
+        frames = []
+        for a, average in enumerate(cl.averages):
+            frame = tri.to_frame(cl.ultimate[a], "Ultimate")
+            frame["Process_SE"] = self.process_se[a].ravel()
+            frame["Parameter_SE"] = self.parameter_se[a].ravel()
+            total = pd.DataFrame({
+                "Class": tri.keys,
+                "Cohort": "Total",
+                "Ultimate": np.nansum(cl.ultimate[a], axis=-1),
+                "Process_SE": self.total_process_se[a],
+                "Parameter_SE": self.total_parameter_se[a],
+            })
+            frame = pd.concat([frame, total], ignore_index=True)
+            frame.insert(2, "Pattern_Avg", average)
+            frames.append(frame)
+        out = pd.concat(frames, ignore_index=True)
+        out["Mack_SE"] = np.hypot(out["Process_SE"], out["Parameter_SE"])
+        return out
+
+
+def mack(cl: ChainLadderResult) -> MackResult:
+    """
+    Mack standard errors for every average, triangle and origin of a
+    chain-ladder result (volume-weighted averages only; tail ignored).
+    """
+    if "simple" in cl.averages:
+        raise ValueError("Mack standard errors need volume-weighted averages, not 'simple'")
+    tri = cl.triangle
+    use = pattern_weights(tri, cl.averages)
+    sigma2 = mack_sigma2(tri, cl.factors, use)
+    c0, _, _ = link_ratio_pairs(tri)
+    volume = np.where(use, c0[None], 0).sum(axis=2)                  # S_k: (A, T, D-1)
+
+    n_dev = tri.shape[2]
+    latest_dev = cl.latest_dev                                       # (T, O)
+    steps = np.arange(n_dev - 1)
+    future = steps[None, None, :] >= latest_dev[:, :, None]          # (T, O, D-1)
+    future &= (latest_dev >= 0)[:, :, None]
+
+    # Projected cumulative at the start of each step: Ĉ_k = C_L · F[k] / F[L]
+    index = np.cumprod(np.concatenate([np.ones(cl.factors.shape[:2] + (1,)), cl.factors], axis=-1), axis=-1)
+    at_latest = np.take_along_axis(index, np.broadcast_to(np.maximum(latest_dev, 0), index.shape[:1] + latest_dev.shape), axis=2)
+    projected = cl.latest[None, :, :, None] * index[:, :, None, :-1] / at_latest[..., None]   # (A, T, O, D-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit = sigma2 / cl.factors ** 2                              # (A, T, D-1)
+        process_terms = np.where(future & (projected > 0), unit[:, :, None, :] / projected, 0)
+        param_unit = np.where(volume > 0, unit / np.where(volume > 0, volume, 1), 0)
+    param_terms = np.where(future, param_unit[:, :, None, :], 0)
+
+    ultimate = np.nan_to_num(cl.ultimate)
+    process_se = ultimate * np.sqrt(process_terms.sum(axis=-1))
+    parameter_se = ultimate * np.sqrt(param_terms.sum(axis=-1))
+    observed = latest_dev >= 0
+    process_se = np.where(observed, process_se, np.nan)
+    parameter_se = np.where(observed, parameter_se, np.nan)
+
+    # Total: Σ process² ; Σ parameter² + Σ_{i≠j} Ĉ_i Ĉ_j G[max(L_i, L_j)],
+    # G[m] = Σ_{k ≥ m} σ²_k / f_k² / S_k.
+    tail_sum = np.cumsum(param_unit[..., ::-1], axis=-1)[..., ::-1]
+    tail_sum = np.concatenate([tail_sum, np.zeros(tail_sum.shape[:-1] + (1,))], axis=-1)   # (A, T, D)
+    pair_dev = np.maximum(np.maximum(latest_dev[:, :, None], latest_dev[:, None, :]), 0)  # (T, O, O)
+    g = np.take_along_axis(tail_sum[:, :, None, :], np.broadcast_to(pair_dev, tail_sum.shape[:1] + pair_dev.shape), axis=-1)
+    cross = ultimate[:, :, :, None] * ultimate[:, :, None, :] * g
+    n_origins = tri.shape[1]
+    cross = np.where(np.eye(n_origins, dtype=bool), 0, cross).sum(axis=(-1, -2))
+    total_process_se = np.sqrt(np.nansum(process_se ** 2, axis=-1))
+    total_parameter_se = np.sqrt(np.nansum(parameter_se ** 2, axis=-1) + cross)
+
+    return MackResult(
+        chain_ladder=cl,
+        sigma2=sigma2,
+        process_se=process_se,
+        parameter_se=parameter_se,
+        total_process_se=total_process_se,
+        total_parameter_se=total_parameter_se,
+    )
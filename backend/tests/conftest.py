@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Backend modules are imported top-level, as when run from backend/;
+# the repository root holds run_local.py and deploy.py.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(1, str(Path(__file__).resolve().parents[2]))
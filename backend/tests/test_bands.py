@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+import generate_data as gd
+
+
+def test_ultimate_bands_follow_each_cohorts_methods():
+    df_ultimates = pd.DataFrame({
+        "Class": ["A"] * 5,
+        "Cohort": ["2020", "2020", "2020", "2021", "2021"],
+        "Method": ["m1", "m2", "m3", "m1", "m3"],   # 2021 has no m2
+        "Ultimate": [100.0, 300.0, 200.0, np.nan, 50.0],
+    })
+    df_scores = pd.DataFrame({"Class": ["A"] * 3, "Method": ["m1", "m2", "m3"], "Proj_Quality": [0.5, 0.9, 0.7]})
+    bands = gd.ultimate_bands(df_ultimates, df_scores)
+
+    assert bands[["Class", "Cohort"]].values.tolist() == [["A", "2020"], ["A", "2021"]]
+    first, second = bands.to_dict("records")
+    assert first["Proj_Quality"] == [0.9, 0.7, 0.5]
+    assert first["Band_Min"] == [300.0, 200.0, 100.0]
+    assert first["Band_Max"] == [300.0, 300.0, 300.0]
+    assert first["Band_Count"] == [1, 2, 3]
+    assert second["Proj_Quality"] == [0.7, 0.5]
+    assert second["Band_Min"] == [50.0, 50.0]
+    assert second["Band_Count"] == [1, 1]
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import bootstrap
+import reserving
+from test_triangle import genins
+from triangle import Triangle
+
+
+def test_fit_odp_genins():
+    tri = genins()
+    fit = bootstrap.fit_odp(tri)
+    # England & Verrall (2002), Taylor & Ashe data: Pearson scale parameter
+    assert fit.phi[0] == pytest.approx(52_601, abs=1)
+    # Chain-ladder fitted values reproduce the row and column totals
+    incremental = np.where(tri.mask, np.diff(np.nan_to_num(tri.values), axis=2, prepend=0), 0)
+    np.testing.assert_allclose(fit.fitted.sum(axis=2), tri.latest)
+    np.testing.assert_allclose(fit.fitted.sum(axis=1), incremental.sum(axis=1))
+    assert fit.n_residuals[0] == 55
+
+
+def test_bootstrap_mean_tracks_chain_ladder():
+    tri = genins()
+    result = bootstrap.bootstrap_ultimates(tri, n_sims=2_000, seed=1)
+    cl = reserving.chain_ladder(tri, ("all",))
+    assert np.sum(result.mean - tri.latest) == pytest.approx(np.sum(cl.ultimate - cl.latest), rel=0.02)
+    assert (result.quantiles[0] <= result.quantiles[1]).all() and (result.quantiles[1] <= result.quantiles[2]).all()
+
+
+def test_bootstrap_same_seed_any_worker_count():
+    base = genins()
+    # More triangles than CHUNK_TRIANGLES so the chunks go to the pool
+    scale = np.linspace(0.5, 2.0, 2 * bootstrap.CHUNK_TRIANGLES + 3)
+    tri = Triangle(
+        values=base.values * scale[:, None, None], mask=np.repeat(base.mask, len(scale), axis=0),
+        keys=[f"C{i}" for i in range(len(scale))], origins=base.origins, dev_periods=base.dev_periods,
+    )
+    serial = bootstrap.bootstrap_ultimates(tri, n_sims=200, seed=7, workers=1)
+    pooled = bootstrap.bootstrap_ultimates(tri, n_sims=200, seed=7, workers=3)
+    np.testing.assert_array_equal(serial.mean, pooled.mean)
+    np.testing.assert_array_equal(serial.quantiles, pooled.quantiles)
+    other = bootstrap.bootstrap_ultimates(tri, n_sims=200, seed=8, workers=1)
+    assert not np.array_equal(serial.mean, other.mean)
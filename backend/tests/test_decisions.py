@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_data as gd
+
+LARGE_LOSSES = gd.DAG_OUTCOMES[2][0]
+
+
+def generated(portfolio: gd.Portfolio = gd.DEFAULT_PORTFOLIO) -> dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(gd.SEED)
+    df_records, ult_map = gd.generate_long_data_vectorized(rng, portfolio)
+    df_ultimates, _ = gd.generate_ultimates_vectorized(rng, ult_map, portfolio)
+    df_claims = gd.generate_claims_vectorized(rng, ult_map, portfolio)
+    return {
+        "df_records": df_records,
+        "df_ultimates": df_ultimates,
+        "df_claims": df_claims,
+        "df_premiums": gd.generate_premiums(rng, ult_map),
+        "df_claim_counts": gd.generate_cohort_claim_counts(df_claims, rng),
+    }
+
+
+def with_large_share(df_claims: pd.DataFrame, cls: str, cohort: str, large: float, attritional: float):
+    """Replace a cohort's claims by one large and one attritional claim with the given movements."""
+    threshold = gd.DEFAULT_PORTFOLIO.classes[cls]["large_loss_threshold"]
+    template = df_claims[(df_claims["Class"] == cls) & (df_claims["Cohort"] == cohort)].iloc[:2].copy()
+    template["Incurred_Current"] = [threshold, threshold / 2]
+    template["Incurred_Prior"] = template["Incurred_Current"] - [large, attritional]
+    rest = df_claims[(df_claims["Class"] != cls) | (df_claims["Cohort"] != cohort)]
+    return pd.concat([rest, template], ignore_index=True)
+
+
+@pytest.mark.parametrize("large, attritional, expect_large", [
+    (4999.996, 5000.004, False),   # 49.99996% — 50.0 once rounded to 4 dp
+    (5000.004, 4999.996, True),    # 50.00004%
+])
+def test_large_loss_driver_uses_unrounded_share(large, attritional, expect_large):
+    tables = generated()
+    decisions = gd.decision_table(**tables)
+    # A cohort whose adverse rows reach the large-loss step of the DAG
+    reached = decisions[decisions["Driver"].isin([o[0] for o in gd.DAG_OUTCOMES[2:]] + [gd.DAG_FALLBACK[0]])]
+    cls, cohort = reached.iloc[0][["Class", "Cohort"]]
+
+    tables["df_claims"] = with_large_share(tables["df_claims"], cls, cohort, large, attritional)
+    decisions = gd.decision_table(**tables)
+    rows = decisions[(decisions["Class"] == cls) & (decisions["Cohort"] == cohort)]
+    assert (rows["Driver"] == LARGE_LOSSES).any() == expect_large
+    np.testing.assert_allclose(rows["Large_Loss_Pct"], 50.0)
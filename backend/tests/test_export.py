@@ -0,0 +1,76 @@
+import json
+
+import pandas as pd
+import pytest
+
+import generate_data as gd
+
+
+def test_lookup_shared_by_tables_in_the_same_row_order(tmp_path):
+    ultimates = pd.DataFrame({"Class": ["A", "A", "B"], "Cohort": ["1", "1", "1"], "Method": ["x", "y", "x"]})
+    tables = {
+        "ultimates": ultimates,
+        "prior_ultimates": ultimates.copy(),
+        "decisions": ultimates.iloc[::-1].reset_index(drop=True),
+    }
+    lookup = dict(gd.iter_lookups(tables))
+    assert lookup["ultimates"] == {"A": {"1": {"x": 0, "y": 1}}, "B": {"1": {"x": 2}}}
+    assert lookup["prior_ultimates"] == "ultimates"
+    assert lookup["decisions"] == gd.build_lookup(tables["decisions"], gd.LOOKUP_KEYS["decisions"])
+
+    rows = gd.write_payload(tmp_path / "rows.json", {}, tables, columnar=False, precompress=False)
+    columnar = gd.write_payload(tmp_path / "columnar.json", {}, tables, columnar=True, precompress=False)
+    assert json.loads(rows.read_text())["lookup"] == lookup
+    assert "lookup" not in json.loads(columnar.read_text())
+
+
+def sample_tables() -> dict[str, pd.DataFrame]:
+    return {
+        "ultimates": pd.DataFrame({
+            "Class": ["A", "A", "B"], "Cohort": ["1", "2", "1"], "Method": ["x", "x", "x"],
+            "Ultimate": [1.5, float("nan"), 3.0], "Method_Type": ["Claims-based", None, "Premium-based"],
+        }),
+        "premiums": pd.DataFrame({"Class": [], "Cohort": [], "Earned": []}),
+    }
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_iter_json_matches_json_dumps(indent):
+    df = sample_tables()["ultimates"]
+    streamed = gd.StreamedObject([
+        ("title", "t"),
+        ("rows", gd.StreamedArray(gd.record_chunks(df, chunk_rows=2))),
+        ("empty", gd.StreamedArray(gd.record_chunks(df.iloc[:0]))),
+        ("nested", gd.StreamedObject([
+            ("columns", gd.streamed_columnar(df)),
+            ("none", gd.StreamedObject([])),
+            ("chunks", gd.StreamedArray([[1, 2], [], [{"a": [None]}]])),
+        ])),
+    ])
+    plain = {
+        "title": "t",
+        "rows": gd.to_records(df),
+        "empty": [],
+        "nested": {"columns": gd.to_columnar(df), "none": {}, "chunks": [1, 2, {"a": [None]}]},
+    }
+    text = "".join(gd.iter_json(streamed, indent))
+    expected = json.dumps(plain, indent=indent, separators=None if indent else (",", ":"))
+    assert text == expected
+    assert "NaN" not in text and json.loads(text)["rows"][1]["Ultimate"] is None
+
+
+@pytest.mark.parametrize("columnar, compact", [(False, False), (False, True), (True, False)])
+def test_write_payload_matches_json_dumps(tmp_path, columnar, compact):
+    tables = sample_tables()
+    payload = {"title": "t", "classes": ["A", "B"]}
+    path = gd.write_payload(tmp_path / "out.json", payload, tables, columnar, precompress=False, compact=compact)
+
+    if columnar:
+        plain = {"format": "columnar", "format_version": gd.COLUMNAR_FORMAT_VERSION, **payload}
+        plain.update((name, gd.to_columnar(df)) for name, df in tables.items())
+    else:
+        plain = {**payload, **{name: gd.to_records(df) for name, df in tables.items()}}
+        plain["lookup"] = dict(gd.iter_lookups(tables))
+    indent = None if columnar or compact else 2
+    expected = json.dumps(plain, indent=indent, separators=None if indent else (",", ":"))
+    assert path.read_text(encoding="utf-8") == expected
@@ -0,0 +1,30 @@
+import numpy as np
+
+import generate_data as gd
+from triangle import Triangle
+
+
+def projected(portfolio: gd.Portfolio = gd.DEFAULT_PORTFOLIO):
+    df_records, ult_map = gd.generate_long_data_vectorized(np.random.default_rng(gd.SEED), portfolio)
+    rng = np.random.default_rng(gd.SEED)
+    df_ultimates, df_prior = gd.generate_ultimates_vectorized(rng, ult_map, portfolio)
+    df_premiums = gd.generate_premiums(rng, ult_map)
+    return df_records, *gd.project_ultimates(df_records, df_ultimates, df_prior, df_premiums)
+
+
+def test_fully_developed_cohorts_do_not_move():
+    df_records, df_ultimates, df_prior = projected()
+    tri = Triangle.from_records(df_records)
+    prior_tri = tri.remove_diagonals(1)
+    # Cohorts at the last development period at both valuations
+    last = tri.dev_periods[-1]
+    settled = (tri.latest_dev == last) & (prior_tri.latest_dev == last)
+    c, o = np.nonzero(settled)
+    cohorts = set(zip(np.asarray(tri.keys)[c], np.asarray(tri.origins)[o]))
+    assert cohorts
+
+    keys = ["Class", "Cohort", "Method"]
+    merged = df_ultimates.merge(df_prior, on=keys, suffixes=("", "_Prior"))
+    rows = merged[[pair in cohorts for pair in zip(merged["Class"], merged["Cohort"])]]
+    assert len(rows) == len(cohorts) * df_ultimates["Method"].nunique()
+    np.testing.assert_array_equal(rows["Ultimate_Prior"], rows["Ultimate"])
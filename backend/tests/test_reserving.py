@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import reserving
+from triangle import Triangle
+
+
+def small_triangle() -> Triangle:
+    """
+    Factors 2.0 and 1.5 (volume-weighted), so the CDFs are 3, 1.5, 1 and
+    the latest diagonal 300, 300, 200 is 100%, 2/3 and 1/3 developed;
+    chain-ladder ultimates 300, 450, 600.
+    """
+    values = np.array([[[100.0, 200.0, 300.0], [150.0, 300.0, np.nan], [200.0, np.nan, np.nan]]])
+    return Triangle(
+        values=values, mask=~np.isnan(values), keys=["A"], origins=["2021", "2022", "2023"],
+        dev_periods=np.arange(3),
+    )
+
+
+PREMIUM = np.array([[500.0, 600.0, 800.0]])
+EXPECTED = np.array([[400.0, 420.0, 560.0]])
+
+
+@pytest.mark.parametrize("method, ultimate", [
+    # U = C + (1 − p) · IE with IE = EXPECTED
+    ("BF", [300, 300 + 420 / 3, 200 + 560 * 2 / 3]),
+    # ELR = Σ C / Σ premium · p = 800 / (3500 / 3) = 24 / 35
+    ("Cape Cod", [300, 300 + 600 * 24 / 35 / 3, 200 + 800 * 24 / 35 * 2 / 3]),
+    # ELR = Σ U_cl / Σ premium = 1350 / 1900
+    ("WA", [300, 300 + 600 * 27 / 38 / 3, 200 + 800 * 27 / 38 * 2 / 3]),
+    # ELR_o = 0.6, 0.75, 0.75 fitted with weights p: 0.615 + 0.09 · o
+    ("Trending", [300, 300 + 600 * 0.705 / 3, 200 + 800 * 0.795 * 2 / 3]),
+])
+def test_expected_loss_methods(method, ultimate):
+    cl = reserving.chain_ladder(small_triangle(), ("all",))
+    np.testing.assert_allclose(cl.ultimate[0, 0], [300, 450, 600])
+    result = reserving.expected_loss_methods(cl, PREMIUM, EXPECTED, (method,))
+    np.testing.assert_allclose(result[method][0, 0], ultimate)
+
+
+def test_bf_with_chain_ladder_prior_is_chain_ladder():
+    cl = reserving.chain_ladder(small_triangle())
+    bf = reserving.expected_loss_methods(cl, PREMIUM, cl.ultimate[-1], ("BF",))["BF"]
+    np.testing.assert_allclose(bf[-1], cl.ultimate[-1])
+
+
+def test_expected_loss_methods_without_reported_claims():
+    tri = small_triangle()
+    tri.values[0, 2, 0] = 0.0
+    cl = reserving.chain_ladder(tri, ("all",))
+    result = reserving.expected_loss_methods(cl, PREMIUM, EXPECTED, ("BF",))
+    # Nothing reported yet: rely wholly on the a-priori expected
+    assert result["BF"][0, 0, 2] == pytest.approx(560)
@@ -0,0 +1,131 @@
+import http.client
+import threading
+from contextlib import contextmanager
+from functools import partial
+
+import pytest
+
+import run_local
+
+
+@contextmanager
+def serving(tmp_path, **kwargs):
+    (tmp_path / "index.html").write_text("<html></html>")
+    handler = partial(run_local.DashboardRequestHandler, directory=str(tmp_path))
+    server = run_local.DashboardHTTPServer(("127.0.0.1", 0), handler, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def get(port: int, path: str = "/index.html", timeout: float = 5) -> tuple[http.client.HTTPConnection, int]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    response.read()
+    return conn, response.status
+
+
+def test_idle_keepalive_connections_do_not_block_new_clients(tmp_path):
+    with serving(tmp_path) as port:
+        idle = [get(port)[0] for _ in range(20)]
+        _, status = get(port, timeout=2)
+        assert status == 200
+        for conn in idle:
+            conn.close()
+
+
+def test_connections_over_the_cap_get_503(tmp_path):
+    with serving(tmp_path, max_connections=2, connection_wait=1) as port:
+        idle = [get(port)[0] for _ in range(2)]
+        # The listener keeps accepting and answers past the cap
+        _, status = get(port, timeout=2)
+        assert status == 503
+        idle.pop().close()
+        _, status = get(port, timeout=2)
+        assert status == 200
+        for conn in idle:
+            conn.close()
+
+
+@pytest.mark.parametrize("header, accepted", [
+    ("", set()),
+    ("gzip, br", {"gzip", "br"}),
+    ("GZIP;Q=0.5, Br", {"gzip", "br"}),
+    ("gzip;q=0", set()),
+    ("gzip;q=bogus", set()),
+    ("identity;q=0", set()),
+    ("identity;q=0, gzip", {"gzip"}),
+    ("*", {"*", "br", "gzip"}),
+    ("*;q=0", set()),
+    ("*;q=0, gzip", {"gzip"}),
+    ("gzip;q=0, *", {"*", "br"}),
+    ("br;q=0, gzip;q=0, *", {"*"}),
+    ("*, br;q=0", {"*", "gzip"}),
+])
+def test_parse_accept_encoding(header, accepted):
+    assert run_local.parse_accept_encoding(header) == accepted
+
+
+def fetch(port: int, path: str, headers: dict) -> http.client.HTTPResponse:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response
+
+
+@pytest.fixture(scope="module")
+def data_server(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("served")
+    (tmp_path / "data.json").write_text('{"x": 1}')
+    (tmp_path / "data.json.gz").write_bytes(b"gzipped")   # written after, so up to date
+    with serving(tmp_path) as port:
+        identity = fetch(port, "/data.json", {}).getheader("ETag")
+        gzip = fetch(port, "/data.json", {"Accept-Encoding": "gzip"}).getheader("ETag")
+        yield port, identity, gzip
+
+
+def test_etags_name_the_coding(data_server):
+    _, identity, gzip = data_server
+    assert identity.startswith('"') and identity.endswith('"')
+    assert gzip == identity[:-1] + '-gzip"'
+
+
+@pytest.mark.parametrize("if_none_match, encoding, status", [
+    ("{identity}", "", 304),
+    ("W/{identity}", "", 304),
+    ('"other", {identity}', "", 304),
+    ('"other",W/{identity} , "more"', "", 304),
+    ('"other", "more"', "", 200),
+    ("*", "", 304),
+    ("{identity}", "gzip", 200),      # the cached variant is not the one being served
+    ("{gzip}", "gzip", 304),
+    ("W/{gzip}", "gzip", 304),
+    ("{gzip}", "", 200),
+])
+def test_if_none_match(data_server, if_none_match, encoding, status):
+    port, identity, gzip = data_server
+    headers = {"If-None-Match": if_none_match.format(identity=identity, gzip=gzip)}
+    if encoding:
+        headers["Accept-Encoding"] = encoding
+    response = fetch(port, "/data.json", headers)
+    assert response.status == status
+    assert response.getheader("ETag") == (gzip if encoding else identity)
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}, 304),
+    ({"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}, 200),
+    ({"If-Modified-Since": "not a date"}, 200),
+    # If-None-Match takes precedence over If-Modified-Since
+    ({"If-None-Match": '"other"', "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}, 200),
+])
+def test_if_modified_since(data_server, headers, status):
+    port, _, _ = data_server
+    assert fetch(port, "/data.json", headers).status == status
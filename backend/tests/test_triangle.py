@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import reserving
+from triangle import Triangle, origin_period
+
+DATA = Path(__file__).parent / "data"
+
+
+def records_from_wide(path: Path, name: str) -> pd.DataFrame:
+    """Records table of a wide Origin × development-period CSV."""
+    wide = pd.read_csv(path)
+    long = wide.melt(id_vars="Origin", var_name="Development_Period", value_name="Value").dropna()
+    return long.assign(
+        Class=name,
+        Cohort=long["Origin"].astype(str),
+        Development_Period=long["Development_Period"].astype(int),
+        Type="Actual",
+    )
+
+
+def capped_triangle() -> Triangle:
+    """Six quarterly origins tracked to dev 3, valued at calendar period 5: the three oldest are capped."""
+    n_origins, n_dev, latest = 6, 4, 5
+    values = np.full((1, n_origins, n_dev), np.nan)
+    for o in range(n_origins):
+        for d in range(min(n_dev, latest - o + 1)):
+            values[0, o, d] = 100.0 * (o + 1) * (1 + d) ** 0.5
+    return Triangle(
+        values=values, mask=~np.isnan(values), keys=["A"],
+        origins=[f"2024Q{q}" for q in range(1, 5)] + ["2025Q1", "2025Q2"], dev_periods=np.arange(n_dev),
+    )
+
+
+def test_remove_diagonals_masks_calendar_diagonals():
+    tri = capped_triangle()
+    prior = tri.remove_diagonals(1)
+    # Origins 0 and 1 reached dev 3 before the latest diagonal and keep it
+    np.testing.assert_array_equal(prior.latest_dev[0], [3, 3, 2, 1, 0, -1])
+    np.testing.assert_array_equal(tri.remove_diagonals(2).latest_dev[0], [3, 2, 1, 0, -1, -1])
+
+
+def test_remove_diagonals_places_gapped_origins_in_time():
+    # 2024Q3 has no data: the later origins sit one quarter further along
+    origins = ["2024Q1", "2024Q2", "2024Q4", "2025Q1"]
+    periods = np.array([0, 1, 3, 4])
+    values = np.where(periods[:, None] + np.arange(5) <= 4, 1.0, np.nan)[None]
+    tri = Triangle(values=values, mask=~np.isnan(values), keys=["A"], origins=origins, dev_periods=np.arange(5))
+    np.testing.assert_array_equal(tri.latest_dev[0], [4, 3, 1, 0])
+    np.testing.assert_array_equal(tri.remove_diagonals(1).latest_dev[0], [3, 2, 0, -1])
+
+
+@pytest.mark.parametrize("label, period", [("1981", 1981), ("2022Q1", 8088), ("2022Q4", 8091), ("2022M03", 24266)])
+def test_origin_period(label, period):
+    assert origin_period(label) == period
+
+
+def test_remove_diagonals_rejects_unplaceable_origins():
+    tri = capped_triangle()
+    tri.origins = ["a", "b", "c", "d", "e", "f"]
+    with pytest.raises(ValueError, match="cannot place origin"):
+        tri.remove_diagonals(1)
+
+
+def test_remove_diagonals_keeps_last_step_estimable():
+    prior = reserving.chain_ladder(capped_triangle().remove_diagonals(1), ("all",))
+    # The 2 → 3 step keeps the capped origins' pairs instead of defaulting to 1.0
+    assert prior.factors[0, 0, 2] == pytest.approx((4 / 3) ** 0.5)
+    assert prior.ultimate[0, 0, 0] == capped_triangle().latest[0, 0]
+
+
+def test_raa_mack():
+    tri = Triangle.from_records(records_from_wide(DATA / "raa.csv", "RAA"))
+    cl = reserving.chain_ladder(tri, ("all",))
+    result = reserving.mack(cl)
+    # Mack (1993), Table: RAA reserves and standard errors
+    assert np.nansum(cl.ultimate[0] - cl.latest) == pytest.approx(52_135, abs=1)
+    assert result.total_se[0, 0] == pytest.approx(26_909, abs=1)
+    np.testing.assert_allclose(
+        result.se[0, 0],
+        [0, 206, 623, 747, 1_469, 2_002, 2_209, 5_358, 6_333, 24_566],
+        atol=0.5,
+    )
+
+
+def genins() -> Triangle:
+    """Taylor & Ashe (1983) cumulative triangle (GenIns)."""
+    return Triangle.from_records(records_from_wide(DATA / "genins.csv", "GenIns"))
+
+
+def test_genins_chain_ladder():
+    cl = reserving.chain_ladder(genins(), ("all",))
+    # Mack (1993), Taylor & Ashe data: chain-ladder reserves per origin
+    np.testing.assert_allclose(
+        (cl.ultimate - cl.latest)[0, 0],
+        [0, 94_634, 469_511, 709_638, 984_889, 1_419_459, 2_177_641, 3_920_301, 4_278_972, 4_625_811],
+        atol=0.5,
+    )
+    assert np.sum(cl.ultimate - cl.latest) == pytest.approx(18_680_856, abs=1)
+
+
+def test_genins_mack():
+    result = reserving.mack(reserving.chain_ladder(genins(), ("all",)))
+    # Mack (1993), Taylor & Ashe data: standard errors per origin and in total
+    np.testing.assert_allclose(
+        result.se[0, 0],
+        [0, 75_535, 121_699, 133_549, 261_406, 411_010, 558_317, 875_328, 971_258, 1_363_155],
+        atol=0.5,
+    )
+    assert result.total_se[0, 0] == pytest.approx(2_447_095, abs=1)
+
+
+def test_mack_batches_triangles_independently():
+    base = genins()
+    scale = np.array([1.0, 0.01, 3.0])
+    stacked = Triangle(
+        values=base.values * scale[:, None, None], mask=np.repeat(base.mask, 3, axis=0),
+        keys=["x1", "x0.01", "x3"], origins=base.origins, dev_periods=base.dev_periods,
+    )
+    single = reserving.mack(reserving.chain_ladder(base, ("all",)))
+    result = reserving.mack(reserving.chain_ladder(stacked, ("all",)))
+    # Mack standard errors scale with the triangle
+    np.testing.assert_allclose(result.se[0], single.se[0, 0] * scale[:, None], rtol=1e-9)
+    np.testing.assert_allclose(result.total_se[0], single.total_se[0, 0] * scale, rtol=1e-9)
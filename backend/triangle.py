@@ -0,0 +1,133 @@
+"""
+Dense claims triangles built from the long-format records table.
+
+A Triangle stacks one cumulative origin × development array per class
+into a single (n_triangles, n_origins, n_dev) NumPy array, so reserving
+methods (see reserving.py) run across every class at once instead of
+looping per triangle. Cells that are not observed at the valuation date
+are NaN and False in `mask`.
+
+Usage:
+    tri = Triangle.from_records(df_records)            # Actual triangles
+    exp = Triangle.from_records(df_records, "Expected")
+    tri.latest                                         # (n_triangles, n_origins)
+"""
+
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Origin labels: a year ("1981"), quarter ("2022Q1") or month ("2022M03")
+ORIGIN_LABEL = re.compile(r"(\d{4})(?:([QM])(\d{1,2}))?")
+PERIODS_PER_YEAR = {None: 1, "Q": 4, "M": 12}
+
+
+def origin_period(label: str) -> int:
+    """
+    Absolute period number of an origin label in its own unit (year,
+    quarter or month), so consecutive origins differ by 1.
+    """
+    match = ORIGIN_LABEL.fullmatch(str(label))
+    if match is None:
+        raise ValueError(f"cannot place origin {label!r} in time; expected e.g. 1981, 2022Q1 or 2022M03")
+    year, unit, period = match.groups()
+    return int(year) * PERIODS_PER_YEAR[unit] + (int(period) - 1 if unit else 0)
+
+
+@dataclass
+class Triangle:
+    """Cumulative triangles for `keys` (classes) × `origins` × `dev_periods`."""
+    values: np.ndarray          # float, NaN where unobserved
+    mask: np.ndarray            # bool, True where observed
+    keys: list[str]
+    origins: list[str]
+    dev_periods: np.ndarray     # int development period of each column
+
+    @classmethod
+    def from_records(cls, df_records: pd.DataFrame, value_type: str = "Actual") -> "Triangle":
+        """
+        Scatter the `value_type` rows of a records table into a dense array.
+
+        Classes keep their first-seen order; origins are sorted by label
+        (cohort labels sort chronologically) and development periods span
+        0 .. the largest observed period.
+        """
+        df = df_records[df_records["Type"] == value_type]
+        key_codes, keys = pd.factorize(df["Class"], sort=False)
+        origin_codes, origins = pd.factorize(df["Cohort"], sort=True)
+        dev = df["Development_Period"].to_numpy()
+        n_dev = int(dev.max()) + 1 if len(df) else 0
+
+        values = np.full((len(keys), len(origins), n_dev), np.nan)
+        values[key_codes, origin_codes, dev] = df["Value"].to_numpy(float)
+        return cls(
+            values=values,
+            mask=~np.isnan(values),
+            keys=list(keys),
+            origins=list(origins),
+            dev_periods=np.arange(n_dev),
+        )
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return self.values.shape
+
+    @property
+    def latest_dev(self) -> np.ndarray:
+        """Index of the last observed development period per origin (-1 if none)."""
+        n_dev = self.values.shape[2]
+        observed_any = self.mask.any(axis=2)
+        last = n_dev - 1 - np.argmax(self.mask[:, :, ::-1], axis=2)
+        return np.where(observed_any, last, -1)
+
+    @property
+    def latest(self) -> np.ndarray:
+        """Latest diagonal: the last observed value per origin (NaN if none)."""
+        latest_dev = self.latest_dev
+        values = np.take_along_axis(self.values, np.maximum(latest_dev, 0)[:, :, None], axis=2)[:, :, 0]
+        return np.where(latest_dev >= 0, values, np.nan)
+
+    def at_dev(self, dev: np.ndarray) -> np.ndarray:
+        """Value at development index `dev` (n_triangles, n_origins); NaN if unobserved."""
+        safe = np.clip(dev, 0, self.values.shape[2] - 1)
+        values = np.take_along_axis(self.values, safe[:, :, None], axis=2)[:, :, 0]
+        return np.where(dev >= 0, values, np.nan)
+
+    @property
+    def origin_periods(self) -> np.ndarray:
+        """Period number of each origin (see origin_period); gaps in the origins are kept."""
+        return np.array([origin_period(label) for label in self.origins], dtype=int)
+
+    def remove_diagonals(self, n: int = 1) -> "Triangle":
+        """
+        The triangles as they stood `n` valuations ago: cells on the last
+        `n` calendar diagonals (origin period + development period) of
+        each triangle are masked out.
+
+        Origin labels are placed in time by origin_period, which assumes
+        development periods count in the origins' unit; missing origins
+        leave a gap rather than shifting later ones. Origins that had
+        already reached the last tracked period before then keep all
+        their cells.
+        """
+        calendar = self.origin_periods[:, None] + self.dev_periods[None, :]
+        latest = np.where(self.mask, calendar, -1).max(axis=(1, 2), initial=-1)
+        keep = self.mask & (calendar[None, :, :] <= (latest - n)[:, None, None])
+        return Triangle(
+            values=np.where(keep, self.values, np.nan),
+            mask=keep,
+            keys=self.keys,
+            origins=self.origins,
+            dev_periods=self.dev_periods,
+        )
+
+    def to_frame(self, values: np.ndarray, name: str) -> pd.DataFrame:
+        """Long Class × Cohort frame of an (n_triangles, n_origins) array."""
+        n_keys, n_origins = values.shape
+        return pd.DataFrame({
+            "Class": np.repeat(np.asarray(self.keys, dtype=object), n_origins),
+            "Cohort": np.tile(np.asarray(self.origins, dtype=object), n_keys),
+            name: values.ravel(),
+        })
@@ -7,8 +7,18 @@ This script:
 2. Copies all necessary files to a gh-pages branch
 3. Commits and pushes to GitHub
 
+With --incremental the gh-pages commit is built with git plumbing
+instead: deploy files are content-hashed (git blob ids), compared with
+the previous deploy's tree, and the new tree is written through a
+throwaway index. Files whose size and mtime are unchanged since the
+last run are not rehashed, data that differs only in its generation
+timestamp is not redeployed, and the push is refused rather than forced
+if gh-pages moved on the remote. The working tree and current branch
+are never touched, and nothing is committed when nothing changed.
+
 Usage:
     python3 deploy.py
+    python3 deploy.py --incremental
 
 Best Practices:
     - Uses subprocess for git operations (clear, traceable)
@@ -17,6 +27,10 @@ Best Practices:
     - Excludes backend code and requirements.txt from deployment
 """
 
+import argparse
+import json
+import os
+import re
 import subprocess
 import sys
 import shutil
@@ -31,6 +45,16 @@ DEPLOY_FILES = [
     "data/",
 ]
 
+DEPLOY_BRANCH = "gh-pages"
+DATA_DIR = "data/"
+
+# Stat cache for --incremental, kept in the git directory
+STAT_CACHE = "deploy-stat-cache.json"
+
+# Generation timestamps written into the data JSON on every run
+TIMESTAMP_FIELD = re.compile(rb'"(last_updated|generated)":\s*"[^"]*"')
+PRECOMPRESSED = (".gz", ".br")
+
 # Files/directories to exclude
 EXCLUDE = [
     ".git",
@@ -38,6 +62,8 @@ EXCLUDE = [
     "backend/",
     "requirements.txt",
     "deploy.py",
+    "run_local.py",
+    "loadtest.py",
     "README.md",
     ".gitignore",
 ]
@@ -51,6 +77,14 @@ def run_cmd(cmd, check=True, capture_output=False):
     return result.stdout.strip() if capture_output else None
 
 
+def run_git(*args, input=None, env=None, cwd=None):
+    """Run a git command without a shell (plumbing needs stdin) and return its stdout."""
+    result = subprocess.run(
+        ["git", *args], input=input, env=env, cwd=cwd, check=True, stdout=subprocess.PIPE, text=True
+    )
+    return result.stdout.strip()
+
+
 def check_clean_working_tree():
     """Ensure working tree is clean before deploying (allow data changes)."""
     status = run_cmd("git status --porcelain", capture_output=True)
@@ -154,11 +188,189 @@ def deploy_to_gh_pages():
     print("   https://oligrossman.github.io/insurance-analytics/")
 
 
+def deploy_paths(repo_root):
+    """Every file under DEPLOY_FILES as sorted repo-relative POSIX paths."""
+    paths = []
+    for item in DEPLOY_FILES:
+        src = repo_root / item
+        if src.is_dir():
+            paths.extend(p for p in src.rglob("*") if p.is_file())
+        elif src.exists():
+            paths.append(src)
+    return sorted(p.relative_to(repo_root).as_posix() for p in paths)
+
+
+def remote_deploy(repo_root):
+    """Commit at origin/gh-pages after a fetch, or None when the remote has no deploy yet."""
+    subprocess.run(["git", "fetch", "origin", DEPLOY_BRANCH], cwd=repo_root, capture_output=True)
+    return resolve_commit(repo_root, f"origin/{DEPLOY_BRANCH}")
+
+
+def resolve_commit(repo_root, ref):
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "-q", f"{ref}^{{commit}}"],
+        cwd=repo_root, capture_output=True, text=True,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def tree_manifest(repo_root, commit):
+    """path -> (mode, blob id) of every file deployed by `commit`."""
+    manifest = {}
+    for entry in run_git("ls-tree", "-r", "-z", commit, cwd=repo_root).split("\0"):
+        if entry:
+            meta, path = entry.split("\t", 1)
+            mode, _, blob = meta.split()
+            manifest[path] = (mode, blob)
+    return manifest
+
+
+def load_stat_cache(cache_path):
+    try:
+        return json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def hash_files(repo_root, paths, previous):
+    """
+    path -> (mode, blob id) for `paths`, hashing only files that may have changed.
+
+    Files whose size and mtime match the previous run and whose cached
+    blob is still the deployed one are taken from a stat cache kept in
+    the git directory (the way git's own index avoids rehashing); the
+    rest go through `git hash-object -w`, which stores new blobs.
+    """
+    cache_path = repo_root / run_git("rev-parse", "--git-path", STAT_CACHE, cwd=repo_root)
+    cache = load_stat_cache(cache_path)
+    stats = {path: (repo_root / path).stat() for path in paths}
+    files, stale = {}, []
+    for path, st in stats.items():
+        mode = "100755" if st.st_mode & 0o111 else "100644"
+        cached = cache.get(path)
+        if cached and cached[:2] == [st.st_size, st.st_mtime_ns] and previous.get(path) == (mode, cached[2]):
+            files[path] = (mode, cached[2])
+        else:
+            stale.append(path)
+    if stale:
+        blobs = run_git(
+            "hash-object", "-w", "--stdin-paths", input="".join(f"{p}\n" for p in stale), cwd=repo_root
+        ).split("\n")
+        for path, blob in zip(stale, blobs):
+            files[path] = ("100755" if stats[path].st_mode & 0o111 else "100644", blob)
+    print(f"Hashed {len(stale)} of {len(paths)} files")
+
+    cache_path.write_text(json.dumps({
+        path: [stats[path].st_size, stats[path].st_mtime_ns, files[path][1]] for path in paths
+    }))
+    return {path: files[path] for path in paths}
+
+
+def without_timestamps(data):
+    """JSON bytes with the first generation timestamp blanked out."""
+    return TIMESTAMP_FIELD.sub(rb'"\1": ""', data, count=1)
+
+
+def data_unchanged(repo_root, files, previous):
+    """
+    True when the data files differ from the previous deploy only in
+    their generation timestamps.
+
+    A regenerated data/ directory is byte-different on every run because
+    analytics.json and manifest.json record when they were written, and
+    the manifest hashes (and precompressed copies) follow the JSON. The
+    JSON files are compared with the timestamp blanked; manifest.json and
+    precompressed siblings are derived from them and are not compared.
+    """
+    data = [p for p in files if p.startswith(DATA_DIR)]
+    if set(data) != {p for p in previous if p.startswith(DATA_DIR)}:
+        return False
+    for path in data:
+        if files[path] == previous[path] or path == DATA_DIR + "manifest.json" or path.endswith(PRECOMPRESSED):
+            continue
+        if not path.endswith(".json"):
+            return False
+        old = subprocess.run(
+            ["git", "cat-file", "blob", previous[path][1]], cwd=repo_root, check=True, capture_output=True
+        ).stdout
+        if without_timestamps(old) != without_timestamps((repo_root / path).read_bytes()):
+            return False
+    return True
+
+
+def deploy_incremental():
+    """Commit only what changed since the last deploy to gh-pages, without a checkout."""
+    print("\nDeploying incrementally to gh-pages branch...")
+    repo_root = Path(__file__).resolve().parent
+    current_branch = run_git("rev-parse", "--abbrev-ref", "HEAD", cwd=repo_root)
+    remote = remote_deploy(repo_root)
+    parent = remote or resolve_commit(repo_root, DEPLOY_BRANCH)
+    previous = tree_manifest(repo_root, parent) if parent else {}
+
+    files = hash_files(repo_root, deploy_paths(repo_root), previous)
+    # .nojekyll bypasses Jekyll processing on GitHub Pages
+    files[".nojekyll"] = ("100644", run_git("hash-object", "-w", "--stdin", input="", cwd=repo_root))
+
+    if parent and data_unchanged(repo_root, files, previous):
+        # Keep the deployed data (and its matching manifest) rather than
+        # publishing a new timestamp
+        files.update((p, previous[p]) for p in files if p.startswith(DATA_DIR))
+
+    changed = [p for p, entry in files.items() if previous.get(p) != entry]
+    removed = [p for p in previous if p not in files]
+    print(f"{len(changed)} changed, {len(removed)} removed, {len(files) - len(changed)} unchanged files")
+    if parent and not changed and not removed:
+        print("Nothing to deploy")
+        return
+
+    # Build the tree in a throwaway index so the checkout is left alone
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "GIT_INDEX_FILE": str(Path(tmp) / "index")}
+        entries = "".join(f"{mode} {blob}\t{path}\0" for path, (mode, blob) in files.items())
+        run_git("update-index", "-z", "--index-info", input=entries, env=env, cwd=repo_root)
+        tree = run_git("write-tree", env=env, cwd=repo_root)
+
+    parents = ["-p", parent] if parent else []
+    commit = run_git(
+        "commit-tree", tree, *parents, "-m", f"Deploy: Update from {current_branch}", cwd=repo_root
+    )
+
+    # The lease only lets the push replace the remote deploy this commit
+    # was compared against (or create the branch if there was none), so a
+    # deploy pushed by someone else in the meantime is never overwritten.
+    print("Pushing to GitHub...")
+    lease = f"--force-with-lease=refs/heads/{DEPLOY_BRANCH}:{remote or ''}"
+    push = subprocess.run(
+        ["git", "push", lease, "origin", f"{commit}:refs/heads/{DEPLOY_BRANCH}"], cwd=repo_root
+    )
+    if push.returncode != 0:
+        print(f"Error: origin/{DEPLOY_BRANCH} changed during the deploy (or the push was refused).")
+        print("Nothing was overwritten; run the deploy again to build on the new remote state.")
+        sys.exit(1)
+    run_git("update-ref", f"refs/heads/{DEPLOY_BRANCH}", commit, cwd=repo_root)
+    print("Pushed to GitHub")
+
+    print("\nDeployment complete!")
+    print("Your site should be live at:")
+    print("   https://oligrossman.github.io/insurance-analytics/")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deploy the dashboard to GitHub Pages.")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="commit only files whose content changed since the last deploy, "
+             "using git plumbing instead of checking out gh-pages",
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("GitHub Pages Deployment Script")
     print("=" * 60)
 
     check_clean_working_tree()
     generate_data()
-    deploy_to_gh_pages()
+    if args.incremental:
+        deploy_incremental()
+    else:
+        deploy_to_gh_pages()
@@ -30,12 +30,48 @@ var chartViewMode      = 'flight-path';   // 'flight-path' | 'comparison'
 var tableSortCol       = 'Proj_Quality';  // current sort column
 var tableSortAsc       = false;           // false = descending (default)
 var trendHighlight     = true;            // trend-highlighting toggle
+var dataSource         = null;            // { basePath, manifest } for lazy shard fetches
+var shardIndex         = null;            // class → shard entry when data is sharded
+var shardLoads         = {};              // class → Promise resolved once merged
+var groupedCache       = {};              // class → getGroupedData() result
+var bandRanks          = {};              // "class|cohort" → passing-method count at bandRanksThreshold
+var bandRanksThreshold = null;
 
 /* ============================================================
    Constants
    ============================================================ */
-var MAX_DEV_PERIOD = 12;
+var MAX_DEV_PERIOD   = 12;   // overridden by payload.max_dev_period
+var PERIODS_PER_YEAR = 4;    // overridden by payload.periods_per_year (4 = quarterly, 12 = monthly)
 var TOTAL_METHODS  = 27;
+var COLUMNAR_FORMAT_VERSION = 1;   // highest columnar payload version understood
+var MACK_Z = 1.96;                 // Mack error bars: ± MACK_Z standard errors (~95%)
+
+// Row tables carried by the payload (or by each class shard)
+var DATA_TABLES = [
+    'records', 'ultimates', 'prior_ultimates', 'method_scores',
+    'claims', 'premiums', 'cohort_claim_counts', 'reserve_distribution', 'mack',
+    'ultimate_bands', 'decisions', 'ae_attribution', 'method_summary',
+    'fanning', 'norm_fanning', 'norm_series',
+];
+
+// Key paths of the row-position indexes in payload.lookup (mirrors
+// LOOKUP_KEYS in backend/generate_data.py)
+var LOOKUP_KEYS = {
+    ultimates:           ['Class', 'Cohort', 'Method'],
+    prior_ultimates:     ['Class', 'Cohort', 'Method'],
+    method_scores:       ['Class', 'Method'],
+    premiums:            ['Class', 'Cohort'],
+    cohort_claim_counts: ['Class', 'Cohort'],
+    reserve_distribution: ['Class', 'Cohort'],
+    mack:                 ['Class', 'Cohort', 'Method'],
+    ultimate_bands:       ['Class', 'Cohort'],
+    decisions:            ['Class', 'Cohort', 'Method'],
+    ae_attribution:       ['Class', 'Cohort'],
+    method_summary:       ['Class', 'Method'],
+    fanning:              ['Class', 'Cohort', 'Method'],
+    norm_fanning:         ['Class', 'Cohort'],
+    norm_series:          ['Class', 'Cohort', 'Development_Period'],
+};
 
 var COHORT_COLORS = [
     '#00cfff', '#34d399', '#fbbf24', '#f87171',
@@ -165,19 +201,171 @@ function applyLegendState(traces, hiddenGroups) {
     });
 }
 
+/**
+ * Expand a columnar table { length, columns } into an array of row
+ * objects.  Dictionary-encoded columns are { dictionary, codes } with
+ * code -1 meaning null.
+ */
+function decodeColumnarTable(table) {
+    var names = Object.keys(table.columns);
+    var cols  = names.map(function (name) {
+        var col = table.columns[name];
+        if (Array.isArray(col)) return col;
+        var dict = col.dictionary;
+        return col.codes.map(function (code) { return code < 0 ? null : dict[code]; });
+    });
+
+    var rows = new Array(table.length);
+    for (var i = 0; i < table.length; i++) {
+        var row = {};
+        for (var j = 0; j < names.length; j++) row[names[j]] = cols[j][i];
+        rows[i] = row;
+    }
+    return rows;
+}
+
+/**
+ * Normalise a loaded payload to the row-oriented shape used throughout
+ * the dashboard.  Columnar payloads ("format": "columnar") are decoded
+ * table by table; row payloads pass through unchanged.
+ */
+function decodePayload(payload) {
+    if (payload.format !== 'columnar') return payload;
+    if (payload.format_version > COLUMNAR_FORMAT_VERSION) {
+        throw new Error('Unsupported data format version ' + payload.format_version);
+    }
+    Object.keys(payload).forEach(function (key) {
+        var table = payload[key];
+        if (table && table.columns && typeof table.length === 'number') {
+            payload[key] = decodeColumnarTable(table);
+        }
+    });
+    return payload;
+}
+
 /* ============================================================
    Boot
    ============================================================ */
+function dataUrl(basePath, file) {
+    return (basePath ? basePath + '/data/' : 'data/') + file;
+}
+
+/**
+ * Load data/manifest.json (written by the backend export) with
+ * revalidation.  Returns null when there is no manifest, e.g. for data
+ * produced by an older exporter.
+ */
+async function loadManifest(basePath) {
+    try {
+        var res = await fetch(dataUrl(basePath, 'manifest.json'), { cache: 'no-cache' });
+        if (!res.ok) return null;
+        return await res.json();
+    } catch (err) {
+        return null;
+    }
+}
+
+/**
+ * Fetch a data file, versioned by its manifest content hash so an
+ * unchanged file comes straight from the browser cache.  Without a
+ * hash the request is revalidated (ETag / Last-Modified → 304).
+ */
+async function fetchDataFile(basePath, manifest, file) {
+    var entry = manifest && manifest.files ? manifest.files[file] : null;
+    var url   = dataUrl(basePath, file);
+    var res   = entry && entry.sha256
+        ? await fetch(url + '?v=' + entry.sha256.slice(0, 16))
+        : await fetch(url, { cache: 'no-cache' });
+    if (!res.ok) throw new Error(res.statusText);
+    return decodePayload(await res.json());
+}
+
+/**
+ * Make sure the tables for `cls` are in dashboardData.  With a sharded
+ * export (data/index.json) each class lives in its own file and is
+ * fetched on first use; otherwise everything is already loaded.
+ */
+function ensureClassLoaded(cls) {
+    if (!shardIndex || !cls) return Promise.resolve();
+    if (!shardLoads[cls]) {
+        var shard = shardIndex[cls];
+        if (!shard) return Promise.reject(new Error('No data shard for class ' + cls));
+        shardLoads[cls] = fetchDataFile(dataSource.basePath, dataSource.manifest, shard.path)
+            .then(mergeShard)
+            .catch(function (err) {
+                delete shardLoads[cls];
+                throw err;
+            });
+    }
+    return shardLoads[cls];
+}
+
+function mergeShard(shard) {
+    var lookups = dashboardData.lookup || (dashboardData.lookup = {});
+    var shardLookups = shard.lookup || {};
+    DATA_TABLES.forEach(function (name) {
+        var rows = shard[name];
+        if (!rows || !rows.length) return;
+        var offset = dashboardData[name].length;
+        dashboardData[name] = dashboardData[name].concat(rows);
+        if (!LOOKUP_KEYS[name]) return;
+        var source = shardLookups[name];
+        if (typeof source === 'string') source = shardLookups[source];
+        if (source && lookups[name]) {
+            mergeLookup(lookups[name], source, offset);
+        } else {
+            delete lookups[name];   // rebuilt from rows on next use
+        }
+    });
+    groupedCache = {};
+    bandRanks = {};
+}
+
+/**
+ * Merge a shard's lookup into the combined one, shifting its row
+ * positions by `offset` (where the shard's rows were appended).
+ */
+function mergeLookup(target, source, offset) {
+    Object.keys(source).forEach(function (key) {
+        var val = source[key];
+        if (typeof val === 'number') {
+            if (!(key in target)) target[key] = val + offset;
+        } else {
+            mergeLookup(target[key] || (target[key] = {}), val, offset);
+        }
+    });
+}
+
+function showLoadError(err) {
+    console.error('Failed to load dashboard:', err);
+    document.querySelector('main').innerHTML =
+        '<section class="card" style="padding:40px;text-align:center;color:var(--red)">' +
+        '<h2>Failed to load data</h2>' +
+        '<p>' + err.message + '</p>' +
+        '</section>';
+}
+
 async function initDashboard() {
     try {
         var basePath = getBasePath();
-        var dataPath = basePath ? basePath + '/data/analytics.json' : 'data/analytics.json';
-        var res = await fetch(dataPath + '?v=' + Date.now());
-        if (!res.ok) throw new Error(res.statusText);
-        dashboardData = await res.json();
+        var manifest = await loadManifest(basePath);
+        var entry    = (manifest && manifest.entry) || 'analytics.json';
+        dashboardData = await fetchDataFile(basePath, manifest, entry);
+        dataSource    = { basePath: basePath, manifest: manifest };
+        if (dashboardData.max_dev_period)   MAX_DEV_PERIOD   = dashboardData.max_dev_period;
+        if (dashboardData.periods_per_year) PERIODS_PER_YEAR = dashboardData.periods_per_year;
+        if (dashboardData.layout === 'sharded') {
+            shardIndex = dashboardData.shards || {};
+            dashboardData.lookup = {};
+            DATA_TABLES.forEach(function (name) {
+                dashboardData[name] = [];
+                if (LOOKUP_KEYS[name]) dashboardData.lookup[name] = {};
+            });
+        }
 
         renderHeader();
         populateClassSelector();
+        var firstClass = ensureClassLoaded(currentClass);
         populateMethodSelector();
         initQualitySlider();
         initViewToggle();
@@ -189,15 +377,11 @@ async function initDashboard() {
         initDecisionTableRowClicks();
         initDecExtraToggle();
         initMethodologyOverlay();
+        await firstClass;
         renderAll();
         
     } catch (err) {
-        console.error('Failed to load dashboard:', err);
-        document.querySelector('main').innerHTML =
-            '<section class="card" style="padding:40px;text-align:center;color:var(--red)">' +
-            '<h2>Failed to load data</h2>' +
-            '<p>' + err.message + '</p>' +
-            '</section>';
+        showLoadError(err);
     }
 }
 
@@ -247,10 +431,14 @@ function populateClassSelector() {
 
     select.addEventListener('change', function () {
         var scrollPos = window.scrollY;
-        currentClass = this.value;
+        var cls = this.value;
+        currentClass = cls;
         selectedCohort = null;
-        renderAll();
-        requestAnimationFrame(function () { window.scrollTo(0, scrollPos); });
+        ensureClassLoaded(cls).then(function () {
+            if (currentClass !== cls) return;   // superseded by a later change
+            renderAll();
+            requestAnimationFrame(function () { window.scrollTo(0, scrollPos); });
+        }).catch(showLoadError);
     });
 }
 
@@ -326,6 +514,7 @@ function selectMethod(methodKey) {
    Data helpers
    ============================================================ */
 function getGroupedData(className) {
+    if (groupedCache[className]) return groupedCache[className];
     var records = dashboardData.records || [];
     var grouped = {};
 
@@ -340,58 +529,90 @@ function getGroupedData(className) {
         grouped[cohort].Expected.sort(function (a, b) { return a.dp - b.dp; });
     });
 
+    groupedCache[className] = grouped;
     return grouped;
 }
 
-function getUltimate(className, cohort, method) {
-    var ultimates = dashboardData.ultimates || [];
-    for (var i = 0; i < ultimates.length; i++) {
-        var u = ultimates[i];
-        if (u.Class === className && u.Cohort === cohort && u.Method === method) {
-            return u.Ultimate;
-        }
+/**
+ * Row-position index for a table: nested objects along LOOKUP_KEYS[name]
+ * ending in an index into dashboardData[name].  Uses the exporter's
+ * payload.lookup, where a table sharing another's row order names that
+ * table instead, or builds it once from the rows (columnar payloads and
+ * older data files).
+ */
+function tableLookup(name) {
+    var lookups = dashboardData.lookup || (dashboardData.lookup = {});
+    if (typeof lookups[name] === 'string') lookups[name] = tableLookup(lookups[name]);
+    if (!lookups[name]) {
+        var keys = LOOKUP_KEYS[name];
+        var root = {};
+        (dashboardData[name] || []).forEach(function (row, pos) {
+            var node = root;
+            for (var k = 0; k < keys.length - 1; k++) {
+                var part = row[keys[k]];
+                node = node[part] || (node[part] = {});
+            }
+            var leaf = row[keys[keys.length - 1]];
+            if (!(leaf in node)) node[leaf] = pos;
+        });
+        lookups[name] = root;
     }
-    return null;
+    return lookups[name];
 }
 
-function getPriorUltimate(className, cohort, method) {
-    var priors = dashboardData.prior_ultimates || [];
-    for (var i = 0; i < priors.length; i++) {
-        var p = priors[i];
-        if (p.Class === className && p.Cohort === cohort && p.Method === method) {
-            return p.Ultimate;
-        }
+/**
+ * Follow `path` (e.g. [class, cohort]) into a table's lookup.  Returns
+ * the nested node / row position, or null when any key is missing.
+ */
+function lookupNode(name, path) {
+    var node = tableLookup(name);
+    for (var i = 0; i < path.length; i++) {
+        if (node == null || !Object.prototype.hasOwnProperty.call(node, path[i])) return null;
+        node = node[path[i]];
     }
-    return null;
+    return node;
+}
+
+function lookupRow(name, path) {
+    var pos = lookupNode(name, path);
+    return typeof pos === 'number' ? dashboardData[name][pos] : null;
+}
+
+function getUltimate(className, cohort, method) {
+    var u = lookupRow('ultimates', [className, cohort, method]);
+    return u ? u.Ultimate : null;
+}
+
+function getPriorUltimate(className, cohort, method) {
+    var p = lookupRow('prior_ultimates', [className, cohort, method]);
+    return p ? p.Ultimate : null;
 }
 
 function getUltimateRow(className, cohort, method) {
-    var ultimates = dashboardData.ultimates || [];
-    for (var i = 0; i < ultimates.length; i++) {
-        var u = ultimates[i];
-        if (u.Class === className && u.Cohort === cohort && u.Method === method) {
-            return u;
-        }
-    }
-    return null;
+    return lookupRow('ultimates', [className, cohort, method]);
 }
 
 /**
  * Return the total (sum) ultimate across all cohorts for a given class + method.
  */
 function getTotalUltimate(className, method) {
-    var ultimates = dashboardData.ultimates || [];
+    var byCohort = lookupNode('ultimates', [className]) || {};
     var total = 0;
-    for (var i = 0; i < ultimates.length; i++) {
-        var u = ultimates[i];
-        if (u.Class === className && u.Method === method) {
-            total += u.Ultimate;
-        }
-    }
+    Object.keys(byCohort).forEach(function (cohort) {
+        var u = lookupRow('ultimates', [className, cohort, method]);
+        if (u) total += u.Ultimate;
+    });
     return total;
 }
 
+/**
+ * Class-level A vs E and ultimate change for a method, summed over
+ * cohorts.  Read from the exporter's method_summary table when present.
+ */
 function getMethodAEAndUltChange(className, method) {
+    var summary = lookupRow('method_summary', [className, method]);
+    if (summary) return { aeRatio: summary.AE_Ratio, ultChg: summary.Ult_Change };
+
     var grouped = getGroupedData(className);
     var cohorts = Object.keys(grouped).sort();
     var totalA = 0, totalE = 0, totalCurUlt = 0, totalPriUlt = 0;
@@ -426,11 +647,11 @@ function formatNumber(n) {
 }
 
 /**
- * Format cohort for display: "2022Q1" -> "2022 Q1".
+ * Format cohort for display: "2022Q1" -> "2022 Q1", "2022M03" -> "2022 M03".
  */
 function formatCohort(cohort) {
     if (cohort == null) return '';
-    return String(cohort).replace(/(\d{4})(Q\d)/i, '$1 $2');
+    return String(cohort).replace(/(\d{4})([QM]\d+)/i, '$1 $2');
 }
 
 /**
@@ -454,26 +675,35 @@ function getGlobalYMax(grouped) {
  * for a given class.
  */
 function getPassingMethods(className) {
+    var byMethod = lookupNode('method_scores', [className]) || {};
     var scores = dashboardData.method_scores || [];
-    return scores
-        .filter(function (s) {
-            return s.Class === className && s.Proj_Quality >= qualityThreshold;
-        })
-        .map(function (s) { return s.Method; });
+    return Object.keys(byMethod).filter(function (method) {
+        return scores[byMethod[method]].Proj_Quality >= qualityThreshold;
+    });
 }
 
 /**
  * For a given class + cohort, get the min and max ultimates
- * across all methods that pass the quality filter.
+ * across all methods that pass the quality filter.  When the data
+ * carries a bootstrap reserve_distribution, its P5 / P50 / P95
+ * ultimates are attached as `dist`; with Mack standard errors, `stat`
+ * widens the range to ± MACK_Z standard errors of each method.
  */
 function getUltimateBand(className, cohort, passingMethods) {
-    var ultimates = dashboardData.ultimates || [];
-    var vals = [];
+    var bands = lookupRow('ultimate_bands', [className, cohort]);
+    if (bands) return getPrecomputedBand(className, cohort, bands);
 
-    ultimates.forEach(function (u) {
-        if (u.Class === className && u.Cohort === cohort &&
-            passingMethods.indexOf(u.Method) >= 0) {
-            vals.push(u.Ultimate);
+    var vals = [];
+    var statMin = Infinity, statMax = -Infinity;
+
+    passingMethods.forEach(function (method) {
+        var u = lookupRow('ultimates', [className, cohort, method]);
+        if (!u || u.Ultimate == null) return;
+        vals.push(u.Ultimate);
+        var se = getMackSE(className, cohort, method);
+        if (se != null) {
+            statMin = Math.min(statMin, u.Ultimate - MACK_Z * se);
+            statMax = Math.max(statMax, u.Ultimate + MACK_Z * se);
         }
     });
 
@@ -483,9 +713,94 @@ function getUltimateBand(className, cohort, passingMethods) {
         min: Math.min.apply(null, vals),
         max: Math.max.apply(null, vals),
         count: vals.length,
+        dist: getReserveDistribution(className, cohort),
+        stat: statMax > -Infinity ? { min: statMin, max: statMax } : null,
+    };
+}
+
+/**
+ * getUltimateBand from the exporter's ultimate_bands: a Class × Cohort
+ * row holds the cohort's methods sorted by Proj_Quality descending with
+ * running band values, so the band at qualityThreshold is at the end of
+ * the passing prefix.  Only the prefix length needs a search.
+ */
+function getPrecomputedBand(className, cohort, bands) {
+    var passing = getBandRank(className, cohort, bands);
+    if (passing === 0) return null;
+    var i = passing - 1;
+    if (!bands.Band_Count[i]) return null;
+    return {
+        min: bands.Band_Min[i],
+        max: bands.Band_Max[i],
+        count: bands.Band_Count[i],
+        dist: getReserveDistribution(className, cohort),
+        stat: bands.Stat_Min && bands.Stat_Min[i] != null ? { min: bands.Stat_Min[i], max: bands.Stat_Max[i] } : null,
     };
 }
 
+/**
+ * Number of a cohort's methods passing qualityThreshold: a binary search
+ * over its ultimate_bands Proj_Quality list, cached per Class × Cohort
+ * until the threshold changes.
+ */
+function getBandRank(className, cohort, bands) {
+    if (bandRanksThreshold !== qualityThreshold) {
+        bandRanks = {};
+        bandRanksThreshold = qualityThreshold;
+    }
+    var key = className + '|' + cohort;
+    if (key in bandRanks) return bandRanks[key];
+
+    var quality = bands.Proj_Quality;
+    var lo = 0, hi = quality.length;
+    while (lo < hi) {
+        var mid = (lo + hi) >> 1;
+        if (quality[mid] != null && quality[mid] >= qualityThreshold) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    bandRanks[key] = lo;
+    return lo;
+}
+
+/**
+ * Mack standard error of a method's ultimate (cohort 'Total' for the
+ * class total), or null when the data was generated without --mack.
+ */
+function getMackSE(className, cohort, method) {
+    var m = lookupRow('mack', [className, cohort, method]);
+    return m && m.Mack_SE != null ? m.Mack_SE : null;
+}
+
+/**
+ * Bootstrap ultimate percentiles for a class + cohort, or null when
+ * the data was generated without --bootstrap.
+ */
+function getReserveDistribution(className, cohort) {
+    var d = lookupRow('reserve_distribution', [className, cohort]);
+    if (!d || d.Ultimate_P50 == null) return null;
+    return { p5: d.Ultimate_P5, p50: d.Ultimate_P50, p95: d.Ultimate_P95 };
+}
+
+/**
+ * Hover line for a band's bootstrap percentiles ('' without them).
+ */
+function formatBandDistribution(band) {
+    if (!band) return '';
+    var fmt = function (v) { return '$' + v.toLocaleString(undefined, { maximumFractionDigits: 0 }); };
+    var text = '';
+    if (band.stat) {
+        text += '<br>Mack ±' + MACK_Z + ' SE: ' + fmt(band.stat.min) + ' – ' + fmt(band.stat.max);
+    }
+    if (band.dist) {
+        text += '<br>Bootstrap P5 / P50 / P95: ' + fmt(band.dist.p5) + ' / ' +
+            fmt(band.dist.p50) + ' / ' + fmt(band.dist.p95);
+    }
+    return text;
+}
+
 /**
  * Get the large loss threshold for a given class.
  */
@@ -498,14 +813,8 @@ function getLargeThreshold(className) {
  * Get Reserve_Det and Proj_Quality for a class + method.
  */
 function getMethodScoresRow(className, method) {
-    var scores = dashboardData.method_scores || [];
-    for (var i = 0; i < scores.length; i++) {
-        var s = scores[i];
-        if (s.Class === className && s.Method === method) {
-            return { Reserve_Det: s.Reserve_Det, Proj_Quality: s.Proj_Quality };
-        }
-    }
-    return null;
+    var s = lookupRow('method_scores', [className, method]);
+    return s ? { Reserve_Det: s.Reserve_Det, Proj_Quality: s.Proj_Quality } : null;
 }
 
 /**
@@ -526,17 +835,12 @@ function getMethodType(method) {
  * Returns { earned, priorEarned, changePct } or null.
  */
 function getPremiumChange(className, cohort) {
-    var premiums = dashboardData.premiums || [];
-    for (var i = 0; i < premiums.length; i++) {
-        var p = premiums[i];
-        if (p.Class === className && p.Cohort === cohort) {
-            var prior = p.Prior_Earned || 0;
-            if (!prior) return null;
-            var chg = (p.Earned - prior) / prior;
-            return { earned: p.Earned, priorEarned: prior, changePct: chg };
-        }
-    }
-    return null;
+    var p = lookupRow('premiums', [className, cohort]);
+    if (!p) return null;
+    var prior = p.Prior_Earned || 0;
+    if (!prior) return null;
+    var chg = (p.Earned - prior) / prior;
+    return { earned: p.Earned, priorEarned: prior, changePct: chg };
 }
 
 /**
@@ -544,39 +848,55 @@ function getPremiumChange(className, cohort) {
  * Returns { countCurrent, countPrior, changePct } or null.
  */
 function getClaimCountChange(className, cohort) {
-    var counts = dashboardData.cohort_claim_counts || [];
-    for (var i = 0; i < counts.length; i++) {
-        var c = counts[i];
-        if (c.Class === className && c.Cohort === cohort) {
-            var prior = c.Count_Prior || 0;
-            if (prior === 0) return { countCurrent: c.Count_Current, countPrior: 0, changePct: 0 };
-            var chg = (c.Count_Current - prior) / prior;
-            return { countCurrent: c.Count_Current, countPrior: prior, changePct: chg };
-        }
-    }
-    return null;
+    var c = lookupRow('cohort_claim_counts', [className, cohort]);
+    if (!c) return null;
+    var prior = c.Count_Prior || 0;
+    if (prior === 0) return { countCurrent: c.Count_Current, countPrior: 0, changePct: 0 };
+    var chg = (c.Count_Current - prior) / prior;
+    return { countCurrent: c.Count_Current, countPrior: prior, changePct: chg };
 }
 
 /**
  * Max ultimate among claims-based methods for this class/cohort.
  */
 function getMaxClaimsBasedUltimate(className, cohort) {
+    var byMethod = lookupNode('ultimates', [className, cohort]) || {};
     var ultimates = dashboardData.ultimates || [];
     var maxVal = null;
-    ultimates.forEach(function (u) {
-        if (u.Class === className && u.Cohort === cohort && u.Method_Type === 'Claims-based') {
+    Object.keys(byMethod).forEach(function (method) {
+        var u = ultimates[byMethod[method]];
+        if (u.Method_Type === 'Claims-based') {
             if (maxVal == null || u.Ultimate > maxVal) maxVal = u.Ultimate;
         }
     });
     return maxVal;
 }
 
-/** DAG thresholds (configurable). */
+/** DAG thresholds (configurable; mirrored by DAG_* in backend/generate_data.py). */
 var DAG_AE_THRESHOLD = 0.05;
 var DAG_CLAIM_COUNT_THRESHOLD = 0.15;
 var DAG_LARGE_LOSS_PCT_THRESHOLD = 50;
 var DAG_PREMIUM_CHANGE_THRESHOLD = 0.10;
 
+/**
+ * Suggestion for each DAG driver (mirrors DAG_OUTCOMES / DAG_FALLBACK in
+ * backend/generate_data.py; the exported decisions table carries only
+ * the Driver).
+ */
+var DAG_SUGGESTIONS = {
+    'Trend acceleration': 'Check if the pattern is speeding up.',
+    'Claim frequency': 'Check if the pattern was slowing down — movement may be driven by more claims than expected.',
+    'Large losses': 'Keep pattern as-is but treat large losses separately.',
+    'Premium growth': 'Move toward premium-based method.',
+    'Method mismatch': 'Switch to claims-based method.',
+    'Unclear': 'Manual review of cohort experience.',
+};
+
+/** { driver, suggestion } of a DAG outcome ('' for no suggestion). */
+function dagOutcome(driver) {
+    return { driver: driver, suggestion: DAG_SUGGESTIONS[driver] || '' };
+}
+
 /**
  * Run the reserving decision DAG for one cohort.
  * Only produces a suggestion when |A-E/E| > 5%.
@@ -593,57 +913,56 @@ function runDecisionDAG(className, cohort, opts) {
     var maxClaimsBasedUltimate = opts.maxClaimsBasedUltimate;
 
     if (!aeOverThreshold) {
-        return { driver: '', suggestion: '' };
+        return dagOutcome('');
     }
 
     if (fanningOutBoth) {
-        return {
-            driver: 'Trend acceleration',
-            suggestion: 'Check if the pattern is speeding up.',
-        };
+        return dagOutcome('Trend acceleration');
     }
 
     if (claimCountUp15) {
-        return {
-            driver: 'Claim frequency',
-            suggestion: 'Check if the pattern was slowing down — movement may be driven by more claims than expected.',
-        };
+        return dagOutcome('Claim frequency');
     }
 
     if (largeLossPct >= DAG_LARGE_LOSS_PCT_THRESHOLD) {
-        return {
-            driver: 'Large losses',
-            suggestion: 'Keep pattern as-is but treat large losses separately.',
-        };
+        return dagOutcome('Large losses');
     }
 
     if (premiumChangePct >= DAG_PREMIUM_CHANGE_THRESHOLD) {
-        return {
-            driver: 'Premium growth',
-            suggestion: 'Move toward premium-based method.',
-        };
+        return dagOutcome('Premium growth');
     }
 
     if (methodType === 'Premium-based' && maxClaimsBasedUltimate != null && currentUltimate != null && maxClaimsBasedUltimate > currentUltimate) {
-        return {
-            driver: 'Method mismatch',
-            suggestion: 'Switch to claims-based method.',
-        };
+        return dagOutcome('Method mismatch');
     }
 
-    return {
-        driver: 'Unclear',
-        suggestion: 'Manual review of cohort experience.',
-    };
+    return dagOutcome('Unclear');
 }
 
 /**
  * Compute the A-E movement attribution split for a cohort:
  * how much of the total claim movement is from large losses vs attritional.
+ * Read from the exporter's ae_attribution table when it covers the class
+ * (a cohort missing from it has no claims); older data files scan the
+ * claims.
  */
 function getAEAttribution(className, cohort) {
-    var claims = dashboardData.claims || [];
     var threshold = getLargeThreshold(className);
+    if (lookupNode('ae_attribution', [className])) {
+        var row = lookupRow('ae_attribution', [className, cohort]);
+        return {
+            total: row ? row.Total_Movement : 0,
+            large: row ? row.Large_Movement : 0,
+            attritional: row ? row.Attritional_Movement : 0,
+            largePct: row ? row.Large_Pct : 0,
+            largeLossCount: row ? row.Large_Count : 0,
+            attritionalCount: row ? row.Attritional_Count : 0,
+            totalCount: row ? row.Total_Count : 0,
+            threshold: row ? row.Threshold : threshold,
+        };
+    }
+
+    var claims = dashboardData.claims || [];
     var cohortClaims = claims.filter(function (c) {
         return c.Class === className && c.Cohort === cohort;
     });
@@ -844,6 +1163,8 @@ function renderFlightPathChartInner() {
     cohorts.forEach(function (cohort) {
         var band = getUltimateBand(currentClass, cohort, passingMethods);
         if (band && band.max > yMax) yMax = band.max;
+        if (band && band.dist && band.dist.p95 > yMax) yMax = band.dist.p95;
+        if (band && band.stat && band.stat.max > yMax) yMax = band.stat.max;
     });
 
     // ── Pass 1: Draw bands (behind everything) ──────────────
@@ -885,8 +1206,30 @@ function renderFlightPathChartInner() {
                 'Min: $' + band.min.toLocaleString(undefined, {maximumFractionDigits: 0}) +
                 '<br>Max: $' + band.max.toLocaleString(undefined, {maximumFractionDigits: 0}) +
                 '<br>Methods: ' + band.count +
+                formatBandDistribution(band) +
                 '<extra></extra>',
         });
+
+        // Bootstrap P5–P95 whisker around the P50 at ultimate
+        if (band.dist) {
+            traces.push({
+                x: [MAX_DEV_PERIOD],
+                y: [band.dist.p50],
+                type: 'scatter', mode: 'markers',
+                marker: { size: 6, symbol: 'line-ew', color: lineColor, line: { color: color, width: 1.5 } },
+                error_y: {
+                    type: 'data', symmetric: false,
+                    array: [band.dist.p95 - band.dist.p50],
+                    arrayminus: [band.dist.p50 - band.dist.p5],
+                    color: color, thickness: 1.2, width: 4,
+                },
+                legendgroup: cohort,
+                showlegend: false,
+                hovertemplate:
+                    '<b>' + formatCohort(cohort) + ' Bootstrap Ultimate</b>' +
+                    formatBandDistribution(band) + '<extra></extra>',
+            });
+        }
     });
 
     // ── Pass 2: Actual lines ────────────────────────────────
@@ -964,7 +1307,8 @@ function renderFlightPathChartInner() {
         if (selUlt === null) return;
         if (selUlt > yMax) yMax = selUlt;
 
-        traces.push({
+        var selSE = getMackSE(currentClass, cohort, currentMethod);
+        var selTrace = {
             x: [MAX_DEV_PERIOD],
             y: [selUlt],
             type: 'scatter', mode: 'markers',
@@ -980,8 +1324,19 @@ function renderFlightPathChartInner() {
             hovertemplate:
                 '<b>' + formatCohort(cohort) + ' Selected Ultimate</b><br>' +
                 'Method: ' + currentMethod + '<br>' +
-                'Ultimate: $%{y:,.0f}<extra></extra>',
-        });
+                'Ultimate: $%{y:,.0f}' +
+                (selSE != null ? '<br>Mack S.E.: $' + selSE.toLocaleString(undefined, { maximumFractionDigits: 0 }) : '') +
+                '<extra></extra>',
+        };
+        if (selSE) {
+            // ± MACK_Z standard errors around the selected ultimate
+            selTrace.error_y = {
+                type: 'constant', value: MACK_Z * selSE,
+                color: 'rgba(255,255,255,0.55)', thickness: 1.2, width: 5,
+            };
+            if (selUlt + MACK_Z * selSE > yMax) yMax = selUlt + MACK_Z * selSE;
+        }
+        traces.push(selTrace);
 
         if (priorUlt !== null && priorUlt !== 0) {
             var pctChg = ((selUlt - priorUlt) / priorUlt) * 100;
@@ -1009,7 +1364,7 @@ function renderFlightPathChartInner() {
         title: { text: currentClass + ' — Actual vs Expected to Ultimate', font: { size: 16, color: '#e8ecf1' }, x: 0.5, xanchor: 'center' },
         annotations: fpAnnotations,
         xaxis: {
-            title: { text: 'Development Period (Quarters)', font: { size: 12, color: '#7b8ba3' } },
+            title: { text: 'Development Period (' + (PERIODS_PER_YEAR === 12 ? 'Months' : 'Quarters') + ')', font: { size: 12, color: '#7b8ba3' } },
             gridcolor: '#2d2d2d', zeroline: false,
             tickfont: { color: '#7b8ba3', size: 11 }, dtick: 1,
             range: [-0.3, MAX_DEV_PERIOD + 0.5], autorange: false,
@@ -1092,6 +1447,8 @@ function renderComparisonChart() {
         if (selUlt       && selUlt > xMax) xMax = selUlt;
         if (priorUlt     && priorUlt > xMax) xMax = priorUlt;
         if (band         && band.max > xMax) xMax = band.max;
+        if (band && band.dist && band.dist.p95 > xMax) xMax = band.dist.p95;
+        if (band && band.stat && band.stat.max > xMax) xMax = band.stat.max;
     });
 
     // ── Build per-cohort traces so highlight + click works ─────
@@ -1112,7 +1469,8 @@ function renderComparisonChart() {
                     '<b>' + formatCohort(r.cohort) + ' Ultimate Range</b><br>' +
                     'Min: $%{x:,.0f}<br>Max: $' +
                     r.band.max.toLocaleString(undefined, { maximumFractionDigits: 0 }) +
-                    '<br>Methods: ' + r.band.count + '<extra></extra>',
+                    '<br>Methods: ' + r.band.count +
+                    formatBandDistribution(r.band) + '<extra></extra>',
             });
         }
 
@@ -1406,7 +1764,8 @@ function renderPctChart() {
 
     // Build series + detect fanning
     var pctSeries      = buildPctSeries(grouped, cohorts, currentClass, currentMethod);
-    var fanningCohorts = detectFanningCohorts(pctSeries);
+    var fanningCohorts = getExportedPctFanning(currentClass, currentMethod) ||
+        detectFanningCohorts(pctSeries);
     var showTrend      = trendHighlight;
 
     var result = buildDevTraces(pctSeries, cohorts, fanningCohorts, showTrend, {
@@ -1501,13 +1860,68 @@ function detectFanningCohorts(cohortSeriesData) {
     return fanning;
 }
 
+/**
+ * Cohorts of a class flagged as fanning out in the Incurred % of
+ * Ultimate chart for `method` by the exporter's fanning table, or null
+ * when the table does not cover the class.
+ */
+function getExportedPctFanning(className, method) {
+    var byCohort = lookupNode('fanning', [className]);
+    if (!byCohort) return null;
+    var rows = dashboardData.fanning;
+    return Object.keys(byCohort).filter(function (cohort) {
+        var pos = byCohort[cohort][method];
+        return typeof pos === 'number' && rows[pos].Pct_Fanning;
+    });
+}
+
+/**
+ * Cohorts of a class flagged as fanning out in the Incurred / Year 1
+ * chart by the exporter's norm_fanning table, or null when the table
+ * does not cover the class.
+ */
+function getExportedNormFanning(className) {
+    var byCohort = lookupNode('norm_fanning', [className]);
+    if (!byCohort) return null;
+    var rows = dashboardData.norm_fanning;
+    return Object.keys(byCohort).filter(function (cohort) {
+        return rows[byCohort[cohort]].Norm_Fanning;
+    });
+}
+
+/**
+ * Incurred / Year 1 series for a class: read from the exporter's
+ * norm_series table when it covers the class, else built from the
+ * grouped records (buildNormSeries).
+ */
+function getNormSeries(className, grouped, cohorts) {
+    var byCohort = lookupNode('norm_series', [className]);
+    if (!byCohort) return buildNormSeries(grouped, cohorts);
+    var rows = dashboardData.norm_series;
+    var series = [];
+    cohorts.forEach(function (cohort) {
+        var byDP = byCohort[cohort];
+        if (!byDP) return;
+        var dpVals = [];
+        var dpMap  = {};
+        // integer keys enumerate in ascending order
+        Object.keys(byDP).forEach(function (dp) {
+            var r = rows[byDP[dp]];
+            dpVals.push({ dp: r.Development_Period, pct: r.Norm_Pct });
+            dpMap[r.Development_Period] = r.Norm_Pct;
+        });
+        series.push({ cohort: cohort, dpVals: dpVals, dpMap: dpMap });
+    });
+    return series;
+}
+
 /**
  * Build normalised series data for the Incurred / Year 1 chart.
  * Returns [ { cohort, dpVals: [{dp, pct}], dpMap: {dp→pct} } ]
  * sorted chronologically.
  */
 function buildNormSeries(grouped, cohorts) {
-    var BASE_DP = 4;   // 4 quarters = 1 year
+    var BASE_DP = PERIODS_PER_YEAR;   // 1 year of development
     var series = [];
     cohorts.forEach(function (cohort) {
         var data = grouped[cohort];
@@ -1611,8 +2025,9 @@ function renderNormChart() {
     var grouped = getGroupedData(currentClass);
     var cohorts = Object.keys(grouped).sort();
 
-    var normSeries     = buildNormSeries(grouped, cohorts);
-    var fanningCohorts = detectFanningCohorts(normSeries);
+    var normSeries     = getNormSeries(currentClass, grouped, cohorts);
+    var fanningCohorts = getExportedNormFanning(currentClass) ||
+        detectFanningCohorts(normSeries);
     var showTrend      = trendHighlight;
 
     var result = buildDevTraces(normSeries, cohorts, fanningCohorts, showTrend, {
@@ -1892,6 +2307,18 @@ function bucketPQ(val) {
     return 'Low';
 }
 
+/**
+ * Cohorts fanning out in both the % of ultimate and the Incurred / Year 1
+ * views (decision DAG input; mirrored by decision_table in the exporter).
+ */
+function getBothFanningCohorts(grouped, cohortsChronological, className, method) {
+    var pctFanning  = getExportedPctFanning(className, method) ||
+        detectFanningCohorts(buildPctSeries(grouped, cohortsChronological, className, method));
+    var normFanning = getExportedNormFanning(className) ||
+        detectFanningCohorts(getNormSeries(className, grouped, cohortsChronological));
+    return pctFanning.filter(function (c) { return normFanning.indexOf(c) >= 0; });
+}
+
 function renderDecisionTable() {
     var tbody = document.getElementById('decision-tbody');
     var titleEl = document.getElementById('decision-table-title');
@@ -1900,11 +2327,7 @@ function renderDecisionTable() {
     var grouped = getGroupedData(currentClass);
     var cohortsChronological = Object.keys(grouped).sort();
     var cohorts = getCohortsMostRecentFirst(grouped);
-    var pctSeries  = buildPctSeries(grouped, cohortsChronological, currentClass, currentMethod);
-    var normSeries = buildNormSeries(grouped, cohortsChronological);
-    var pctFanning  = detectFanningCohorts(pctSeries);
-    var normFanning = detectFanningCohorts(normSeries);
-    var bothFanning = pctFanning.filter(function (c) { return normFanning.indexOf(c) >= 0; });
+    var bothFanning = null;   // only needed for cohorts without an exported decision
 
     var methodScores = getMethodScoresRow(currentClass, currentMethod);
     var resDetLabel = bucketResDet(methodScores ? methodScores.Reserve_Det : null);
@@ -1931,23 +2354,33 @@ function renderDecisionTable() {
             ? (currentUlt - priorUlt) / priorUlt
             : null;
 
-        var inFO = bothFanning.indexOf(cohort) >= 0;
-        var attribution = getAEAttribution(currentClass, cohort);
-        var premiumChg = getPremiumChange(currentClass, cohort);
-        var claimCountChg = getClaimCountChange(currentClass, cohort);
-        var maxClaimsUlt = getMaxClaimsBasedUltimate(currentClass, cohort);
-
-        var opts = {
-            aeOverThreshold: Math.abs(aeRatio) > DAG_AE_THRESHOLD,
-            fanningOutBoth: inFO,
-            claimCountUp15: claimCountChg ? claimCountChg.changePct >= DAG_CLAIM_COUNT_THRESHOLD : false,
-            largeLossPct: attribution ? attribution.largePct : 0,
-            premiumChangePct: premiumChg ? premiumChg.changePct : 0,
-            methodType: methodType,
-            currentUltimate: currentUlt,
-            maxClaimsBasedUltimate: maxClaimsUlt,
-        };
-        var dag = runDecisionDAG(currentClass, cohort, opts);
+        // The exporter evaluates the DAG for every cohort (decisions
+        // table); older data files fall back to evaluating it here.
+        var decision = lookupRow('decisions', [currentClass, cohort, currentMethod]);
+        var inFO, dag;
+        if (decision) {
+            inFO = !!decision.Fanning_Out;
+            dag = dagOutcome(decision.Driver || '');
+        } else {
+            if (!bothFanning) bothFanning = getBothFanningCohorts(grouped, cohortsChronological, currentClass, currentMethod);
+            inFO = bothFanning.indexOf(cohort) >= 0;
+            var attribution = getAEAttribution(currentClass, cohort);
+            var premiumChg = getPremiumChange(currentClass, cohort);
+            var claimCountChg = getClaimCountChange(currentClass, cohort);
+            var maxClaimsUlt = getMaxClaimsBasedUltimate(currentClass, cohort);
+
+            var opts = {
+                aeOverThreshold: Math.abs(aeRatio) > DAG_AE_THRESHOLD,
+                fanningOutBoth: inFO,
+                claimCountUp15: claimCountChg ? claimCountChg.changePct >= DAG_CLAIM_COUNT_THRESHOLD : false,
+                largeLossPct: attribution ? attribution.largePct : 0,
+                premiumChangePct: premiumChg ? premiumChg.changePct : 0,
+                methodType: methodType,
+                currentUltimate: currentUlt,
+                maxClaimsBasedUltimate: maxClaimsUlt,
+            };
+            dag = runDecisionDAG(currentClass, cohort, opts);
+        }
 
         var aeClass = aeRatio > DAG_AE_THRESHOLD ? 'dec-ae-adverse' : (aeRatio < -DAG_AE_THRESHOLD ? 'dec-ae-favourable' : '');
         var aeText = (aeRatio * 100).toFixed(1) + '%';
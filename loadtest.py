@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Small load test for the local dashboard server.
+
+Each simulated client holds one keep-alive connection and repeatedly
+fetches the dashboard asset set, timing every request end to end
+(including reading the full body).
+
+Usage:
+    python3 run_local.py --no-browser &
+    python3 loadtest.py [--url http://localhost:8000] [--clients 8] [--duration 10]
+
+Reports requests/second, throughput and p50 / p95 / max latency overall
+and per asset.
+"""
+
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+ASSETS = [
+    "/index.html",
+    "/css/style.css",
+    "/js/dashboard.js",
+    "/data/analytics.json",
+]
+
+
+def percentile(sorted_vals: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_vals:
+        return float("nan")
+    rank = max(0, min(len(sorted_vals) - 1, round(pct / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[rank]
+
+
+def run_client(
+    host: str, port: int, deadline: float, results: list, errors: list, headers: dict,
+) -> None:
+    """Fetch ASSETS in a loop over one persistent connection until `deadline`."""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        while time.perf_counter() < deadline:
+            for path in ASSETS:
+                start = time.perf_counter()
+                try:
+                    conn.request("GET", path, headers=headers)
+                    resp = conn.getresponse()
+                    body = resp.read()
+                except (OSError, http.client.HTTPException) as exc:
+                    errors.append(f"{path}: {exc}")
+                    conn.close()
+                    conn = http.client.HTTPConnection(host, port, timeout=30)
+                    continue
+                elapsed = time.perf_counter() - start
+                if resp.status >= 400:
+                    errors.append(f"{path}: HTTP {resp.status}")
+                results.append((path, elapsed, len(body)))
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the local dashboard server.")
+    parser.add_argument("--url", default="http://localhost:8000", help="server base URL")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="test length in seconds")
+    parser.add_argument("--compressed", action="store_true",
+                        help="send Accept-Encoding: br, gzip (body sizes are wire bytes)")
+    args = parser.parse_args()
+    headers = {"Accept-Encoding": "br, gzip"} if args.compressed else {}
+
+    parts = urlsplit(args.url)
+    host, port = parts.hostname or "localhost", parts.port or 80
+
+    results: list[tuple[str, float, int]] = []
+    errors: list[str] = []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    threads = [
+        threading.Thread(target=run_client, args=(host, port, deadline, results, errors, headers))
+        for _ in range(args.clients)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    if not results:
+        print("No successful requests.")
+        for err in errors[:10]:
+            print(f"  {err}")
+        raise SystemExit(1)
+
+    latencies = sorted(r[1] for r in results)
+    total_bytes = sum(r[2] for r in results)
+    print(f"Clients: {args.clients}   Duration: {elapsed:.1f}s   Requests: {len(results)}   Errors: {len(errors)}")
+    print(f"Requests/sec: {len(results) / elapsed:,.1f}   Throughput: {total_bytes / elapsed / 1e6:,.1f} MB/s")
+    print(f"Latency  p50 {percentile(latencies, 50) * 1000:8.1f} ms   "
+          f"p95 {percentile(latencies, 95) * 1000:8.1f} ms   max {latencies[-1] * 1000:8.1f} ms")
+    print()
+    print(f"{'Asset':<24}{'Requests':>10}{'p50 ms':>10}{'p95 ms':>10}{'KB':>10}")
+    for path in ASSETS:
+        asset = sorted(r[1] for r in results if r[0] == path)
+        size = next((r[2] for r in results if r[0] == path), 0)
+        print(f"{path:<24}{len(asset):>10}{percentile(asset, 50) * 1000:>10.1f}"
+              f"{percentile(asset, 95) * 1000:>10.1f}{size / 1024:>10.1f}")
+    for err in errors[:5]:
+        print(f"  error: {err}")
+
+
+if __name__ == "__main__":
+    main()
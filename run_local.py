@@ -3,22 +3,269 @@
 Run the dashboard locally with a simple HTTP server.
 
 Usage:
-    python3 run_local.py
+    python3 run_local.py [--port 8000] [--bind ADDRESS] [--max-connections 256] [--no-browser]
 
 This will:
 1. Generate fresh data
 2. Start a local web server on http://localhost:8000
 3. Open your browser automatically
 
+The server gives each connection its own thread (up to a cap) and
+speaks HTTP/1.1 with keep-alive, so neither a slow download of
+data/analytics.json nor an idle keep-alive socket blocks the other
+dashboard assets or other users sharing the box. Use --bind 0.0.0.0 to serve the team.
+Precompressed .br / .gz copies written by the backend are served to
+clients that accept them.
+
 Press Ctrl+C to stop the server.
 """
 
+import argparse
+import datetime
+import email.utils
+import hashlib
+import os
 import subprocess
 import sys
+import threading
 import webbrowser
 import time
+from functools import partial
 from pathlib import Path
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = Path(__file__).resolve().parent
+
+DEFAULT_PORT = 8000
+DEFAULT_MAX_CONNECTIONS = 256
+KEEPALIVE_TIMEOUT = 15  # seconds an idle keep-alive connection is kept open
+CONNECTION_WAIT = 5     # seconds a connection over the cap waits before a 503
+BUSY_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Retry-After: 1\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+)
+
+# Precompressed siblings written by the backend, in order of preference.
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+# Requests carrying a content version (?v=<hash>) never change, so the
+# browser may keep them; everything else must be revalidated.
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+_hash_cache: dict[tuple[str, int, int], str] = {}
+_hash_lock = threading.Lock()
+
+
+def content_hash(path: str) -> str:
+    """SHA-256 of a file, cached until its size or mtime changes."""
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _hash_lock:
+        cached = _hash_cache.get(key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _hash_lock:
+        _hash_cache[key] = value
+    return value
+
+
+def parse_accept_encoding(header: str) -> set[str]:
+    """
+    Content codings the client accepts (q > 0) from an Accept-Encoding header.
+
+    `*` stands for codings not listed elsewhere in the header, so a coding
+    refused with q=0 stays refused (RFC 9110 §12.5.3).
+    """
+    accepted = set()
+    refused = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding)
+        else:
+            refused.add(coding)
+    if "*" in accepted:
+        accepted.update(coding for coding, _ in PRECOMPRESSED if coding not in refused)
+    return accepted
+
+
+class DashboardRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Static file handler speaking HTTP/1.1 so connections are reused.
+
+    When a file has an up-to-date precompressed sibling (`x.json.br`,
+    `x.json.gz`) and the client's Accept-Encoding allows it, the sibling
+    is sent with the matching Content-Encoding. Every response for such
+    a file carries `Vary: Accept-Encoding` so caches keep the variants
+    apart.
+
+    Files get a content-hash ETag (suffixed with the coding for
+    precompressed variants) and If-None-Match / If-Modified-Since are
+    answered with 304 Not Modified.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body go out in separate writes; without TCP_NODELAY a
+    # reused connection stalls ~40 ms per response on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def send_head(self):
+        # Handler instances live for the whole keep-alive connection, so
+        # per-response state is reset on every request.
+        self._extra_headers = []
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        encoding, serve_path = None, path
+        variants = self.precompressed_variants(path)
+        if variants:
+            self._extra_headers.append(("Vary", "Accept-Encoding"))
+            accepted = parse_accept_encoding(self.headers.get("Accept-Encoding", ""))
+            for candidate, variant_path in variants:
+                if candidate in accepted:
+                    encoding, serve_path = candidate, variant_path
+                    break
+
+        etag = f'"{content_hash(path)}{"-" + encoding if encoding else ""}"'
+        self._extra_headers.append(("ETag", etag))
+        self._extra_headers.append(("Cache-Control", self.cache_control()))
+
+        if self.is_not_modified(etag, serve_path):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("Last-Modified", self.date_time_string(os.stat(serve_path).st_mtime))
+            self.end_headers()
+            return None
+
+        if encoding:
+            return self.send_precompressed(path, serve_path, encoding)
+        return super().send_head()
+
+    def cache_control(self) -> str:
+        query = parse_qs(urlsplit(self.path).query)
+        return CACHE_IMMUTABLE if query.get("v") else CACHE_REVALIDATE
+
+    def is_not_modified(self, etag: str, path: str) -> bool:
+        """Evaluate If-None-Match (preferred) or If-Modified-Since."""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+        if since is None:
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        return int(os.stat(path).st_mtime) <= since.timestamp()
+
+    def end_headers(self):
+        for name, value in getattr(self, "_extra_headers", ()):
+            self.send_header(name, value)
+        self._extra_headers = []
+        super().end_headers()
+
+    @staticmethod
+    def precompressed_variants(path: str) -> list[tuple[str, str]]:
+        """(encoding, path) of siblings at least as new as `path`."""
+        mtime = os.stat(path).st_mtime
+        variants = []
+        for encoding, suffix in PRECOMPRESSED:
+            candidate = path + suffix
+            try:
+                if os.stat(candidate).st_mtime >= mtime:
+                    variants.append((encoding, candidate))
+            except OSError:
+                continue
+        return variants
+
+    def send_precompressed(self, path: str, variant_path: str, encoding: str):
+        f = open(variant_path, "rb")
+        try:
+            fs = os.fstat(f.fileno())
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(fs.st_size))
+            self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+
+class DashboardHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer with a cap on open connections.
+
+    Every connection gets its own thread, so idle keep-alive sockets
+    never hold up new clients and the accept loop never blocks. Past
+    `max_connections`, a connection waits in its thread up to
+    `connection_wait` seconds for another to close, then gets
+    503 Service Unavailable.
+    """
+
+    daemon_threads = True
+    request_queue_size = 64
+
+    def __init__(
+        self, server_address, handler_class,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS, connection_wait: float = CONNECTION_WAIT,
+    ):
+        super().__init__(server_address, handler_class)
+        self.max_connections = max_connections
+        self.connection_wait = connection_wait
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def process_request_thread(self, request, client_address):
+        if not self._slots.acquire(timeout=self.connection_wait):
+            reject_busy(request)
+            self.shutdown_request(request)
+            return
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+
+def reject_busy(request) -> None:
+    """Answer a connection with BUSY_RESPONSE (best effort)."""
+    try:
+        # Read the request first: closing a socket with unread input
+        # resets the connection and the client may never see the 503.
+        request.settimeout(1)
+        request.recv(65536)
+        request.sendall(BUSY_RESPONSE)
+    except OSError:
+        pass
+
 
 def generate_data():
     """Generate fresh data (uses same Python as this script)."""
@@ -35,30 +282,52 @@ def generate_data():
         print(f"❌ Failed to generate data: {e}")
         sys.exit(1)
 
-def run_server():
+def run_server(
+    port: int = DEFAULT_PORT,
+    bind: str = "",
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    open_browser: bool = True,
+):
     """Start local HTTP server."""
-    port = 8000
-    server_address = ('', port)
-    httpd = HTTPServer(server_address, SimpleHTTPRequestHandler)
-    
-    url = f"http://localhost:{port}/index.html"
+    handler = partial(DashboardRequestHandler, directory=str(ROOT))
+    httpd = DashboardHTTPServer((bind, port), handler, max_connections=max_connections)
+
+    host = "localhost" if bind in ("", "0.0.0.0", "::") else bind
+    url = f"http://{host}:{port}/index.html"
     print("=" * 60)
     print("🚀 Insurance Analytics Dashboard - Local Server")
     print("=" * 60)
     print(f"\n📍 Server running at: {url}")
-    print("📊 Dashboard available at: http://localhost:8000/")
+    print(f"📊 Dashboard available at: http://{host}:{port}/")
+    print(f"🧵 Listening on {bind or '*'}:{port} (up to {max_connections} connections, HTTP/1.1 keep-alive)")
     print("\nPress Ctrl+C to stop the server\n")
-    
+
     # Open browser after a short delay
-    time.sleep(1)
-    webbrowser.open(url)
-    
+    if open_browser:
+        time.sleep(1)
+        webbrowser.open(url)
+
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n\n🛑 Server stopped")
-        httpd.shutdown()
+    finally:
+        httpd.server_close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate data and serve the dashboard locally.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default {DEFAULT_PORT})")
+    parser.add_argument("--bind", default="", help="address to bind (default: all interfaces)")
+    parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help=f"open connections served at once (default {DEFAULT_MAX_CONNECTIONS})")
+    parser.add_argument("--no-browser", action="store_true", help="do not open a browser window")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.max_connections < 1:
+        sys.exit("--max-connections must be at least 1")
     generate_data()
-    run_server()
+    run_server(args.port, args.bind, args.max_connections, open_browser=not args.no_browser)